@@ -9,3 +9,117 @@ MAX_BUILD_TIMEOUT = 10
 # be advised that MAX_TESTING_TIMEOUT means that TEST_TIMEOUT * len(tests) < MAX_TESTING_TIMEOUT
 # the default setting means that 32 tests each one for 1 second maximum are allowed
 MAX_TESTING_TIMEOUT = 32
+
+# bytes of output of a build or a test kept by the checker, the rest is dropped,
+# answers longer than expected output are rejected without reading them whole
+MAX_OUTPUT_SIZE = 1024 * 1024
+
+# runtime for solutions: "docker" or "local" (temporary directories on the host
+# with namespaces and cgroups v2 where available, only for trusted solutions)
+SANDBOX_BACKEND = "docker"
+# connections to dockerd kept open by the docker backend, 0 means enough for
+# all running checks and their test workers
+DOCKER_MAX_CONNECTIONS = 0
+
+# images with a single toolchain and warm caches used for solutions of the
+# language (built from liokorcode_checker_image/<language>), other solutions
+# are checked in the default image with every toolchain
+LANGUAGE_IMAGES = {
+    "c": "liokorcode_checker_c",
+    "go": "liokorcode_checker_go",
+    "java": "liokorcode_checker_java",
+}
+
+# warm pool of pre-started containers of every image (the default one and
+# LANGUAGE_IMAGES), set CONTAINER_POOL_SIZE to 0 to disable it
+CONTAINER_POOL_SIZE = 4
+# containers older than this (in seconds) are replaced with fresh ones
+CONTAINER_POOL_MAX_AGE = 600
+# container is replaced after serving this number of checks; solutions run as
+# root with a writable root filesystem, so a container reused by the next check
+# may run it with toolchain or caches (ccache, GOCACHE) changed by the previous
+# one, set it above 1 only if all the solutions are trusted
+CONTAINER_POOL_MAX_USES = 1
+
+# run all tests of a solution with one exec using in-container runner
+BATCH_TESTS = True
+
+# asynchronous checks (POST /checks), CHECK_WORKERS = 0 means that workers count
+# is chosen using CPU count and available memory (CHECK_MEMORY bytes per check)
+CHECK_WORKERS = 0
+CHECK_MEMORY = 256 * 1024 * 1024
+CHECK_QUEUE_SIZE = 100
+# finished checks are kept for this time (in seconds) to be polled
+CHECK_JOB_TTL = 600
+# callbackUrl of POST /checks must be http(s) URL on one of these hosts,
+# callbacks are not accepted if it's empty
+CALLBACK_HOSTS: list[str] = []
+
+# scheduler: checks run at once (0 means CHECK_WORKERS), others wait in queue
+# of their "priority" and queues share the slots by PRIORITY_WEIGHTS; a check
+# waiting longer than PRIORITY_AGING seconds goes first whatever its priority,
+# requests above PRIORITY_MAX_WAITING checks of a priority get 429
+MAX_RUNNING_CHECKS = 0
+PRIORITY_WEIGHTS = {"interactive": 4.0, "bulk": 1.0}
+DEFAULT_PRIORITY = "interactive"
+PRIORITY_AGING = 30
+PRIORITY_MAX_WAITING = 100
+
+# bulk regrade (POST /check_batch): submissions of one batch, checks of a batch
+# have BATCH_PRIORITY unless "priority" is given and wait for quota instead of 429
+MAX_BATCH_SIZE = 1000
+BATCH_PRIORITY = "bulk"
+
+# admission control: memory reserved for running checks (0 means
+# MAX_RUNNING_CHECKS * CHECK_MEMORY), checks wait until their memory fits
+ADMISSION_MEMORY_BUDGET = 0
+# memory reserved for a check of the language, others reserve CHECK_MEMORY
+LANGUAGE_MEMORY = {"java": 512 * 1024 * 1024}
+
+# per API key quotas: "maxChecks" admitted at once (queued ones too) and
+# "costPerMinute" - predicted seconds of checks admitted per minute, keys
+# listed here are accepted besides API_KEY (which has DEFAULT_QUOTA) only to
+# submit checks and get their results, the rest of the API needs API_KEY
+API_KEY_QUOTAS: dict[str, dict[str, float]] = {}
+DEFAULT_QUOTA = {"maxChecks": None, "costPerMinute": None}
+
+# built source trees are cached on disk by source code hash,
+# set BUILD_CACHE_DIR to None to disable the cache
+BUILD_CACHE_DIR = "/tmp/liokor_code_checker_build_cache"
+BUILD_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# results of identical requests are reused for RESULT_CACHE_TTL seconds,
+# set RESULT_CACHE_SIZE to 0 to disable the cache
+RESULT_CACHE_SIZE = 1000
+RESULT_CACHE_TTL = 300
+
+# source files are linted by LINT_WORKERS processes (0 lints them in the
+# thread of the check) in chunks of about LINT_CHUNK_SIZE characters, linting
+# of a solution stops after LINT_CPU_BUDGET seconds of CPU time
+LINT_WORKERS = 2
+LINT_CPU_BUDGET = 5.0
+LINT_CHUNK_SIZE = 256 * 1024
+
+# maximum number of containers to run tests of one solution in parallel
+# (requested with "testWorkers" field), solution is built only once
+MAX_TEST_WORKERS = 4
+# up to TEST_RETRIES sandboxes lost by a check (e.g. their containers were
+# killed) are replaced by fresh ones; the built solution is copied to them if
+# it was snapshotted for parallel tests or the build cache, otherwise it's built
+# again, so checks which lose no sandbox don't pay for a snapshot
+TEST_RETRIES = 1
+
+# coordinator mode: checks sent to /check_solution are forwarded to the least
+# loaded checker node (registered with POST /nodes) instead of being run here
+COORDINATOR = False
+# node is forgotten if it didn't report its capacity for NODE_TTL seconds
+NODE_TTL = 15
+# number of nodes tried for one check before it fails with 503
+DISPATCH_ATTEMPTS = 3
+DISPATCH_TIMEOUT = 120
+
+# checker node reports its capacity to the coordinator at COORDINATOR_URL every
+# NODE_HEARTBEAT_INTERVAL seconds, NODE_URL must be reachable from the coordinator
+COORDINATOR_URL = None
+NODE_URL = "http://localhost:8080"
+NODE_HEARTBEAT_INTERVAL = 5
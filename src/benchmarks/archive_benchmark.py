@@ -0,0 +1,134 @@
+import argparse
+import sys
+import tarfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Iterable
+
+from src.solution_checker.utils import TarStream
+
+# Compares memory and CPU used to prepare archives uploaded into sandboxes:
+# the buffered way (archive is written into BytesIO and read back) against
+# TarStream producing the request body on the fly. The body is consumed by a
+# sink counting bytes, like a socket would do.
+# Usage: python3 -m src.benchmarks.archive_benchmark --size 64 --files 8
+
+MB = 1024 * 1024
+
+Upload = Callable[[dict[str, str]], int]
+
+
+@dataclass
+class ArchiveReport:
+    method: str
+    workload: str
+    wall_time: float
+    cpu_time: float
+    peak_memory: float
+
+
+def buffered_tar(files: dict[str, str], base_path: str) -> BytesIO:
+    # archive built as the checker did it before TarStream
+    bio = BytesIO()
+    tar = tarfile.open(fileobj=bio, mode="w")
+    for name, content in files.items():
+        encoded = content.encode()
+        file = BytesIO(encoded)
+        tarinfo = tarfile.TarInfo(base_path + name)
+        tarinfo.size = len(encoded)
+        tar.addfile(tarinfo, fileobj=file)
+    tar.close()
+    bio.seek(0)
+    return bio
+
+
+def send(body: bytes | Iterable[bytes | memoryview]) -> int:
+    chunks = [body] if isinstance(body, bytes) else body
+    return sum(len(chunk) for chunk in chunks)
+
+
+def upload_buffered(files: dict[str, str]) -> int:
+    return send(buffered_tar(files, "source/").read())
+
+
+def upload_stream(files: dict[str, str]) -> int:
+    return send(TarStream(files, "source/"))
+
+
+def upload_inputs_buffered(files: dict[str, str]) -> int:
+    # every test input is uploaded by its own archive
+    return sum(
+        send(buffered_tar({name: content}, "").read())
+        for name, content in files.items()
+    )
+
+
+def upload_inputs_stream(files: dict[str, str]) -> int:
+    return sum(send(TarStream({name: content})) for name, content in files.items())
+
+
+METHODS: dict[str, dict[str, Upload]] = {
+    "source": {"buffered": upload_buffered, "stream": upload_stream},
+    "inputs": {"buffered": upload_inputs_buffered, "stream": upload_inputs_stream},
+}
+
+
+def create_files(size: int, count: int) -> dict[str, str]:
+    file_size = size // count
+    return {f"data/{i}.txt": chr(ord("a") + i % 26) * file_size for i in range(count)}
+
+
+def measure(
+    method: str, workload: str, upload: Upload, files: dict[str, str], repeat: int
+) -> ArchiveReport:
+    wall_time = cpu_time = 0.0
+    peak_memory = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start_time, start_cpu = time.perf_counter(), time.process_time()
+        upload(files)
+        cpu_time += time.process_time() - start_cpu
+        wall_time += time.perf_counter() - start_time
+        # files themselves are allocated before, only extra memory is traced
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return ArchiveReport(
+        method, workload, wall_time / repeat, cpu_time / repeat, peak_memory / MB
+    )
+
+
+def run_archive_benchmark(size: int, count: int, repeat: int) -> list[ArchiveReport]:
+    files = create_files(size, count)
+    reports = []
+    for workload, methods in METHODS.items():
+        for method, upload in methods.items():
+            reports.append(measure(method, workload, upload, files, repeat))
+    return reports
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark archive uploads")
+    parser.add_argument("--size", type=int, default=64, help="total size of files (MB)")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    reports = run_archive_benchmark(args.size * MB, args.files, args.repeat)
+    print(
+        f"{'workload':<10} {'method':<10} {'wall, s':>8} {'cpu, s':>8} {'peak, MB':>9}"
+    )
+    for report in reports:
+        print(
+            f"{report.workload:<10} {report.method:<10} {report.wall_time:8.4f} "
+            f"{report.cpu_time:8.4f} {report.peak_memory:9.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,146 @@
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import config
+
+from src.benchmarks.workloads import Workload, create_workloads
+
+# Compares throughput of a regrade (many solutions against the same tests) sent
+# as separate POST /check_solution requests by as many clients as there are
+# slots against one POST /check_batch request streaming the results.
+# Usage: python3 -m src.benchmarks.batch_benchmark --backend fake --submissions 200
+
+
+def create_client(args: argparse.Namespace, workload: Workload) -> Any:
+    # flask_app is configured by config module on import, so it's changed before
+    overrides = {
+        "SANDBOX_BACKEND": "local",
+        "CONTAINER_POOL_SIZE": 0,
+        "BUILD_CACHE_DIR": None,
+        "RESULT_CACHE_SIZE": 0,
+        "MAX_RUNNING_CHECKS": args.slots,
+        "BATCH_TESTS": args.batch_tests,
+    }
+    for key, value in overrides.items():
+        setattr(config, key, value)
+
+    from src import flask_app
+    from src.benchmarks.simulation import create_simulated_handler
+    from src.solution_checker.container_pool import ContainerPool
+    from src.solution_checker.sandbox.fake_backend import FakeBackend
+
+    if args.backend == "fake":
+        flask_app.backend = FakeBackend(
+            create_simulated_handler(workload), args.fake_latency
+        )
+    if args.pool_size > 0:
+        flask_app.container_pool = ContainerPool(
+            args.pool_size, 600, 20, flask_app.backend
+        )
+    return flask_app.app.test_client()
+
+
+def create_submissions(workload: Workload, count: int) -> list[dict[str, str]]:
+    # every solution differs, as it would in a regrade
+    submissions = []
+    for i in range(count):
+        source_code = dict(workload.source_code)
+        source_code["Makefile"] = f"# submission {i}\n" + source_code["Makefile"]
+        submissions.append(source_code)
+    return submissions
+
+
+def run_single(
+    client: Any, workload: Workload, submissions: list[dict[str, str]], clients: int
+) -> list[int]:
+    def check(source_code: dict[str, str]) -> int:
+        response = client.post(
+            f"/check_solution?api_key={config.API_KEY}",
+            json={
+                "sourceCode": source_code,
+                "tests": workload.tests,
+                "buildTimeout": workload.build_timeout,
+                "testTimeout": workload.test_timeout,
+                "priority": "bulk",
+            },
+        )
+        status: int = response.get_json()["checkResult"]
+        return status
+
+    with ThreadPoolExecutor(clients) as executor:
+        return list(executor.map(check, submissions))
+
+
+def run_batch(
+    client: Any, workload: Workload, submissions: list[dict[str, str]]
+) -> list[int]:
+    response = client.post(
+        f"/check_batch?api_key={config.API_KEY}",
+        json={
+            "tests": workload.tests,
+            "buildTimeout": workload.build_timeout,
+            "testTimeout": workload.test_timeout,
+            "submissions": [
+                {"id": i, "sourceCode": source_code}
+                for i, source_code in enumerate(submissions)
+            ],
+        },
+    )
+    lines = response.get_data(as_text=True).splitlines()
+    return [json.loads(line)["checkResult"] for line in lines]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark bulk regrade")
+    parser.add_argument("--backend", choices=("fake", "local"), default="fake")
+    parser.add_argument("--workload", default="c_8_tests")
+    parser.add_argument("--submissions", type=int, default=100)
+    parser.add_argument("--slots", type=int, default=4, help="checks run at once")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument(
+        "--batch-tests", action=argparse.BooleanOptionalAction, default=True
+    )
+    parser.add_argument(
+        "--fake-latency",
+        type=float,
+        default=0.01,
+        help="emulated duration of every fake backend call (seconds)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    workloads = create_workloads()
+    if args.workload not in workloads:
+        print(f"Unknown workload {args.workload}")
+        return 2
+    workload = workloads[args.workload]
+    client = create_client(args, workload)
+    submissions = create_submissions(workload, args.submissions)
+
+    print(f"{'mode':<8} {'time, s':>8} {'per minute':>11}  statuses")
+    failed = False
+    for mode in ("single", "batch"):
+        start_time = time.perf_counter()
+        if mode == "single":
+            statuses = run_single(client, workload, submissions, args.slots)
+        else:
+            statuses = run_batch(client, workload, submissions)
+        total_time = time.perf_counter() - start_time
+        failed |= len(statuses) != len(submissions)
+        counts = ", ".join(f"{s}: {n}" for s, n in sorted(Counter(statuses).items()))
+        print(
+            f"{mode:<8} {total_time:8.3f} "
+            f"{len(statuses) / total_time * 60:11.1f}  {counts}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
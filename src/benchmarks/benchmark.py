@@ -0,0 +1,330 @@
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable
+
+from src.benchmarks.simulation import create_simulated_handler
+from src.benchmarks.workloads import Workload, create_workloads
+from src.solution_checker.build_cache import BuildCache
+from src.solution_checker.container_pool import ContainerPool
+from src.solution_checker.result_cache import ResultCache
+from src.solution_checker.sandbox.backend import SandboxBackend
+from src.solution_checker.sandbox.docker_backend import DockerBackend
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.sandbox.local_backend import LocalBackend
+from src.solution_checker.solution_checker import SolutionChecker
+
+# Drives SolutionChecker (or Flask /check_solution route) with predefined
+# workloads and reports latency percentiles, throughput and time per stage.
+# Usage: python3 -m src.benchmarks.benchmark --backend local --concurrency 4
+
+# metrics compared with baseline, True means that bigger value is better
+COMPARED_METRICS = {"p50": False, "p95": False, "p99": False, "throughput": True}
+
+RunCheck = Callable[[Workload], dict[str, Any]]
+
+
+@dataclass
+class WorkloadReport:
+    name: str
+    checks: int
+    concurrency: int
+    failed: int
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+    throughput: float
+    stages: dict[str, float] = field(default_factory=dict)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    # linear interpolation between closest ranks
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def run_workload(
+    run_check: RunCheck,
+    workload: Workload,
+    iterations: int,
+    concurrency: int,
+    warmup: int = 1,
+) -> WorkloadReport:
+    for _ in range(warmup):
+        run_check(workload)
+
+    def timed_check(_: int) -> tuple[float, dict[str, Any]]:
+        start_time = time.perf_counter()
+        result = run_check(workload)
+        return time.perf_counter() - start_time, result
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        measurements = list(executor.map(timed_check, range(iterations)))
+    total_time = time.perf_counter() - start_time
+
+    latencies = [latency for latency, _ in measurements]
+    stages: dict[str, float] = {}
+    failed = 0
+    for _, result in measurements:
+        if result.get("checkResult") != workload.expected_status.value:
+            failed += 1
+        for stage, value in (result.get("timings") or {}).items():
+            stages[stage] = stages.get(stage, 0.0) + value / iterations
+
+    return WorkloadReport(
+        name=workload.name,
+        checks=iterations,
+        concurrency=concurrency,
+        failed=failed,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        mean=sum(latencies) / len(latencies),
+        throughput=iterations / total_time,
+        stages=stages,
+    )
+
+
+def compare_with_baseline(
+    reports: list[WorkloadReport],
+    baseline: dict[str, dict[str, Any]],
+    max_regression: float,
+) -> list[str]:
+    # returns descriptions of metrics which became worse than allowed
+    regressions = []
+    for report in reports:
+        base = baseline.get(report.name)
+        if base is None:
+            continue
+        for metric, bigger_is_better in COMPARED_METRICS.items():
+            value, base_value = getattr(report, metric), base[metric]
+            if base_value == 0:
+                continue
+            change = (value - base_value) / base_value * 100
+            if bigger_is_better:
+                change = -change
+            verdict = "worse" if change > 0 else "better"
+            print(
+                f"{report.name:<16} {metric:<10} {base_value:10.4f} -> "
+                f"{value:10.4f} ({abs(change):.1f}% {verdict})"
+            )
+            if change > max_regression:
+                regressions.append(f"{report.name} {metric} {change:.1f}%")
+    return regressions
+
+
+def print_reports(reports: list[WorkloadReport]) -> None:
+    print(
+        f"{'workload':<16} {'checks':>6} {'failed':>6} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'checks/s':>9}"
+    )
+    for report in reports:
+        print(
+            f"{report.name:<16} {report.checks:>6} {report.failed:>6} "
+            f"{report.p50:8.4f} {report.p95:8.4f} {report.p99:8.4f} "
+            f"{report.throughput:9.2f}"
+        )
+    print()
+    for report in reports:
+        stages = ", ".join(
+            f"{stage}={value:.4f}" for stage, value in sorted(report.stages.items())
+        )
+        print(f"{report.name:<16} {stages}")
+
+
+def create_backend(args: argparse.Namespace, workload: Workload) -> SandboxBackend:
+    if args.backend == "fake":
+        return FakeBackend(create_simulated_handler(workload), args.fake_latency)
+    if args.backend == "local":
+        return LocalBackend()
+    return DockerBackend()
+
+
+def create_checker_run_check(
+    args: argparse.Namespace,
+    container_pool: ContainerPool,
+    build_cache: BuildCache | None,
+    result_cache: ResultCache | None,
+) -> RunCheck:
+    def run_check(workload: Workload) -> dict[str, Any]:
+        checker = SolutionChecker(
+            workload.source_code,
+            workload.tests,
+            workload.build_timeout,
+            workload.test_timeout,
+            container_pool,
+            args.batch_tests,
+            build_cache,
+            result_cache,
+            args.test_workers,
+            collect_timings=True,
+        )
+        return checker.check_solution().to_dict()
+
+    return run_check
+
+
+def create_flask_run_check(
+    args: argparse.Namespace,
+    container_pool: ContainerPool,
+    build_cache: BuildCache | None,
+    result_cache: ResultCache | None,
+) -> RunCheck:
+    import config
+    from src import flask_app
+
+    # the app is configured by config module, benchmark settings override it
+    flask_app.backend = container_pool.backend
+    flask_app.container_pool = container_pool
+    flask_app.build_cache = build_cache
+    flask_app.result_cache = result_cache
+    config.BATCH_TESTS = args.batch_tests
+
+    client = flask_app.app.test_client()
+
+    def run_check(workload: Workload) -> dict[str, Any]:
+        response = client.post(
+            f"/check_solution?api_key={config.API_KEY}",
+            json={
+                "sourceCode": workload.source_code,
+                "tests": workload.tests,
+                "buildTimeout": workload.build_timeout,
+                "testTimeout": workload.test_timeout,
+                "testWorkers": args.test_workers,
+                "timings": True,
+            },
+        )
+        result: dict[str, Any] = response.get_json()
+        return result
+
+    return run_check
+
+
+def benchmark_workload(
+    args: argparse.Namespace,
+    workload: Workload,
+    build_cache: BuildCache | None,
+    result_cache: ResultCache | None,
+) -> WorkloadReport:
+    backend = create_backend(args, workload)
+    container_pool = ContainerPool(args.pool_size, 600, 20, backend)
+    if args.target == "flask":
+        run_check = create_flask_run_check(
+            args, container_pool, build_cache, result_cache
+        )
+    else:
+        run_check = create_checker_run_check(
+            args, container_pool, build_cache, result_cache
+        )
+    try:
+        return run_workload(
+            run_check, workload, args.iterations, args.concurrency, args.warmup
+        )
+    finally:
+        container_pool.close()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark solution checks")
+    parser.add_argument(
+        "--backend", choices=("fake", "local", "docker"), default="local"
+    )
+    parser.add_argument("--target", choices=("checker", "flask"), default="checker")
+    parser.add_argument("--workloads", nargs="*", help="default: all workloads")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--test-workers", type=int, default=1)
+    parser.add_argument(
+        "--batch-tests", action=argparse.BooleanOptionalAction, default=True
+    )
+    parser.add_argument("--build-cache", action="store_true")
+    parser.add_argument("--result-cache", action="store_true")
+    parser.add_argument(
+        "--fake-latency",
+        type=float,
+        default=0.0,
+        help="emulated duration of every fake backend call (seconds)",
+    )
+    parser.add_argument("--output", help="save report to JSON file")
+    parser.add_argument("--baseline", help="compare with report saved earlier")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="allowed regression against baseline (percent)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+
+    workloads = create_workloads()
+    names = args.workloads or list(workloads)
+    unknown = set(names) - set(workloads)
+    if unknown:
+        print(f"Unknown workloads: {', '.join(sorted(unknown))}")
+        return 2
+
+    if args.target == "flask":
+        from src import flask_app
+
+        if flask_app.container_pool is not None:
+            flask_app.container_pool.close()
+
+    cache_directory = tempfile.TemporaryDirectory()
+    build_cache = (
+        BuildCache(cache_directory.name, 1024 * 1024 * 1024)
+        if args.build_cache
+        else None
+    )
+    result_cache = ResultCache(600, 1000) if args.result_cache else None
+
+    try:
+        reports = [
+            benchmark_workload(args, workloads[name], build_cache, result_cache)
+            for name in names
+        ]
+    finally:
+        cache_directory.cleanup()
+
+    print_reports(reports)
+
+    exit_code = 0
+    if any(report.failed for report in reports):
+        print("\nSome checks finished with unexpected status")
+        exit_code = 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({report.name: asdict(report) for report in reports}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare_with_baseline(reports, baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions over {args.max_regression}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
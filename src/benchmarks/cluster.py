@@ -0,0 +1,193 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+import config
+
+from src.benchmarks.benchmark import percentile
+from src.benchmarks.workloads import Workload, create_workloads
+
+# Runs the coordinator and checker nodes as separate processes on this machine
+# and sends checks through the coordinator to see how they are spread between
+# nodes of different capacity and how checks are retried when a node dies.
+# Usage: python3 -m src.benchmarks.cluster --slots 4 2 1 --checks 60 --kill-node
+
+HOST = "127.0.0.1"
+
+
+def serve(
+    port: int,
+    overrides: dict[str, Any],
+    workload: Workload,
+    backend_name: str,
+    fake_latency: float,
+) -> None:
+    # flask_app is configured by config module on import, so it's changed before
+    for key, value in overrides.items():
+        setattr(config, key, value)
+
+    from werkzeug.serving import make_server
+
+    from src import flask_app
+    from src.benchmarks.simulation import create_simulated_handler
+    from src.solution_checker.sandbox.fake_backend import FakeBackend
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    if backend_name == "fake":
+        flask_app.backend = FakeBackend(
+            create_simulated_handler(workload), fake_latency
+        )
+    make_server(HOST, port, flask_app.app, threaded=True).serve_forever()
+
+
+def start_process(
+    port: int, overrides: dict[str, Any], args: argparse.Namespace
+) -> BaseProcess:
+    common = {
+        "SANDBOX_BACKEND": "local",
+        "CONTAINER_POOL_SIZE": 0,
+        "BUILD_CACHE_DIR": None,
+        "RESULT_CACHE_SIZE": 0,
+    }
+    workload = create_workloads()[args.workload]
+    # spawned process imports flask_app from scratch with its own config
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve,
+        args=(port, {**common, **overrides}, workload, args.backend, args.fake_latency),
+        daemon=True,
+    )
+    process.start()
+    return process
+
+
+def get_json(url: str) -> Any:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+
+def wait_for_nodes(coordinator_url: str, count: int, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            nodes = get_json(f"{coordinator_url}/nodes?api_key={config.API_KEY}")
+            if len(nodes["nodes"]) >= count:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def send_check(coordinator_url: str, body: bytes) -> tuple[float, int, str]:
+    check_request = urllib.request.Request(
+        f"{coordinator_url}/check_solution?api_key={config.API_KEY}",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    start_time = time.perf_counter()
+    try:
+        with urllib.request.urlopen(check_request, timeout=120) as response:
+            status, node = response.status, response.headers["X-Checker-Node"]
+    except urllib.error.HTTPError as e:
+        status, node = e.code, e.headers["X-Checker-Node"] or "-"
+    return time.perf_counter() - start_time, status, node
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run checker cluster locally")
+    parser.add_argument(
+        "--slots",
+        type=int,
+        nargs="+",
+        default=[4, 2, 1],
+        help="checks run at once by every node (one node per value)",
+    )
+    parser.add_argument("--backend", choices=("fake", "local"), default="fake")
+    parser.add_argument("--workload", default="c_8_tests")
+    parser.add_argument("--checks", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fake-latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=7100)
+    parser.add_argument(
+        "--kill-node",
+        action="store_true",
+        help="stop the first node when half of the checks are sent",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    if args.workload not in create_workloads():
+        print(f"Unknown workload {args.workload}")
+        return 2
+
+    coordinator_url = f"http://{HOST}:{args.port}"
+    coordinator_overrides = {"COORDINATOR": True, "NODE_TTL": 3.0}
+    processes = [start_process(args.port, coordinator_overrides, args)]
+    for i, slots in enumerate(args.slots, 1):
+        port = args.port + i
+        node_overrides = {
+            "CHECK_WORKERS": slots,
+            "COORDINATOR_URL": coordinator_url,
+            "NODE_URL": f"http://{HOST}:{port}",
+            "NODE_HEARTBEAT_INTERVAL": 1.0,
+        }
+        processes.append(start_process(port, node_overrides, args))
+
+    try:
+        if not wait_for_nodes(coordinator_url, len(args.slots), 30):
+            print("Nodes were not registered in the coordinator")
+            return 1
+
+        workload = create_workloads()[args.workload]
+        body = json.dumps(
+            {
+                "sourceCode": workload.source_code,
+                "tests": workload.tests,
+                "buildTimeout": workload.build_timeout,
+                "testTimeout": workload.test_timeout,
+            }
+        ).encode()
+
+        def run_check(i: int) -> tuple[float, int, str]:
+            if args.kill_node and i == args.checks // 2:
+                processes[1].terminate()
+            return send_check(coordinator_url, body)
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            results = list(executor.map(run_check, range(args.checks)))
+        total_time = time.perf_counter() - start_time
+        nodes = get_json(f"{coordinator_url}/nodes?api_key={config.API_KEY}")
+    finally:
+        for process in processes:
+            process.terminate()
+
+    latencies = [latency for latency, _, _ in results]
+    print(f"{'node':<24} {'slots':>5} {'checks':>6}")
+    by_node = Counter(node for _, status, node in results if status == 200)
+    for i, slots in enumerate(args.slots, 1):
+        url = f"http://{HOST}:{args.port + i}"
+        print(f"{url:<24} {slots:>5} {by_node[url]:>6}")
+    failed = sum(status != 200 for _, status, _ in results)
+    print(
+        f"failed: {failed}, nodes alive: {len(nodes['nodes'])}, "
+        f"p50: {percentile(latencies, 50):.4f}, p95: {percentile(latencies, 95):.4f}, "
+        f"throughput: {len(results) / total_time:.1f} checks/s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
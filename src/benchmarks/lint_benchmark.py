@@ -0,0 +1,321 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.linter.executor import LintExecutor
+from src.linter.linter import LintCache, LintError, lint_code
+
+# Compares the tokenizer-based linter with the character by character one it
+# replaced on large generated C and Java files, and linting of files already
+# linted (taken from the lint cache by content hash). Then a project of many
+# files is linted in the calling thread and by worker processes, while another
+# thread (as the ones waiting for docker do) measures how long it's stalled.
+# Usage: python3 -m src.benchmarks.lint_benchmark --lines 20000 --files 200
+
+
+@dataclass
+class LintReport:
+    method: str
+    language: str
+    lines: int
+    time: float
+    errors: int
+
+
+@dataclass
+class ProjectReport:
+    method: str
+    files: int
+    time: float
+    # CPU time of the process that lints the project (holding its GIL)
+    process_time: float
+    # longest delay of a thread waking up every millisecond
+    max_stall: float
+
+
+def lint_code_by_chars(code: str) -> list[LintError]:
+    # linter as it was before the tokenizer
+    errors: list[LintError] = []
+
+    indent_level = 0
+    space_length = None
+
+    line_number = 0
+    for line in code.split("\n"):
+        line_number += 1
+
+        if len(line) == 0:
+            continue
+
+        is_string = False
+        is_comment = False
+
+        current_indent = 0
+        indent_symbol = None
+        need_indentation_check = True
+        checking_indentation = True
+
+        prev_c: str | None = None
+        c: str | None = None
+        next_c: str | None = line[0]
+
+        indent_level_diff_pos = 0
+        indent_level_diff_neg = 0
+        len_line = len(line)
+        for i in range(0, len_line):
+            prev_c = None if c is None else c
+            c = next_c
+            next_c = None if i == len_line - 1 else line[i + 1]
+
+            if not is_comment and c == '"' and prev_c != "\\":
+                is_string = False if is_string else True
+
+            if not is_string and c == "/" and next_c == "/":
+                is_comment = True
+
+            if not is_string and not is_comment:
+                if c == "{":
+                    indent_level_diff_pos += 1
+                elif c == "}":
+                    indent_level_diff_neg -= 1
+
+            if checking_indentation:
+                if c != "\t" and c != " ":
+                    if (
+                        space_length is None
+                        and indent_symbol == " "
+                        and indent_level > 0
+                    ):
+                        space_length = int(current_indent / indent_level)
+                    checking_indentation = False
+                    continue
+                if indent_symbol is not None and c != indent_symbol:
+                    need_indentation_check = False
+                    errors.append({"line": line_number, "message": "indentation/mix"})
+                    checking_indentation = False
+                indent_symbol = c
+                current_indent += 1
+            elif not is_string and not is_comment and prev_c == ",":
+                if c != " " or next_c == " ":
+                    errors.append(
+                        {"line": line_number, "message": "spaces/punctuation"}
+                    )
+
+        indent_level += indent_level_diff_neg
+
+        if need_indentation_check:
+            expected_indent = indent_level
+            if indent_symbol == " " and space_length is not None:
+                expected_indent *= space_length
+            if current_indent != expected_indent and need_indentation_check:
+                errors.append({"line": line_number, "message": "indentation/bad"})
+
+        indent_level += indent_level_diff_pos
+
+    if len(code) > 0 and code[-1] != "\n":
+        errors.append({"line": line_number, "message": "line/noendnewline"})
+
+    return errors
+
+
+C_STATEMENTS = [
+    'printf("%d, %d\\n", a, b);',
+    "int values[3] = {1, 2, 3};",
+    "sum = add(a,b);  // missing space after comma",
+    "c = 'x';",
+    "/* block comment on one line */",
+    "result += (a * b) / (c + 1);",
+    'puts("string with { brace and , comma");',
+]
+
+JAVA_STATEMENTS = [
+    'System.out.println("value: " + value + ", done");',
+    "List<Integer> list = List.of(1, 2, 3);",
+    "map.put(key,value);  // missing space after comma",
+    "char c = 'y';",
+    "/* block comment on one line */",
+    "total = Math.max(total, compute(a, b));",
+    'builder.append("{ not a block }");',
+]
+
+
+def generate_code(statements: list[str], header: str, lines: int, seed: int) -> str:
+    # functions with nested blocks and an occasional badly indented line
+    rng = random.Random(seed)
+    result = [header, ""]
+    function = 0
+    while len(result) < lines:
+        function += 1
+        result.append(f"int function{function}(int a, int b) {{")
+        depth = 1
+        for _ in range(rng.randint(5, 40)):
+            indent = "    " * depth
+            if rng.random() < 0.02:
+                indent += "  "
+            choice = rng.random()
+            if choice < 0.15 and depth < 5:
+                result.append(f"{indent}if (a > b) {{")
+                depth += 1
+            elif choice < 0.3 and depth > 1:
+                depth -= 1
+                result.append("    " * depth + "}")
+            else:
+                result.append(indent + rng.choice(statements))
+        while depth > 1:
+            depth -= 1
+            result.append("    " * depth + "}")
+        result.append("}")
+        result.append("")
+    return "\n".join(result) + "\n"
+
+
+def create_sources(lines: int) -> dict[str, str]:
+    return {
+        "c": generate_code(C_STATEMENTS, "#include <stdio.h>", lines, 1),
+        "java": generate_code(JAVA_STATEMENTS, "import java.util.*;", lines, 2),
+    }
+
+
+def measure(lint: Callable[[str], list[LintError]], code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        lint(code)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def run_lint_benchmark(lines: int, repeat: int) -> list[LintReport]:
+    reports = []
+    for language, code in create_sources(lines).items():
+        baseline = lint_code_by_chars(code)
+        errors = lint_code(code)
+        if errors != baseline:
+            raise AssertionError(f"Linters disagree on generated {language} code")
+
+        cache = LintCache(10)
+        cache.lint(code)
+        methods: dict[str, Callable[[str], list[LintError]]] = {
+            "by_chars": lint_code_by_chars,
+            "tokenizer": lint_code,
+            "cached": cache.lint,
+        }
+        count = code.count("\n")
+        for method, lint in methods.items():
+            lint_time = measure(lint, code, repeat)
+            reports.append(LintReport(method, language, count, lint_time, len(errors)))
+    return reports
+
+
+def create_project(files: int, lines: int) -> dict[str, str]:
+    project = {"Makefile": "build:\n\tgcc *.c\n"}
+    for i in range(files):
+        if i % 2 == 0:
+            project[f"src/file{i}.c"] = generate_code(C_STATEMENTS, "", lines, i)
+        else:
+            project[f"src/File{i}.java"] = generate_code(JAVA_STATEMENTS, "", lines, i)
+    return project
+
+
+def measure_stall(run: Callable[[], object]) -> tuple[float, float, float]:
+    stopped = threading.Event()
+    max_stall = 0.0
+
+    def tick() -> None:
+        nonlocal max_stall
+        while not stopped.is_set():
+            start_time = time.perf_counter()
+            time.sleep(0.001)
+            max_stall = max(max_stall, time.perf_counter() - start_time - 0.001)
+
+    ticker = threading.Thread(target=tick)
+    ticker.start()
+    start_time = time.perf_counter()
+    start_process_time = time.process_time()
+    try:
+        run()
+    finally:
+        total_time = time.perf_counter() - start_time
+        process_time = time.process_time() - start_process_time
+        stopped.set()
+        ticker.join()
+    return total_time, process_time, max_stall
+
+
+def run_project_benchmark(
+    files: int, lines: int, workers: int, chunk_size: int
+) -> list[ProjectReport]:
+    project = create_project(files, lines)
+    reports = []
+    errors = None
+    for method, method_workers in (("thread", 0), ("pool", workers)):
+        # no cache, so every file is linted every time
+        executor = LintExecutor(method_workers, 3600.0, chunk_size, None)
+        try:
+            # starts worker processes
+            executor.lint(project)
+            result = {}
+
+            def run() -> None:
+                result["errors"] = executor.lint(project).errors
+
+            total_time, process_time, max_stall = measure_stall(run)
+        finally:
+            executor.close()
+        if errors is not None and result["errors"] != errors:
+            raise AssertionError(f"Linting by {method} differs")
+        errors = result["errors"]
+        reports.append(
+            ProjectReport(method, files, total_time, process_time, max_stall)
+        )
+    return reports
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark linter")
+    parser.add_argument("--lines", type=int, default=20000, help="lines of a file")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--files", type=int, default=200, help="files of a project")
+    parser.add_argument("--file-lines", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=256 * 1024)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    reports = run_lint_benchmark(args.lines, args.repeat)
+    baseline = {r.language: r.time for r in reports if r.method == "by_chars"}
+    print(
+        f"{'language':<9} {'method':<10} {'lines':>7} {'errors':>7} "
+        f"{'time, s':>8} {'speedup':>8}"
+    )
+    for report in reports:
+        speedup = baseline[report.language] / max(report.time, 1e-9)
+        print(
+            f"{report.language:<9} {report.method:<10} {report.lines:>7} "
+            f"{report.errors:>7} {report.time:8.4f} {speedup:7.1f}x"
+        )
+
+    print()
+    print(
+        f"{'project':<9} {'files':>7} {'time, s':>8} {'process cpu, s':>15} "
+        f"{'max stall, ms':>14}"
+    )
+    for project_report in run_project_benchmark(
+        args.files, args.file_lines, args.workers, args.chunk_size
+    ):
+        print(
+            f"{project_report.method:<9} {project_report.files:>7} "
+            f"{project_report.time:8.4f} {project_report.process_time:15.4f} "
+            f"{project_report.max_stall * 1000:14.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
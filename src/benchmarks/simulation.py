@@ -0,0 +1,56 @@
+import json
+import os
+
+from src.benchmarks.workloads import Workload
+from src.solution_checker.exec_engine import TIMEOUT_EXIT_CODE, ExecResult
+from src.solution_checker.sandbox.fake_backend import ExecHandler, FakeExec, FakeSandbox
+
+
+def create_simulated_handler(workload: Workload) -> ExecHandler:
+    # emulates the workload solution and the batch runner for the fake backend,
+    # so nothing is executed and only the checker's own work is measured
+    def succeed() -> ExecResult:
+        return ExecResult(exit_code=0, output=b"", timed_out=False, time=0.0)
+
+    def run_test(fake_sandbox: FakeSandbox, fake_exec: FakeExec) -> ExecResult:
+        assert fake_exec.timeout is not None
+        if workload.answer is None:
+            return ExecResult(
+                exit_code=TIMEOUT_EXIT_CODE,
+                output=b"",
+                timed_out=True,
+                time=fake_exec.timeout,
+            )
+        test_input = fake_sandbox.read(fake_exec.environment["input_path"])
+        fake_sandbox.write(
+            fake_exec.environment["output_path"], workload.answer(test_input)
+        )
+        return succeed()
+
+    def run_batch(fake_sandbox: FakeSandbox, fake_exec: FakeExec) -> ExecResult:
+        manifest_path = fake_exec.command.split()[-1]
+        manifest = json.loads(fake_sandbox.read(manifest_path))
+        io_path = os.path.dirname(manifest_path)
+
+        results = []
+        for i in range(manifest["testsCount"]):
+            fake_sandbox.write(f"{io_path}/results/{i}.stdout", b"")
+            if workload.answer is None:
+                time = manifest["testTimeout"]
+                results.append({"exitCode": -9, "time": time, "timedOut": True})
+                break
+            test_input = fake_sandbox.read(f"{io_path}/inputs/{i}.txt")
+            answer = workload.answer(test_input)
+            fake_sandbox.write(f"{io_path}/results/{i}.output", answer)
+            results.append({"exitCode": 0, "time": 0.0, "timedOut": False})
+        fake_sandbox.write(f"{io_path}/results/results.json", json.dumps(results))
+        return succeed()
+
+    def handle(fake_sandbox: FakeSandbox, fake_exec: FakeExec) -> ExecResult:
+        if fake_exec.name == "test":
+            return run_test(fake_sandbox, fake_exec)
+        if fake_exec.name == "batch_test":
+            return run_batch(fake_sandbox, fake_exec)
+        return succeed()
+
+    return handle
@@ -0,0 +1,114 @@
+import argparse
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.solution_checker.check_steps.build import build_solution
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox import create_backend
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
+from src.solution_checker.utils import TarStream
+
+# Compares two ways to get another test sandbox with a built solution: building
+# the solution again in a fresh sandbox and starting the sandbox from the
+# snapshot of the built source tree, which also shows what taking the snapshot
+# costs every check. Creating the sandbox is measured separately, checks take
+# it from the pool.
+# Usage: python3 -m src.benchmarks.snapshot_benchmark --files 20 --repeat 5
+
+
+@dataclass
+class SnapshotReport:
+    method: str
+    # median seconds
+    time: float
+
+
+def create_project(files: int) -> dict[str, str]:
+    project = {
+        "Makefile": "build:\n\tgcc -O2 -o solution *.c\nrun:\n\t./solution\n",
+        "main.c": "int main(void) {\n    return 0;\n}\n",
+    }
+    for i in range(files):
+        project[f"unit{i}.c"] = "".join(
+            f"int function{i}_{j}(int a, int b) {{\n"
+            f"    return a * {j} + b / ({j} + 1);\n}}\n"
+            for j in range(200)
+        )
+    return project
+
+
+def median_time(run: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times)
+
+
+def run_snapshot_benchmark(
+    backend: SandboxBackend, files: int, repeat: int
+) -> list[SnapshotReport]:
+    source = TarStream(create_project(files), "source/")
+    sandbox = backend.create()
+    try:
+        backend.put_archive(sandbox, "/root", source)
+        build_result = build_solution(backend, sandbox, 600)
+        if build_result.status != CheckStatus.OK:
+            raise AssertionError(f"Project was not built: {build_result.message}")
+        snapshot = backend.get_archive(sandbox, "/root/source")
+    finally:
+        backend.destroy(sandbox)
+
+    sandboxes: list[Sandbox] = []
+
+    def create() -> None:
+        sandboxes.append(backend.create())
+
+    def rebuild() -> None:
+        sandbox = sandboxes.pop()
+        backend.put_archive(sandbox, "/root", source)
+        build_solution(backend, sandbox, 600)
+        backend.destroy(sandbox)
+
+    def fork() -> None:
+        sandbox = sandboxes.pop()
+        backend.put_archive(sandbox, "/root", snapshot)
+        backend.destroy(sandbox)
+
+    def take_snapshot() -> None:
+        backend.get_archive(sandboxes[-1], "/root/source")
+
+    reports = [SnapshotReport("create", median_time(create, repeat * 3))]
+    reports.append(SnapshotReport("rebuild", median_time(rebuild, repeat)))
+    reports.append(SnapshotReport("fork", median_time(fork, repeat)))
+    # snapshot is taken once per check, from a sandbox with the built solution
+    backend.put_archive(sandboxes[-1], "/root", snapshot)
+    reports.append(SnapshotReport("snapshot", median_time(take_snapshot, repeat)))
+    for sandbox in sandboxes:
+        backend.destroy(sandbox)
+    return reports
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark build snapshots")
+    parser.add_argument("--backend", default="local", help="docker or local")
+    parser.add_argument("--files", type=int, default=20, help="C files to build")
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    backend = create_backend(args.backend)
+    print(f"{'method':<9} {'time, ms':>9}")
+    for report in run_snapshot_benchmark(backend, args.files, args.repeat):
+        print(f"{report.method:<9} {report.time * 1000:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
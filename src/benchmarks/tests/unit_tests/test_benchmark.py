@@ -0,0 +1,108 @@
+import unittest
+
+from src.benchmarks.archive_benchmark import (
+    buffered_tar,
+    create_files,
+    run_archive_benchmark,
+)
+from src.benchmarks.benchmark import compare_with_baseline, percentile, run_workload
+from src.benchmarks.lint_benchmark import run_lint_benchmark, run_project_benchmark
+from src.benchmarks.simulation import create_simulated_handler
+from src.benchmarks.workloads import Workload, create_workloads
+from src.solution_checker.container_pool import ContainerPool
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox.backend import SandboxBackend
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.sandbox.local_backend import LocalBackend
+from src.solution_checker.solution_checker import SolutionChecker
+from src.solution_checker.utils import TarStream
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_compare_with_baseline(self) -> None:
+        workload = create_workloads()["c_1_test"]
+        report = run_workload(
+            lambda _: {"checkResult": CheckStatus.OK.value}, workload, 2, 1, 0
+        )
+        baseline = {
+            "c_1_test": {"p50": report.p50 / 2, "p95": 0, "p99": 0, "throughput": 0}
+        }
+        regressions = compare_with_baseline([report], baseline, 10.0)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("c_1_test p50"))
+
+
+class ArchiveBenchmarkTest(unittest.TestCase):
+    def test_stream_matches_buffered_archive(self) -> None:
+        files = create_files(3000, 3)
+        files["long/" + "x" * 200] = "привет"
+        stream = TarStream(files, "source/")
+        buffered = buffered_tar(files, "source/").read()
+        self.assertEqual(len(stream), len(stream.getvalue()))
+        # buffered archive is padded to the whole tar record
+        self.assertEqual(buffered[: len(stream)], stream.getvalue())
+
+    def test_run(self) -> None:
+        reports = run_archive_benchmark(1024, 2, 1)
+        self.assertEqual(
+            {(report.workload, report.method) for report in reports},
+            {(w, m) for w in ("source", "inputs") for m in ("buffered", "stream")},
+        )
+
+
+class LintBenchmarkTest(unittest.TestCase):
+    def test_run(self) -> None:
+        # linters disagreeing on generated code fail the benchmark
+        reports = run_lint_benchmark(300, 1)
+        self.assertEqual(
+            {(report.language, report.method) for report in reports},
+            {
+                (language, method)
+                for language in ("c", "java")
+                for method in ("by_chars", "tokenizer", "cached")
+            },
+        )
+
+    def test_project(self) -> None:
+        # files linted in the thread and by worker processes must be the same
+        reports = run_project_benchmark(6, 50, 2, 1000)
+        self.assertEqual([report.method for report in reports], ["thread", "pool"])
+
+
+class BackendsTest(unittest.TestCase):
+    def check(self, backend: SandboxBackend, workload: Workload, batch: bool) -> None:
+        pool = ContainerPool(1, 600, 20, backend)
+        try:
+            result = SolutionChecker(
+                workload.source_code,
+                workload.tests,
+                workload.build_timeout,
+                workload.test_timeout,
+                pool,
+                batch,
+            ).check_solution()
+        finally:
+            pool.close()
+        self.assertEqual(result.status, workload.expected_status, msg=result.json())
+        if workload.expected_status == CheckStatus.OK:
+            self.assertEqual(result.tests_passed, len(workload.tests))
+
+    def test_workloads(self) -> None:
+        workloads = create_workloads()
+        for name in ("c_8_tests", "py_8_tests", "py_timeout"):
+            workload = workloads[name]
+            for batch in (False, True):
+                backends = [
+                    LocalBackend(),
+                    FakeBackend(create_simulated_handler(workload)),
+                ]
+                for backend in backends:
+                    with self.subTest(name=name, batch=batch, backend=backend.name):
+                        self.check(backend, workload, batch)
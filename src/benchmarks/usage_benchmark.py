@@ -0,0 +1,96 @@
+import argparse
+import multiprocessing
+import statistics
+import sys
+from dataclasses import dataclass
+
+from src.solution_checker.sandbox.local_backend import LocalBackend
+from src.solution_checker.solution_checker import SolutionChecker
+
+# Shows how stable test time and CPU time of the same solution are, when the
+# host is idle and when it's busy with other processes. Tests are run by the
+# local backend (on the host, without containers).
+# Usage: python3 -m src.benchmarks.usage_benchmark --checks 10 --load 2
+
+SOLUTION = {
+    "Makefile": "run:\n\tpython3 main.py\n",
+    "main.py": "n = int(input())\nprint(sum(i * i for i in range(n)))\n",
+}
+
+
+@dataclass
+class UsageReport:
+    load: int
+    batch: bool
+    time_mean: float
+    time_stdev: float
+    cpu_mean: float
+    cpu_stdev: float
+
+
+def burn() -> None:
+    while True:
+        pass
+
+
+def run_checks(checks: int, batch: bool) -> tuple[list[float], list[float]]:
+    test = ["300000", str(sum(i * i for i in range(300000))) + "\n"]
+    times, cpu_times = [], []
+    for _ in range(checks):
+        result = SolutionChecker(
+            SOLUTION, [test], 5, 10, None, batch, backend=LocalBackend()
+        ).check_solution()
+        if result.tests_cpu_time is None:
+            raise AssertionError(f"CPU time is not measured: {result.message}")
+        times.append(result.tests_time)
+        cpu_times.append(result.tests_cpu_time)
+    return times, cpu_times
+
+
+def run_usage_benchmark(checks: int, load: int) -> list[UsageReport]:
+    reports = []
+    for processes in sorted({0, load}):
+        burners = [multiprocessing.Process(target=burn) for _ in range(processes)]
+        for burner in burners:
+            burner.start()
+        try:
+            for batch in (False, True):
+                times, cpu_times = run_checks(checks, batch)
+                reports.append(
+                    UsageReport(
+                        processes,
+                        batch,
+                        statistics.mean(times),
+                        statistics.pstdev(times),
+                        statistics.mean(cpu_times),
+                        statistics.pstdev(cpu_times),
+                    )
+                )
+        finally:
+            for burner in burners:
+                burner.kill()
+    return reports
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark test time stability")
+    parser.add_argument("--checks", type=int, default=10)
+    parser.add_argument("--load", type=int, default=2, help="busy processes")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    print(f"{'load':>4} {'runner':<7} {'time, s':>14} {'cpu time, s':>14}")
+    for report in run_usage_benchmark(args.checks, args.load):
+        runner = "batch" if report.batch else "exec"
+        print(
+            f"{report.load:>4} {runner:<7} "
+            f"{report.time_mean:7.3f} ±{report.time_stdev:5.3f} "
+            f"{report.cpu_mean:7.3f} ±{report.cpu_stdev:5.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
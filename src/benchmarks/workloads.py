@@ -0,0 +1,157 @@
+import random
+from dataclasses import dataclass
+from typing import Callable
+
+from src.solution_checker.models import CheckStatus
+
+
+@dataclass
+class Workload:
+    name: str
+    source_code: dict[str, str]
+    tests: list[list[str]]
+    build_timeout: float
+    test_timeout: float
+    expected_status: CheckStatus
+    # computes answer of the solution for the fake backend, which doesn't run
+    # anything, None means that the solution never finishes
+    answer: Callable[[str], str] | None
+
+
+SOURCE_CODE_C_MULTIPLE_FILES = {
+    "Makefile": """
+build: main.c sum.o
+	gcc main.c sum.o -o solution
+run:
+	./solution
+sum.o: lib/sum.h lib/sum.c
+	gcc -c lib/sum.c
+""",
+    "main.c": """
+#include "stdio.h"
+
+#include "lib/sum.h"
+
+int main() {
+    int a, b;
+    scanf("%d %d", &a, &b);
+
+    printf("%d", sum(a, b));
+
+    return 0;
+}
+""",
+    "lib/sum.c": """
+#include "sum.h"
+int sum(int a, int b) {
+    return a + b;
+}
+""",
+    "lib/sum.h": """
+int sum(int, int);
+""",
+}
+
+SOURCE_CODE_PY_FILE_IO = {
+    "Makefile": """
+run:
+	python3 main.py $(ARGS)
+""",
+    "main.py": """
+import sys
+
+with open(sys.argv[1]) as fin:
+    numbers = list(map(int, fin.read().split()))
+
+with open(sys.argv[2], "w") as fout:
+    fout.write(str(sum(numbers)))
+""",
+}
+
+SOURCE_CODE_RUNTIME_TIMEOUT = {
+    "Makefile": """
+run:
+	python3 main.py
+""",
+    "main.py": """
+while True:
+    pass
+""",
+}
+
+
+def sum_answer(test_input: str) -> str:
+    return str(sum(map(int, test_input.split())))
+
+
+def create_sum_tests(
+    count: int, numbers_count: int = 2, seed: int = 0
+) -> list[list[str]]:
+    # tests are generated with fixed seed, so every run checks the same data
+    rnd = random.Random(seed)
+    tests = []
+    for _ in range(count):
+        numbers = [rnd.randint(-1000, 1000) for _ in range(numbers_count)]
+        tests.append([" ".join(map(str, numbers)), str(sum(numbers))])
+    return tests
+
+
+def create_workloads() -> dict[str, Workload]:
+    workloads = [
+        Workload(
+            "c_1_test",
+            SOURCE_CODE_C_MULTIPLE_FILES,
+            create_sum_tests(1),
+            4,
+            1,
+            CheckStatus.OK,
+            sum_answer,
+        ),
+        Workload(
+            "c_8_tests",
+            SOURCE_CODE_C_MULTIPLE_FILES,
+            create_sum_tests(8),
+            4,
+            1,
+            CheckStatus.OK,
+            sum_answer,
+        ),
+        Workload(
+            "c_32_tests",
+            SOURCE_CODE_C_MULTIPLE_FILES,
+            create_sum_tests(32),
+            4,
+            1,
+            CheckStatus.OK,
+            sum_answer,
+        ),
+        Workload(
+            "py_8_tests",
+            SOURCE_CODE_PY_FILE_IO,
+            create_sum_tests(8),
+            4,
+            1,
+            CheckStatus.OK,
+            sum_answer,
+        ),
+        # about 1 MB of input for every test
+        Workload(
+            "py_large_io",
+            SOURCE_CODE_PY_FILE_IO,
+            create_sum_tests(4, numbers_count=200000),
+            4,
+            2,
+            CheckStatus.OK,
+            sum_answer,
+        ),
+        Workload(
+            "py_timeout",
+            SOURCE_CODE_RUNTIME_TIMEOUT,
+            create_sum_tests(1),
+            4,
+            0.5,
+            CheckStatus.EXECUTION_TIMEOUT,
+            None,
+        ),
+    ]
+    return {workload.name: workload for workload in workloads}
@@ -1,12 +1,271 @@
 import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
 
 from flask import Flask, request, Response
 import config
 
-from src.solution_checker.solution_checker import SolutionChecker
+from src.linter.executor import LintExecutor
+from src.linter.rules import RULES
+from src.solution_checker.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    CheckCost,
+    CostModel,
+    Quota,
+    Ticket,
+)
+from src.solution_checker.batch import check_admitted, run_completed
+from src.solution_checker.build_cache import BuildCache
+from src.solution_checker.check_queue import (
+    CheckQueue,
+    CheckQueueFullError,
+    get_workers_count,
+)
+from src.solution_checker.check_steps.test import create_io_archive
+from src.solution_checker.comparators import ComparatorSpec, parse_comparator
+from src.solution_checker.container_pool import ContainerPool
+from src.solution_checker.coordinator import (
+    DEFAULT_POOL,
+    Coordinator,
+    DispatchResult,
+    NodeAgent,
+    NodeCapacity,
+    NoNodeAvailableError,
+    get_free_memory,
+    get_load,
+)
+from src.solution_checker.languages import detect_language
+from src.solution_checker.metrics import REGISTRY, FunctionGauge
+from src.solution_checker.models import CheckResult, CheckStatus
+from src.solution_checker.result_cache import ResultCache
+from src.solution_checker.scheduler import PriorityScheduler
+from src.solution_checker.sandbox import create_backend
+from src.solution_checker.solution_checker import (
+    CHECK_STAGES,
+    MakefileValidationError,
+    SolutionChecker,
+)
+from src.solution_checker.utils import TarStream
 
 app = Flask(__name__)
 
+check_workers = config.CHECK_WORKERS or get_workers_count(config.CHECK_MEMORY)
+
+max_running_checks = config.MAX_RUNNING_CHECKS or check_workers
+
+# every running check may call dockerd from all of its test workers at once,
+# plus the warm pool refilling and the events stream
+backend = create_backend(
+    config.SANDBOX_BACKEND,
+    config.DOCKER_MAX_CONNECTIONS or max_running_checks * config.MAX_TEST_WORKERS + 2,
+)
+
+container_pool = (
+    ContainerPool(
+        config.CONTAINER_POOL_SIZE,
+        config.CONTAINER_POOL_MAX_AGE,
+        config.CONTAINER_POOL_MAX_USES,
+        backend,
+        (backend.default_image, *config.LANGUAGE_IMAGES.values()),
+    )
+    if config.CONTAINER_POOL_SIZE > 0
+    else None
+)
+
+build_cache = (
+    BuildCache(config.BUILD_CACHE_DIR, config.BUILD_CACHE_MAX_BYTES)
+    if config.BUILD_CACHE_DIR
+    else None
+)
+
+result_cache = (
+    ResultCache(config.RESULT_CACHE_TTL, config.RESULT_CACHE_SIZE)
+    if config.RESULT_CACHE_SIZE > 0
+    else None
+)
+
+lint_executor = LintExecutor(
+    config.LINT_WORKERS, config.LINT_CPU_BUDGET, config.LINT_CHUNK_SIZE
+)
+
+admission = AdmissionController(
+    config.ADMISSION_MEMORY_BUDGET or max_running_checks * config.CHECK_MEMORY,
+    CostModel(config.CHECK_MEMORY, config.LANGUAGE_MEMORY),
+    {key: Quota.from_dict(quota) for key, quota in config.API_KEY_QUOTAS.items()},
+    Quota.from_dict(config.DEFAULT_QUOTA),
+)
+
+# both synchronous checks and queued ones are started by the scheduler
+scheduler = PriorityScheduler(
+    max_running_checks,
+    config.PRIORITY_WEIGHTS,
+    config.PRIORITY_AGING,
+    config.PRIORITY_MAX_WAITING,
+    admission,
+    config.DEFAULT_PRIORITY,
+)
+
+check_queue = CheckQueue(
+    max_running_checks,
+    config.CHECK_QUEUE_SIZE,
+    config.CHECK_JOB_TTL,
+    scheduler,
+    config.CALLBACK_HOSTS,
+)
+
+coordinator = (
+    Coordinator(
+        config.NODE_TTL,
+        config.DISPATCH_ATTEMPTS,
+        config.DISPATCH_TIMEOUT,
+        config.CHECK_MEMORY,
+    )
+    if config.COORDINATOR
+    else None
+)
+
+REGISTRY.register(
+    FunctionGauge(
+        "checker_queue_depth",
+        "Checks waiting in the queue",
+        lambda: check_queue.stats()["queued"],
+    )
+)
+REGISTRY.register(
+    FunctionGauge(
+        "checker_admission_rejected_total",
+        "Checks rejected with 429 by admission control",
+        lambda: admission.rejected + scheduler.rejected,
+        "counter",
+    )
+)
+REGISTRY.register(
+    FunctionGauge(
+        "checker_scheduler_waiting_checks",
+        "Checks waiting in the scheduler for a free slot",
+        lambda: sum(scheduler.stats()["waiting"].values()),
+    )
+)
+REGISTRY.register(
+    FunctionGauge(
+        "checker_admission_reserved_memory_bytes",
+        "Memory reserved by running checks",
+        lambda: admission.stats()["memory"],
+    )
+)
+if container_pool is not None:
+    pool = container_pool
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_pool_idle_containers",
+            "Idle containers in the warm pool",
+            lambda: pool.stats()["idle"],
+        )
+    )
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_pool_hits_total",
+            "Containers taken from the warm pool",
+            lambda: pool.hits,
+            "counter",
+        )
+    )
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_pool_misses_total",
+            "Containers created because the warm pool was empty",
+            lambda: pool.misses,
+            "counter",
+        )
+    )
+if build_cache is not None:
+    builds = build_cache
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_build_cache_hits_total",
+            "Builds restored from cache",
+            lambda: builds.hits,
+            "counter",
+        )
+    )
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_build_cache_misses_total",
+            "Builds not found in cache",
+            lambda: builds.misses,
+            "counter",
+        )
+    )
+if result_cache is not None:
+    results = result_cache
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_result_cache_hits_total",
+            "Check results taken from cache or from identical running check",
+            lambda: results.hits + results.deduplicated,
+            "counter",
+        )
+    )
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_result_cache_misses_total",
+            "Check results not found in cache",
+            lambda: results.misses,
+            "counter",
+        )
+    )
+if coordinator is not None:
+    nodes_coordinator = coordinator
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_nodes",
+            "Checker nodes registered in the coordinator",
+            lambda: len(nodes_coordinator.nodes()),
+        )
+    )
+    REGISTRY.register(
+        FunctionGauge(
+            "checker_dispatch_retries_total",
+            "Checks sent to another node after a node failed",
+            lambda: nodes_coordinator.retries,
+            "counter",
+        )
+    )
+
+
+def node_capacity() -> NodeCapacity:
+    scheduler_stats = scheduler.stats()
+    warm = {}
+    if container_pool is not None:
+        pools = {image: language for language, image in config.LANGUAGE_IMAGES.items()}
+        pools[backend.default_image] = DEFAULT_POOL
+        for image, idle in container_pool.stats()["idleByImage"].items():
+            if image in pools:
+                warm[pools[image]] = idle
+    return NodeCapacity(
+        slots=scheduler.slots,
+        running=scheduler_stats["running"] + sum(scheduler_stats["waiting"].values()),
+        cpu_count=os.cpu_count() or 1,
+        load=get_load(),
+        free_memory=get_free_memory(),
+        warm=warm,
+    )
+
+
+node_agent = (
+    NodeAgent(
+        config.COORDINATOR_URL,
+        config.NODE_URL,
+        config.API_KEY,
+        node_capacity,
+        config.NODE_HEARTBEAT_INTERVAL,
+    )
+    if config.COORDINATOR_URL
+    else None
+)
+
 
 class ResponseJSON(Response):
     default_mimetype = "application/json"
@@ -17,20 +276,46 @@ def handle_bad_request() -> tuple[str, int]:
     return json.dumps({"message": "Bad request!"}), 400
 
 
-@app.route("/check_solution", methods=["POST"])
-def check_solution_view() -> Response:
+def check_api_key() -> Response | None:
+    # admin key, the only one accepted by endpoints managing the checker
+    return check_key(request.args.get("api_key") == config.API_KEY)
+
+
+def check_tenant_key() -> Response | None:
+    # keys with quotas may only submit checks and get results of their own ones
     api_key = request.args.get("api_key")
-    if api_key != config.API_KEY:
+    return check_key(api_key == config.API_KEY or api_key in config.API_KEY_QUOTAS)
+
+
+def check_key(valid: bool) -> Response | None:
+    if not valid:
         response = json.dumps(
             {
                 "error": "You need to provide correct api_key as GET param to access this API"
             }
         )
         return ResponseJSON(response, status=401)
+    return None
+
+
+@dataclass
+class CheckOptions:
+    # everything of the check request but the source code
+    tests: list[list[str]]
+    build_timeout: float
+    test_timeout: float
+    test_workers: int
+    fail_fast: bool
+    stages: tuple[str, ...]
+    collect_timings: bool
+    comparators: list[ComparatorSpec]
+    lint_rules: tuple[str, ...] | None = None
+    cpu_time_limit: bool = False
+    io_archive: TarStream | None = None
 
-    check_request = request.json
 
-    if type(check_request) != dict:
+def create_checker(check_request: Any) -> SolutionChecker | Response:
+    if not isinstance(check_request, dict):
         response = json.dumps({"error": "We accept only dict as a root element."})
         return ResponseJSON(response, status=400)
 
@@ -43,12 +328,21 @@ def check_solution_view() -> Response:
         )
         return ResponseJSON(response, status=400)
 
-    if type(source_code) != dict or type(tests) != list:
+    if not isinstance(source_code, dict) or not isinstance(tests, list):
         response = json.dumps(
             {"error": '"sourceCode" must be dict and "tests" must be list'}
         )
         return ResponseJSON(response, status=400)
 
+    options = parse_check_options(check_request, tests)
+    if isinstance(options, Response):
+        return options
+    return build_checker(source_code, options)
+
+
+def parse_check_options(
+    check_request: dict[str, Any], tests: list[Any]
+) -> CheckOptions | Response:
     build_timeout = check_request.get("buildTimeout", config.DEFAULT_BUILD_TIMEOUT)
     if build_timeout > config.MAX_BUILD_TIMEOUT:
         response = json.dumps(
@@ -70,17 +364,462 @@ def check_solution_view() -> Response:
         )
         return ResponseJSON(response, status=401)
 
-    # try:
-    check_result = SolutionChecker(
-        check_request["sourceCode"],
-        check_request["tests"],
+    test_workers = check_request.get("testWorkers", 1)
+    if (
+        isinstance(test_workers, bool)
+        or not isinstance(test_workers, int)
+        or not 1 <= test_workers <= config.MAX_TEST_WORKERS
+    ):
+        response = json.dumps(
+            {
+                "error": f"testWorkers must be integer from 1 to {config.MAX_TEST_WORKERS}"
+            }
+        )
+        return ResponseJSON(response, status=400)
+
+    fail_fast = check_request.get("failFast", True)
+    stages = check_request.get("stages", list(CHECK_STAGES))
+    if (
+        not isinstance(fail_fast, bool)
+        or not isinstance(stages, list)
+        or len(stages) == 0
+        or not set(stages) <= set(CHECK_STAGES)
+    ):
+        response = json.dumps(
+            {
+                "error": '"failFast" must be bool and "stages" must be non-empty list of '
+                + ", ".join(CHECK_STAGES)
+            }
+        )
+        return ResponseJSON(response, status=400)
+
+    # test is a list of input, expected output and optionally its comparator
+    if any(
+        not isinstance(test, list)
+        or not 2 <= len(test) <= 3
+        or not all(isinstance(item, str) for item in test[:2])
+        for test in tests
+    ):
+        response = json.dumps(
+            {"error": "Every test must be list of input and output strings"}
+        )
+        return ResponseJSON(response, status=400)
+
+    # comparator may be set for all tests and overridden by the third test item
+    try:
+        default_comparator = parse_comparator(check_request.get("comparator", "exact"))
+        comparators = [
+            parse_comparator(test[2]) if len(test) > 2 else default_comparator
+            for test in tests
+        ]
+    except ValueError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=400)
+    tests = [test[:2] for test in tests]
+
+    lint_rules = check_request.get("lintRules")
+    if lint_rules is not None and (
+        not isinstance(lint_rules, list) or not set(lint_rules) <= RULES.keys()
+    ):
+        response = json.dumps(
+            {"error": '"lintRules" must be list of ' + ", ".join(RULES)}
+        )
+        return ResponseJSON(response, status=400)
+
+    cpu_time_limit = check_request.get("cpuTimeLimit", False)
+    if not isinstance(cpu_time_limit, bool):
+        response = json.dumps({"error": '"cpuTimeLimit" must be bool'})
+        return ResponseJSON(response, status=400)
+
+    return CheckOptions(
+        tests,
         build_timeout,
         test_timeout,
-    ).check_solution()
+        test_workers,
+        fail_fast,
+        tuple(stages),
+        bool(check_request.get("timings", False)),
+        comparators,
+        tuple(lint_rules) if lint_rules is not None else None,
+        cpu_time_limit,
+    )
+
+
+def build_checker(
+    source_code: dict[str, str], options: CheckOptions
+) -> SolutionChecker:
+    return SolutionChecker(
+        source_code,
+        options.tests,
+        options.build_timeout,
+        options.test_timeout,
+        container_pool,
+        config.BATCH_TESTS,
+        build_cache,
+        result_cache,
+        options.test_workers,
+        options.fail_fast,
+        options.stages,
+        options.collect_timings,
+        backend,
+        config.MAX_OUTPUT_SIZE,
+        options.comparators,
+        config.LANGUAGE_IMAGES,
+        options.io_archive,
+        lint_executor,
+        options.lint_rules,
+        options.cpu_time_limit,
+        config.TEST_RETRIES,
+    )
+
+
+def get_priority(
+    check_request: Any, default: str = config.DEFAULT_PRIORITY
+) -> str | Response:
+    priority = check_request.get("priority", default)
+    if not isinstance(priority, str) or priority not in config.PRIORITY_WEIGHTS:
+        response = json.dumps(
+            {"error": '"priority" must be one of ' + ", ".join(config.PRIORITY_WEIGHTS)}
+        )
+        return ResponseJSON(response, status=400)
+    return priority
+
+
+def too_many_requests(error: AdmissionRejectedError) -> Response:
+    response = ResponseJSON(json.dumps({"error": str(error)}), status=429)
+    response.headers["Retry-After"] = error.retry_after_header
+    return response
+
+
+def estimate_cost(checker: SolutionChecker) -> CheckCost:
+    tests = len(checker.tests) if "test" in checker.stages else 0
+    return admission.cost_model.estimate(
+        checker.language,
+        checker.build_timeout,
+        checker.test_timeout,
+        tests,
+        checker.test_workers,
+    )
+
+
+def admit_check(checker: SolutionChecker) -> Ticket | Response:
+    cost = estimate_cost(checker)
+    try:
+        return admission.admit(request.args["api_key"], cost, checker.language)
+    except AdmissionRejectedError as e:
+        return too_many_requests(e)
+
+
+@app.route("/check_solution", methods=["POST"])
+def check_solution_view() -> Response:
+    error_response = check_tenant_key()
+    if error_response is not None:
+        return error_response
+
+    if coordinator is not None:
+        return dispatch_check(coordinator, "/check_solution")
+
+    check_request: Any = request.json
+    checker = create_checker(check_request)
+    if isinstance(checker, Response):
+        return checker
+    priority = get_priority(check_request)
+    if isinstance(priority, Response):
+        return priority
+
+    ticket = admit_check(checker)
+    if isinstance(ticket, Response):
+        return ticket
+    try:
+        queue_time = scheduler.acquire(priority, ticket)
+    except AdmissionRejectedError as e:
+        return too_many_requests(e)
+
+    check_result = None
+    try:
+        check_result = checker.check_solution()
+    except MakefileValidationError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=400)
+    finally:
+        scheduler.release(ticket, check_result)
+    check_result.queue_time = round(queue_time, 4)
     return ResponseJSON(check_result.json())
-    # except Exception as e:
-    #     response = json.dumps({"error": str(e)})
-    #     return ResponseJSON(response, status=500)
+
+
+def dispatch_check(coordinator: Coordinator, path: str) -> Response:
+    # request is validated by the node, the coordinator only needs the language
+    check_request: Any = request.json
+    source_code = (
+        check_request.get("sourceCode") if isinstance(check_request, dict) else None
+    )
+    language = detect_language(source_code) if isinstance(source_code, dict) else None
+    try:
+        result = coordinator.dispatch(
+            f"{path}?{request.query_string.decode()}", request.get_data(), language
+        )
+    except NoNodeAvailableError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=503)
+    response = ResponseJSON(result.body, status=result.status)
+    response.headers["X-Checker-Node"] = result.node
+    if result.retry_after is not None:
+        response.headers["Retry-After"] = result.retry_after
+    return response
+
+
+def dispatch_get_check(coordinator: Coordinator, job_id: str) -> Response:
+    # check is looked up on the node which got it, it checks the key itself
+    try:
+        result = coordinator.get_check(
+            job_id, f"/checks/{job_id}?{request.query_string.decode()}"
+        )
+    except NoNodeAvailableError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=503)
+    if result is None:
+        error = json.dumps({"error": "Check with such id was not found"})
+        return ResponseJSON(error, status=404)
+    response = ResponseJSON(result.body, status=result.status)
+    response.headers["X-Checker-Node"] = result.node
+    return response
+
+
+@app.route("/check_batch", methods=["POST"])
+def check_batch_view() -> Response:
+    error_response = check_tenant_key()
+    if error_response is not None:
+        return error_response
+
+    batch_request: Any = request.json
+    if not isinstance(batch_request, dict):
+        response = json.dumps({"error": "We accept only dict as a root element."})
+        return ResponseJSON(response, status=400)
+
+    tests, submissions = batch_request.get("tests"), batch_request.get("submissions")
+    if (
+        not isinstance(tests, list)
+        or not isinstance(submissions, list)
+        or len(submissions) == 0
+    ):
+        response = json.dumps(
+            {"error": '"tests" must be list and "submissions" must be non-empty list'}
+        )
+        return ResponseJSON(response, status=400)
+    if len(submissions) > config.MAX_BATCH_SIZE:
+        response = json.dumps(
+            {
+                "error": f"Too many submissions, maximum allowed is {config.MAX_BATCH_SIZE}"
+            }
+        )
+        return ResponseJSON(response, status=400)
+    for i, submission in enumerate(submissions):
+        if not isinstance(submission, dict) or not isinstance(
+            submission.get("sourceCode"), dict
+        ):
+            response = json.dumps(
+                {"error": f'Submission {i} must be dict with "sourceCode" dict'}
+            )
+            return ResponseJSON(response, status=400)
+
+    # tests and options are validated once for the whole batch
+    options = parse_check_options(batch_request, tests)
+    if isinstance(options, Response):
+        return options
+    priority = get_priority(batch_request, config.BATCH_PRIORITY)
+    if isinstance(priority, Response):
+        return priority
+
+    ids = [submission.get("id", i) for i, submission in enumerate(submissions)]
+    if coordinator is not None:
+        path = f"/check_solution?{request.query_string.decode()}"
+        common = {**batch_request, "priority": priority}
+        del common["submissions"]
+        lines = dispatch_batch(coordinator, path, common, submissions)
+    else:
+        if config.BATCH_TESTS and options.test_workers == 1:
+            # inputs of tests are encoded once and uploaded to every sandbox
+            options.io_archive = create_io_archive(
+                options.tests,
+                options.test_timeout,
+                config.MAX_OUTPUT_SIZE,
+                options.cpu_time_limit,
+            )
+        lines = check_batch(
+            [
+                build_checker(submission["sourceCode"], options)
+                for submission in submissions
+            ],
+            request.args["api_key"],
+            priority,
+        )
+
+    def generate() -> Iterator[str]:
+        for i, line in lines:
+            yield json.dumps({"index": i, "id": ids[i], **line}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+def check_batch(
+    checkers: list[SolutionChecker], api_key: str, priority: str
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    def admit(checker: SolutionChecker) -> Ticket:
+        return admission.admit(api_key, estimate_cost(checker), checker.language)
+
+    def create_task(checker: SolutionChecker) -> Callable[[], CheckResult]:
+        return lambda: check_admitted(checker, admit, scheduler, priority)
+
+    # twice as many checks as slots, so the next ones are already waiting in
+    # the scheduler when running ones finish
+    tasks = [create_task(checker) for checker in checkers]
+    for i, result, error in run_completed(tasks, scheduler.slots * 2):
+        if result is None:
+            yield i, {"checkResult": CheckStatus.UNKNOWN.value, "error": str(error)}
+        else:
+            yield i, result.to_dict()
+
+
+def dispatch_batch(
+    coordinator: Coordinator,
+    path: str,
+    common: dict[str, Any],
+    submissions: list[Any],
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    # coordinator sends every submission to a node as a separate check, results
+    # are produced while the response is streamed, out of the request context
+
+    def create_task(source_code: dict[str, str]) -> Callable[[], DispatchResult]:
+        body = json.dumps({**common, "sourceCode": source_code}).encode()
+        return lambda: coordinator.dispatch(path, body, detect_language(source_code))
+
+    tasks = [create_task(submission["sourceCode"]) for submission in submissions]
+    slots = sum(node.capacity.slots for node in coordinator.nodes())
+    for i, result, error in run_completed(tasks, max(slots, 1) * 2):
+        if result is None:
+            yield i, {"checkResult": CheckStatus.UNKNOWN.value, "error": str(error)}
+        elif result.status != 200:
+            yield i, {
+                "checkResult": CheckStatus.UNKNOWN.value,
+                "error": json.loads(result.body).get("error", "Check failed"),
+            }
+        else:
+            yield i, {**json.loads(result.body), "node": result.node}
+
+
+@app.route("/checks", methods=["POST"])
+def create_check_view() -> Response:
+    error_response = check_tenant_key()
+    if error_response is not None:
+        return error_response
+
+    if coordinator is not None:
+        dispatched = dispatch_check(coordinator, "/checks")
+        if dispatched.status_code == 202:
+            job_id = json.loads(dispatched.get_data())["id"]
+            coordinator.add_check(job_id, dispatched.headers["X-Checker-Node"])
+        return dispatched
+
+    check_request: Any = request.json
+    checker = create_checker(check_request)
+    if isinstance(checker, Response):
+        return checker
+
+    callback_url = check_request.get("callbackUrl")
+    if callback_url is not None and (
+        not isinstance(callback_url, str)
+        or not check_queue.callback_allowed(callback_url)
+    ):
+        response = json.dumps(
+            {"error": '"callbackUrl" must be http(s) URL of an allowed host'}
+        )
+        return ResponseJSON(response, status=400)
+
+    priority = get_priority(check_request)
+    if isinstance(priority, Response):
+        return priority
+
+    ticket = admit_check(checker)
+    if isinstance(ticket, Response):
+        return ticket
+    try:
+        job = check_queue.submit(
+            checker, callback_url, ticket, priority, request.args["api_key"]
+        )
+    except AdmissionRejectedError as e:
+        return too_many_requests(e)
+    except CheckQueueFullError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=503)
+    return ResponseJSON(json.dumps(job.to_dict()), status=202)
+
+
+@app.route("/checks/<job_id>", methods=["GET"])
+def get_check_view(job_id: str) -> Response:
+    error_response = check_tenant_key()
+    if error_response is not None:
+        return error_response
+
+    if coordinator is not None:
+        return dispatch_get_check(coordinator, job_id)
+
+    job = check_queue.get(job_id)
+    api_key = request.args["api_key"]
+    if job is None or (api_key != config.API_KEY and job.api_key != api_key):
+        response = json.dumps({"error": "Check with such id was not found"})
+        return ResponseJSON(response, status=404)
+    return ResponseJSON(json.dumps(job.to_dict()))
+
+
+@app.route("/nodes", methods=["POST"])
+def register_node_view() -> Response:
+    error_response = check_api_key()
+    if error_response is not None:
+        return error_response
+
+    if coordinator is None:
+        response = json.dumps({"error": "Checker is not running as coordinator"})
+        return ResponseJSON(response, status=404)
+
+    node_request: Any = request.json
+    url = node_request.get("url") if isinstance(node_request, dict) else None
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        response = json.dumps({"error": '"url" of the node must be http(s) URL'})
+        return ResponseJSON(response, status=400)
+    try:
+        capacity = NodeCapacity.from_dict(node_request)
+    except ValueError as e:
+        return ResponseJSON(json.dumps({"error": str(e)}), status=400)
+
+    node = coordinator.register(url.rstrip("/"), capacity)
+    return ResponseJSON(json.dumps(node.to_dict()))
+
+
+@app.route("/nodes", methods=["GET"])
+def nodes_view() -> Response:
+    error_response = check_api_key()
+    if error_response is not None:
+        return error_response
+
+    if coordinator is None:
+        return ResponseJSON(json.dumps({"enabled": False}))
+    nodes = [node.to_dict() for node in coordinator.nodes()]
+    return ResponseJSON(json.dumps({"enabled": True, "nodes": nodes}))
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_view() -> Response:
+    error_response = check_api_key()
+    if error_response is not None:
+        return error_response
+
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/pool_stats", methods=["GET"])
+def pool_stats_view() -> Response:
+    error_response = check_api_key()
+    if error_response is not None:
+        return error_response
+
+    if container_pool is None:
+        return ResponseJSON(json.dumps({"enabled": False}))
+    return ResponseJSON(json.dumps({"enabled": True, **container_pool.stats()}))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from src.linter.linter import (
+    LintCache,
+    LintError,
+    LintTimeout,
+    lint_cache,
+    lint_file,
+)
+from src.linter.rules import find_profile, get_dispatch_table
+
+# Lints files of a submission in worker processes, so linting of large projects
+# doesn't hold the GIL of the threads talking to docker. Files are grouped into
+# chunks of about chunk_size characters (a larger file makes a chunk of its
+# own), largest first, and submissions of a single chunk are linted in the
+# calling thread to save the round trip. Linting stops when the CPU time spent
+# on the submission exceeds cpu_budget (checked before every rule, so a single
+# large file is bounded too), files not linted by then are reported.
+
+logger = logging.getLogger(__name__)
+
+File = tuple[str, str]
+
+
+@dataclass
+class ChunkResult:
+    errors: dict[str, list[LintError]]
+    not_linted: list[str]
+    cpu_time: float
+    rule_times: dict[str, float]
+
+
+@dataclass
+class LintReport:
+    errors: dict[str, list[LintError]] = field(default_factory=dict)
+    # files skipped because CPU budget of the submission was exceeded
+    not_linted: list[str] = field(default_factory=list)
+    cpu_time: float = 0.0
+    # seconds spent by the tokenizer and every rule on files not found in cache
+    rule_times: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def partial(self) -> bool:
+        return len(self.not_linted) > 0
+
+
+def lint_chunk(
+    files: list[File], cpu_budget: float, rules: tuple[str, ...] | None = None
+) -> ChunkResult:
+    # thread_time, as linting in the calling thread shares the process
+    start_time = time.thread_time()
+    deadline = start_time + cpu_budget
+    table = get_dispatch_table(rules)
+    result = ChunkResult({}, [], 0.0, {})
+    for i, (name, code) in enumerate(files):
+        if time.thread_time() >= deadline:
+            result.not_linted = [name for name, _ in files[i:]]
+            break
+        profile = find_profile(name, table)
+        if profile is None:
+            continue
+        try:
+            result.errors[name] = lint_file(code, profile, result.rule_times, deadline)
+        except LintTimeout:
+            result.not_linted = [name for name, _ in files[i:]]
+            break
+        except Exception:
+            logger.exception("Unable to lint %s", name)
+            result.errors[name] = []
+    result.cpu_time = time.thread_time() - start_time
+    return result
+
+
+def split_chunks(files: list[File], chunk_size: int) -> list[list[File]]:
+    chunks: list[list[File]] = []
+    chunk_length = 0
+    for file in sorted(files, key=lambda file: len(file[1]), reverse=True):
+        if len(chunks) == 0 or chunk_length + len(file[1]) > chunk_size:
+            chunks.append([])
+            chunk_length = 0
+        chunks[-1].append(file)
+        chunk_length += len(file[1])
+    return chunks
+
+
+class LintExecutor:
+    def __init__(
+        self,
+        workers: int,
+        cpu_budget: float,
+        chunk_size: int,
+        cache: LintCache | None = lint_cache,
+    ):
+        # workers set to 0 lint all files in the calling thread
+        self.workers = workers
+        self.cpu_budget = cpu_budget
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self._pool: ProcessPoolExecutor | None = None
+        if workers > 0:
+            # the application runs many threads, so workers are forked from a
+            # single-threaded server process which has only the linter imported
+            # (spawning them would import the whole application again)
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(workers, mp_context=context)
+
+    def lint(
+        self, source_code: dict[str, str], rules: tuple[str, ...] | None = None
+    ) -> LintReport:
+        # files are linted by profiles of their extensions with selected rules
+        report = LintReport()
+        table = get_dispatch_table(rules)
+        files: list[File] = []
+        keys: dict[str, bytes] = {}
+        for name, code in source_code.items():
+            profile = find_profile(name, table)
+            if profile is None:
+                continue
+            if self.cache is None:
+                files.append((name, code))
+                continue
+            keys[name] = self.cache.key(code, profile.key)
+            errors = self.cache.get(keys[name])
+            if errors is None:
+                files.append((name, code))
+            else:
+                report.errors[name] = errors
+
+        chunks = split_chunks(files, self.chunk_size)
+        if self._pool is None or len(chunks) <= 1:
+            self._add(report, lint_chunk(files, self.cpu_budget, rules), keys)
+        else:
+            self._lint_in_pool(self._pool, chunks, rules, report, keys)
+
+        # files are reported in order of the submission
+        report.errors = {
+            name: report.errors[name]
+            for name in source_code
+            if len(report.errors.get(name, [])) > 0
+        }
+        not_linted = set(report.not_linted)
+        report.not_linted = [name for name in source_code if name in not_linted]
+        return report
+
+    def _lint_in_pool(
+        self,
+        pool: ProcessPoolExecutor,
+        chunks: list[list[File]],
+        rules: tuple[str, ...] | None,
+        report: LintReport,
+        keys: dict[str, bytes],
+    ) -> None:
+        # chunk gets the budget left when it's started, the submission stops
+        # when the budget is spent or waiting for the chunks takes it in time
+        deadline = time.monotonic() + self.cpu_budget
+        waiting = list(reversed(chunks))
+        running: dict[Future[ChunkResult], list[File]] = {}
+        while waiting or running:
+            remaining = self.cpu_budget - report.cpu_time
+            while waiting and len(running) < self.workers and remaining > 0:
+                chunk = waiting.pop()
+                running[pool.submit(lint_chunk, chunk, remaining, rules)] = chunk
+            if not running:
+                break
+            done, _ = wait(
+                running, max(deadline - time.monotonic(), 0), FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                chunk = running.pop(future)
+                try:
+                    self._add(report, future.result(), keys)
+                except Exception:
+                    logger.exception("Lint worker failed")
+                    report.not_linted.extend(name for name, _ in chunk)
+
+        # chunks still running are left to finish on their own
+        for chunk in [*running.values(), *waiting]:
+            report.not_linted.extend(name for name, _ in chunk)
+
+    def _add(
+        self, report: LintReport, result: ChunkResult, keys: dict[str, bytes]
+    ) -> None:
+        report.cpu_time += result.cpu_time
+        report.not_linted.extend(result.not_linted)
+        for name, rule_time in result.rule_times.items():
+            report.rule_times[name] = report.rule_times.get(name, 0.0) + rule_time
+        for name, errors in result.errors.items():
+            if self.cache is not None:
+                self.cache.put(keys[name], errors)
+            report.errors[name] = errors
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
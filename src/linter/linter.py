@@ -1,4 +1,15 @@
-from typing import Any, TypedDict
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import TypedDict
+
+from src.linter.rules import DEFAULT_DISPATCH_TABLE, CompiledProfile
+from src.linter.tokenizer import tokenize
+
+
+class LintTimeout(Exception):
+    pass
 
 
 class LintError(TypedDict):
@@ -6,23 +17,54 @@ class LintError(TypedDict):
     message: str
 
 
-def lint_dict(source_code: dict[str, str], extensions: list[str]) -> dict[str, Any]:
-    lint_errors = {}
-    for name, content in source_code.items():
-        need_lint = False
-        for extension in extensions:
-            if name.endswith(extension):
-                need_lint = True
-                break
-        if need_lint:
-            try:
-                lint_result = lint_code(content)
-            except Exception as e:
-                print(e)
-                lint_result = []
-            if len(lint_result) > 0:
-                lint_errors[name] = lint_result
-    return lint_errors
+class LintCache:
+    # lint errors by hash of file content, so files not changed between
+    # submissions are not linted again
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, list[tuple[int, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lint(
+        self, code: str, profile: CompiledProfile | None = None
+    ) -> list[LintError]:
+        profile = profile or C_PROFILE
+        key = self.key(code, profile.key)
+        errors = self.get(key)
+        if errors is None:
+            errors = lint_file(code, profile)
+            self.put(key, errors)
+        return errors
+
+    @staticmethod
+    def key(code: str, profile_key: str = "") -> bytes:
+        # the same file linted with other rules has other errors
+        data = profile_key + "\0" + code
+        return hashlib.sha256(data.encode("utf-8", "surrogatepass")).digest()
+
+    def get(self, key: bytes) -> list[LintError] | None:
+        with self._lock:
+            errors = self._entries.get(key)
+            if errors is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # callers get their own records
+        return [{"line": line, "message": message} for line, message in errors]
+
+    def put(self, key: bytes, errors: list[LintError]) -> None:
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = [(error["line"], error["message"]) for error in errors]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+C_PROFILE = DEFAULT_DISPATCH_TABLE[".c"]
+
+lint_cache = LintCache(10000)
 
 
 def lint_errors_to_str(lint_errors: dict[str, list[LintError]]) -> str:
@@ -36,85 +78,35 @@ def lint_errors_to_str(lint_errors: dict[str, list[LintError]]) -> str:
     return str_lint[:-1]
 
 
-def lint_code(code: str) -> list[LintError]:
+def lint_file(
+    code: str,
+    profile: CompiledProfile,
+    rule_times: dict[str, float] | None = None,
+    deadline: float | None = None,
+) -> list[LintError]:
+    # source is split into lines once, then every rule of the profile checks
+    # them, rule_times (if given) gets the time spent by the tokenizer and rules;
+    # LintTimeout is raised when time.thread_time() passes deadline before a rule
+    start_time = time.perf_counter()
+    lines = list(tokenize(code, profile.token_pattern))
+    timings = [("tokenize", start_time, time.perf_counter())]
+
     errors: list[LintError] = []
+    for rule in profile.rules:
+        if deadline is not None and time.thread_time() >= deadline:
+            raise LintTimeout()
+        start_time = time.perf_counter()
+        for number in rule.check(code, lines):
+            errors.append({"line": number, "message": rule.name})
+        timings.append((rule.name, start_time, time.perf_counter()))
+
+    if rule_times is not None:
+        for name, start_time, end_time in timings:
+            rule_times[name] = rule_times.get(name, 0.0) + end_time - start_time
+    # errors of a line keep the order of rules
+    errors.sort(key=lambda error: error["line"])
+    return errors
 
-    indent_level = 0
-    space_length = None
-
-    line_number = 0
-    for line in code.split("\n"):
-        line_number += 1
-
-        if len(line) == 0:
-            continue
-
-        is_string = False
-        is_comment = False
-
-        current_indent = 0
-        indent_symbol = None
-        need_indentation_check = True
-        checking_indentation = True
-
-        prev_c: str | None = None
-        c: str | None = None
-        next_c: str | None = line[0]
-
-        indent_level_diff_pos = 0
-        indent_level_diff_neg = 0
-        len_line = len(line)
-        for i in range(0, len_line):
-            prev_c = None if c is None else c
-            c = next_c
-            next_c = None if i == len_line - 1 else line[i + 1]
-
-            if not is_comment and c == '"' and prev_c != "\\":
-                is_string = False if is_string else True
-
-            if not is_string and c == "/" and next_c == "/":
-                is_comment = True
-
-            if not is_string and not is_comment:
-                if c == "{":
-                    indent_level_diff_pos += 1
-                elif c == "}":
-                    indent_level_diff_neg -= 1
-
-            if checking_indentation:
-                if c != "\t" and c != " ":
-                    if (
-                        space_length is None
-                        and indent_symbol == " "
-                        and indent_level > 0
-                    ):
-                        space_length = int(current_indent / indent_level)
-                    checking_indentation = False
-                    continue
-                if indent_symbol is not None and c != indent_symbol:
-                    need_indentation_check = False
-                    errors.append({"line": line_number, "message": "indentation/mix"})
-                    checking_indentation = False
-                indent_symbol = c
-                current_indent += 1
-            elif not is_string and not is_comment and prev_c == ",":
-                if c != " " or next_c == " ":
-                    errors.append(
-                        {"line": line_number, "message": "spaces/punctuation"}
-                    )
-
-        indent_level += indent_level_diff_neg
-
-        if need_indentation_check:
-            expected_indent = indent_level
-            if indent_symbol == " " and space_length is not None:
-                expected_indent *= space_length
-            if current_indent != expected_indent and need_indentation_check:
-                errors.append({"line": line_number, "message": "indentation/bad"})
-
-        indent_level += indent_level_diff_pos
-
-    if len(code) > 0 and code[-1] != "\n":
-        errors.append({"line": line_number, "message": "line/noendnewline"})
 
-    return errors
+def lint_code(code: str) -> list[LintError]:
+    return lint_file(code, C_PROFILE)
@@ -0,0 +1,157 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+from src.linter.tokenizer import C_TOKEN, PYTHON_TOKEN, Line
+
+# Rule gets the source of a file with its lines split by the tokenizer of the
+# language profile and returns numbers of lines breaking it, a line is listed
+# once per error. Errors are reported with the name of the rule as message.
+RuleCheck = Callable[[str, list[Line]], list[int]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    check: RuleCheck
+
+
+def is_mixed(text: str, indent_length: int) -> bool:
+    # indentation has both tabs and spaces
+    return indent_length > 0 and text.count(text[0], 0, indent_length) != indent_length
+
+
+def check_mixed_indentation(code: str, lines: list[Line]) -> list[int]:
+    return [
+        number
+        for number, text, indent_length, in_token, *_ in lines
+        if not in_token and is_mixed(text, indent_length)
+    ]
+
+
+def check_comma_spaces(code: str, lines: list[Line]) -> list[int]:
+    # comma must be followed by exactly one space or end the line
+    return [number for number, *_, crowded in lines for _ in range(crowded)]
+
+
+def check_brace_indentation(code: str, lines: list[Line]) -> list[int]:
+    numbers = []
+    indent_level = 0
+    space_length = None
+    for number, text, indent_length, in_token, opened, closed, _ in lines:
+        if len(text) == 0:
+            continue
+
+        indent_symbol = text[:1] if indent_length > 0 else ""
+        # lines starting inside of a comment or a string keep their indentation,
+        # mixed indentation is reported by its own rule
+        need_indentation_check = not in_token and not is_mixed(text, indent_length)
+        if (
+            need_indentation_check
+            and space_length is None
+            and indent_symbol == " "
+            and indent_level > 0
+            and indent_length < len(text)
+        ):
+            space_length = int(indent_length / indent_level)
+
+        indent_level -= closed
+
+        if need_indentation_check:
+            expected_indent = indent_level
+            if indent_symbol == " " and space_length is not None:
+                expected_indent *= space_length
+            if indent_length != expected_indent:
+                numbers.append(number)
+
+        indent_level += opened
+    return numbers
+
+
+def check_end_newline(code: str, lines: list[Line]) -> list[int]:
+    if len(code) > 0 and code[-1] != "\n":
+        return [len(lines)]
+    return []
+
+
+# rules are run in this order, so errors of a line are reported in it too
+RULES = {
+    rule.name: rule
+    for rule in (
+        Rule("indentation/mix", check_mixed_indentation),
+        Rule("spaces/punctuation", check_comma_spaces),
+        Rule("indentation/bad", check_brace_indentation),
+        Rule("line/noendnewline", check_end_newline),
+    )
+}
+
+
+@dataclass
+class Profile:
+    name: str
+    extensions: tuple[str, ...]
+    token_pattern: re.Pattern[str]
+    rules: tuple[str, ...]
+
+
+PROFILES = [
+    Profile("c", (".c", ".h", ".cpp", ".hpp", ".cs", ".js"), C_TOKEN, tuple(RULES)),
+    # gofmt indents blocks with tabs, which the brace rule accepts
+    Profile("go", (".go",), C_TOKEN, tuple(RULES)),
+    Profile("java", (".java",), C_TOKEN, tuple(RULES)),
+    # blocks are not marked by braces
+    Profile(
+        "python",
+        (".py",),
+        PYTHON_TOKEN,
+        ("indentation/mix", "spaces/punctuation", "line/noendnewline"),
+    ),
+]
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    name: str
+    token_pattern: re.Pattern[str]
+    rules: tuple[Rule, ...]
+
+    @property
+    def key(self) -> str:
+        # identifies results of the profile in the lint cache
+        return self.name + ":" + ",".join(rule.name for rule in self.rules)
+
+
+@lru_cache(maxsize=128)
+def get_dispatch_table(
+    rules: tuple[str, ...] | None = None
+) -> dict[str, CompiledProfile]:
+    # extension of a file to the profile linting it with selected rules (all
+    # rules of the profile by default), files of other extensions are not linted
+    table = {}
+    for profile in PROFILES:
+        compiled = CompiledProfile(
+            profile.name,
+            profile.token_pattern,
+            tuple(
+                RULES[name]
+                for name in RULES
+                if name in profile.rules and (rules is None or name in rules)
+            ),
+        )
+        if len(compiled.rules) == 0:
+            continue
+        for extension in profile.extensions:
+            table[extension] = compiled
+    return table
+
+
+def find_profile(
+    name: str, table: dict[str, CompiledProfile]
+) -> CompiledProfile | None:
+    return table.get(os.path.splitext(name)[1])
+
+
+# profiles are compiled on startup, not by the first check
+DEFAULT_DISPATCH_TABLE = get_dispatch_table()
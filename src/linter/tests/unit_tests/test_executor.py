@@ -0,0 +1,56 @@
+import unittest
+
+from src.linter.executor import LintExecutor, lint_chunk, split_chunks
+from src.linter.linter import LintCache
+
+BAD_CODE = "int main() {\nreturn 0;\n}\n"
+
+
+class LintExecutorTest(unittest.TestCase):
+    def test_split_chunks(self) -> None:
+        files = [("a", "x" * 5), ("b", "x" * 30), ("c", "x" * 4), ("d", "x" * 8)]
+        chunks = split_chunks(files, 10)
+        self.assertEqual(
+            [[name for name, _ in chunk] for chunk in chunks],
+            [["b"], ["d"], ["a", "c"]],
+        )
+
+    def test_lint_in_pool(self) -> None:
+        source_code = {f"file{i}.c": BAD_CODE + "\n" * i for i in range(8)}
+        source_code["Makefile"] = "build:\n"
+        executor = LintExecutor(2, 10.0, 20, LintCache(100))
+        try:
+            report = executor.lint(source_code)
+            self.assertFalse(report.partial)
+            self.assertEqual(list(report.errors), [f"file{i}.c" for i in range(8)])
+            self.assertEqual(
+                report.errors["file0.c"], [{"line": 2, "message": "indentation/bad"}]
+            )
+            # files linted once are taken from the cache
+            assert executor.cache is not None
+            self.assertEqual(executor.cache.misses, 8)
+            self.assertEqual(executor.lint(source_code).errors, report.errors)
+            self.assertEqual(executor.cache.hits, 8)
+        finally:
+            executor.close()
+
+    def test_cpu_budget(self) -> None:
+        result = lint_chunk([("a.c", BAD_CODE), ("b.c", BAD_CODE)], 0.0)
+        self.assertEqual(result.not_linted, ["a.c", "b.c"])
+
+        source_code = {"a.c": BAD_CODE, "b.c": "int a;\n"}
+        report = LintExecutor(0, 0.0, 1000, None).lint(source_code)
+        self.assertTrue(report.partial)
+        self.assertEqual(report.not_linted, ["a.c", "b.c"])
+        self.assertEqual(report.errors, {})
+
+    def test_cpu_budget_of_large_file(self) -> None:
+        # budget is checked while a file is linted, not only between files
+        files = [("a.c", BAD_CODE * 20000), ("b.c", BAD_CODE)]
+        result = lint_chunk(files, 0.001)
+        self.assertEqual(result.not_linted, ["a.c", "b.c"])
+        self.assertEqual(result.errors, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -83,6 +83,36 @@ class LinterTest(unittest.TestCase):
                 self.assertEqual(got["line"], exp["line"], msg=file)
                 self.assertEqual(got["message"], exp["message"], msg=file)
 
+    def test_tokens(self) -> None:
+        code = (
+            "int main() {\n"
+            "    /* block {\n"
+            "  comment,x */\n"
+            "    char c = '{';\n"
+            '    char *s = R"(raw,{\n'
+            'string)";\n'
+            '    f(a,"b", c);\r\n'
+            "}\n"
+        )
+        self.assertEqual(
+            linter.lint_code(code), [{"line": 7, "message": "spaces/punctuation"}]
+        )
+
+    def test_cache(self) -> None:
+        cache = linter.LintCache(1)
+        code = "int main() {\nreturn 0;\n}"
+        expected: list[LintError] = [
+            {"line": 2, "message": "indentation/bad"},
+            {"line": 3, "message": "line/noendnewline"},
+        ]
+        self.assertEqual(cache.lint(code), expected)
+        cache.lint(code)[0]["line"] = 0
+        self.assertEqual(cache.lint(code), expected)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        cache.lint("")
+        cache.lint(code)
+        self.assertEqual(cache.misses, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from src.linter.executor import LintExecutor
+from src.linter.rules import RULES, find_profile, get_dispatch_table
+
+C_CODE = "int main() {\nf(a,b);\n}"
+PYTHON_CODE = (
+    "def main():\n"
+    '    """Docstring, with\n'
+    '  commas,in it"""\n'
+    "    print(a,b)  # comment,with commas\n"
+    " \tx = '{'\n"
+)
+
+
+class RulesTest(unittest.TestCase):
+    def test_dispatch_table(self) -> None:
+        table = get_dispatch_table()
+        self.assertIs(get_dispatch_table(), table)
+        self.assertEqual(find_profile("src/main.c", table), table[".h"])
+        self.assertEqual(find_profile("Main.java", table).name, "java")  # type: ignore
+        self.assertIsNone(find_profile("Makefile", table))
+        # profiles without selected rules lint nothing
+        table = get_dispatch_table(("indentation/bad",))
+        self.assertIsNone(find_profile("main.py", table))
+        self.assertEqual(
+            [rule.name for rule in table[".go"].rules], ["indentation/bad"]
+        )
+
+    def test_profiles(self) -> None:
+        executor = LintExecutor(0, 10.0, 1000, None)
+        source_code = {"main.c": C_CODE, "main.py": PYTHON_CODE}
+        report = executor.lint(source_code)
+        self.assertEqual(
+            report.errors,
+            {
+                "main.c": [
+                    {"line": 2, "message": "spaces/punctuation"},
+                    {"line": 2, "message": "indentation/bad"},
+                    {"line": 3, "message": "line/noendnewline"},
+                ],
+                "main.py": [
+                    {"line": 4, "message": "spaces/punctuation"},
+                    {"line": 5, "message": "indentation/mix"},
+                ],
+            },
+        )
+        self.assertEqual(set(report.rule_times), {"tokenize", *RULES})
+
+        report = executor.lint(source_code, ("line/noendnewline",))
+        self.assertEqual(
+            report.errors, {"main.c": [{"line": 3, "message": "line/noendnewline"}]}
+        )
+        self.assertEqual(set(report.rule_times), {"tokenize", "line/noendnewline"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import re
+from itertools import count, repeat
+from operator import sub
+from typing import Iterator
+
+# Splits source code into lines with what the rules need: braces and commas
+# outside of comments, strings and character literals. The whole file is
+# scanned by one regex (of the language family) replacing every comment and
+# literal with a placeholder, then lines are measured by string methods mapped
+# over all of them, so no Python code runs per character or per token.
+
+C_TOKEN = re.compile(
+    r"""
+    //[^\n]*
+    | /\*[\s\S]*?(?:\*/|\Z)
+    | R"(?P<delimiter>[^()\\\s"]{0,16})\([\s\S]*?(?:\)(?P=delimiter)"|\Z)
+    | \"\"\"(?:[^"\\]|\\[\s\S]|"(?!""))*(?:\"\"\"|\Z)
+    | @"(?:[^"]|"")*(?:"|\Z)
+    | `(?:[^`\\]|\\[\s\S])*(?:`|\Z)
+    # single-line literals are closed by the end of the line
+    | "(?:[^"\\\n]|\\.)*(?:"|\\?(?=\n|\Z))
+    | '(?:[^'\\\n]|\\.)*(?:'|\\?(?=\n|\Z))
+    """,
+    re.VERBOSE,
+)
+PYTHON_TOKEN = re.compile(
+    r"""
+    \#[^\n]*
+    | [rRbBuUfF]{0,2}'''(?:[^'\\]|\\[\s\S]|'(?!''))*(?:'''|\Z)
+    | [rRbBuUfF]{0,2}\"\"\"(?:[^"\\]|\\[\s\S]|"(?!""))*(?:\"\"\"|\Z)
+    | "(?:[^"\\\n]|\\.)*(?:"|\\?(?=\n|\Z))
+    | '(?:[^'\\\n]|\\.)*(?:'|\\?(?=\n|\Z))
+    """,
+    re.VERBOSE,
+)
+# comma not followed by exactly one space (or the end of the line)
+CROWDED_COMMA = re.compile(r",(?=[^ ]| {2})")
+
+PLACEHOLDER = "0"
+# starts lines which start inside of a multi-line comment or literal
+IN_TOKEN = "\x00"
+
+# number, masked text (literals and comments are replaced by PLACEHOLDER),
+# length of indentation, whether the line starts inside of a multi-line token
+# (its indentation is not the author's), braces opened and closed, commas not
+# followed by exactly one space
+Line = tuple[int, str, int, bool, int, int, int]
+
+
+def mask(token: re.Match[str]) -> str:
+    return PLACEHOLDER + ("\n" + IN_TOKEN) * token.group().count("\n")
+
+
+def tokenize(code: str, pattern: re.Pattern[str] = C_TOKEN) -> Iterator[Line]:
+    if "\r" in code:
+        code = code.replace("\r\n", "\n")
+    lines = pattern.sub(mask, code).split("\n")
+    indents = map(sub, map(len, lines), map(len, map(str.lstrip, lines, repeat(" \t"))))
+    return zip(
+        count(1),
+        lines,
+        indents,
+        map(str.startswith, lines, repeat(IN_TOKEN)),
+        map(str.count, lines, repeat("{")),
+        map(str.count, lines, repeat("}")),
+        map(len, map(CROWDED_COMMA.findall, lines)),
+    )
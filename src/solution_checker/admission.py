@@ -0,0 +1,222 @@
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.solution_checker.models import CheckResult, CheckStatus
+
+# Admission control: every check is admitted with its predicted cost (sandbox
+# time and memory), checks which don't fit into the quota of their API key are
+# rejected with the time after which they will probably fit. Admitted checks
+# are started by the scheduler while their memory fits into the budget, so the
+# host is never overcommitted.
+
+QUOTA_WINDOW = 60.0
+
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+@dataclass
+class Quota:
+    # checks admitted at once (queued ones too) and predicted seconds of checks
+    # admitted per minute, None means no limit
+    max_checks: int | None = None
+    cost_per_minute: float | None = None
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "Quota":
+        max_checks = data.get("maxChecks")
+        cost_per_minute = data.get("costPerMinute")
+        return Quota(
+            int(max_checks) if max_checks is not None else None,
+            float(cost_per_minute) if cost_per_minute is not None else None,
+        )
+
+
+@dataclass
+class CheckCost:
+    # predicted seconds of sandbox time and bytes of memory reserved
+    time: float
+    memory: int
+
+
+class CostModel:
+    # check time is predicted by moving averages of build time and time per test
+    # of checks of the same language, until the first one it's the worst case
+    smoothing = 0.2
+
+    def __init__(self, check_memory: int, language_memory: dict[str, int]):
+        self.check_memory = check_memory
+        self.language_memory = language_memory
+        self._build_time: dict[str, float] = {}
+        self._test_time: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(
+        self,
+        language: str | None,
+        build_timeout: float,
+        test_timeout: float,
+        tests: int,
+        workers: int = 1,
+    ) -> CheckCost:
+        worst = build_timeout + test_timeout * tests
+        key = language or ""
+        with self._lock:
+            build_time = self._build_time.get(key)
+            test_time = self._test_time.get(key)
+        predicted = worst
+        if build_time is not None and test_time is not None:
+            predicted = min(build_time + test_time * tests, worst)
+        # parallel tests run in several sandboxes at once
+        memory = self.language_memory.get(key, self.check_memory) * workers
+        return CheckCost(predicted, memory)
+
+    def observe(self, language: str | None, result: CheckResult) -> None:
+        if result.status in (CheckStatus.BUILD_ERROR, CheckStatus.BUILD_TIMEOUT):
+            return
+        # the failed test was run too
+        tests_run = result.tests_passed + (result.status != CheckStatus.OK)
+        key = language or ""
+        with self._lock:
+            self._build_time[key] = self._average(
+                self._build_time.get(key), result.build_time
+            )
+            if tests_run > 0:
+                self._test_time[key] = self._average(
+                    self._test_time.get(key), result.tests_time / tests_run
+                )
+            else:
+                self._test_time.setdefault(key, 0.0)
+
+    def _average(self, average: float | None, value: float) -> float:
+        if average is None:
+            return value
+        return average + (value - average) * self.smoothing
+
+
+@dataclass(eq=False)
+class Ticket:
+    api_key: str
+    cost: CheckCost
+    language: str | None = None
+    # waiting checks hold quota of their key, but not the memory budget
+    running: bool = False
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def expected_end(self) -> float:
+        return self.started_at + self.cost.time
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        memory_budget: int,
+        cost_model: CostModel,
+        quotas: dict[str, Quota] | None = None,
+        default_quota: Quota | None = None,
+    ):
+        self.memory_budget = memory_budget
+        self.cost_model = cost_model
+        self.quotas = quotas or {}
+        self.default_quota = default_quota or Quota()
+
+        self.admitted = 0
+        self.rejected = 0
+        self._tickets: list[Ticket] = []
+        # predicted costs admitted during the last minute by API key
+        self._charges: dict[str, deque[tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def admit(
+        self, api_key: str, cost: CheckCost, language: str | None = None
+    ) -> Ticket:
+        ticket = Ticket(api_key, cost, language)
+        with self._lock:
+            try:
+                self._check_quota(ticket)
+            except AdmissionRejectedError:
+                self.rejected += 1
+                raise
+            self.admitted += 1
+            self._tickets.append(ticket)
+            self._charges.setdefault(api_key, deque()).append(
+                (ticket.started_at, cost.time)
+            )
+        return ticket
+
+    def try_start(self, ticket: Ticket) -> bool:
+        # check is started if its memory fits into the budget, a check bigger
+        # than the whole budget is run alone
+        with self._lock:
+            running = [other for other in self._tickets if other.running]
+            memory = sum(other.cost.memory for other in running)
+            if running and memory + ticket.cost.memory > self.memory_budget:
+                return False
+            ticket.running = True
+            ticket.started_at = time.time()
+            return True
+
+    def release(self, ticket: Ticket, result: CheckResult | None = None) -> None:
+        with self._lock:
+            if ticket in self._tickets:
+                self._tickets.remove(ticket)
+        if result is not None:
+            self.cost_model.observe(ticket.language, result)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            running = [ticket for ticket in self._tickets if ticket.running]
+            return {
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "running": len(running),
+                "queued": len(self._tickets) - len(running),
+                "memory": sum(ticket.cost.memory for ticket in running),
+            }
+
+    def _check_quota(self, ticket: Ticket) -> None:
+        now = time.time()
+        quota = self.quotas.get(ticket.api_key, self.default_quota)
+        own = [other for other in self._tickets if other.api_key == ticket.api_key]
+        if quota.max_checks is not None and len(own) >= quota.max_checks:
+            raise AdmissionRejectedError(
+                f"Quota of {quota.max_checks} checks at once is exceeded",
+                min((other.expected_end for other in own), default=now) - now,
+            )
+
+        charges = self._charges.setdefault(ticket.api_key, deque())
+        while charges and charges[0][0] <= now - QUOTA_WINDOW:
+            charges.popleft()
+        charged = sum(cost for _, cost in charges)
+        if (
+            quota.cost_per_minute is None
+            # check costing more than the whole quota is admitted alone
+            or not charges
+            or charged + ticket.cost.time <= quota.cost_per_minute
+        ):
+            return
+        # the check fits when enough of the charges leave the window
+        excess = charged + ticket.cost.time - quota.cost_per_minute
+        retry_after = 0.0
+        for charged_at, cost in charges:
+            excess -= cost
+            retry_after = charged_at + QUOTA_WINDOW - now
+            if excess <= 0:
+                break
+        raise AdmissionRejectedError(
+            f"Quota of {quota.cost_per_minute:g} seconds of checks per minute "
+            "is exceeded",
+            retry_after,
+        )
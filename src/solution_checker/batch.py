@@ -0,0 +1,68 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Sequence, TypeVar
+
+from src.solution_checker.admission import AdmissionRejectedError, Ticket
+from src.solution_checker.models import CheckResult
+from src.solution_checker.scheduler import PriorityScheduler
+from src.solution_checker.solution_checker import SolutionChecker
+
+# Checks of a batch (regrade of many solutions against the same tests) are run
+# by several threads at once and pipelined: while some checks build and run
+# tests in their slots, the next ones acquire containers and upload sources,
+# results are yielded as soon as every check finishes.
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_RETRY_DELAY = 5.0
+
+
+def run_completed(
+    tasks: Sequence[Callable[[], T]], parallelism: int
+) -> Iterator[tuple[int, T | None, Exception | None]]:
+    # yields index of the task with its result or error in order of completion
+    executor = ThreadPoolExecutor(max(parallelism, 1))
+    futures = {executor.submit(task): i for i, task in enumerate(tasks)}
+    try:
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+    finally:
+        # tasks not started yet are dropped if the batch is abandoned
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def check_admitted(
+    checker: SolutionChecker,
+    admit: Callable[[SolutionChecker], Ticket],
+    scheduler: PriorityScheduler,
+    priority: str | None,
+) -> CheckResult:
+    try:
+        checker.prepare()
+    except Exception:
+        # the check itself fails with the same error
+        logger.exception("Unable to prepare check of the batch")
+
+    # checks of a batch wait for quota and for a place in the queue instead of
+    # being rejected
+    while True:
+        try:
+            ticket = admit(checker)
+            queue_time = scheduler.acquire(priority, ticket)
+            break
+        except AdmissionRejectedError as e:
+            time.sleep(min(max(e.retry_after, 0.1), MAX_RETRY_DELAY))
+
+    result = None
+    try:
+        result = checker.check_solution()
+        result.queue_time = round(queue_time, 4)
+    finally:
+        scheduler.release(ticket, result)
+    return result
@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from queue import Queue
+from typing import Any, Collection
+
+from src.solution_checker.admission import AdmissionRejectedError, Ticket
+from src.solution_checker.models import CheckResult, CheckStatus
+from src.solution_checker.scheduler import PriorityScheduler
+from src.solution_checker.solution_checker import SolutionChecker
+
+logger = logging.getLogger(__name__)
+
+
+class CheckQueueFullError(Exception):
+    ...
+
+
+@dataclass
+class CheckJob:
+    checker: SolutionChecker
+    callback_url: str | None = None
+    # admission of the check, released when it's finished
+    ticket: Ticket | None = None
+    queue_time: float = 0.0
+    # key of the tenant which submitted the check, only it may get the result
+    api_key: str | None = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    result: CheckResult | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.result is not None:
+            return {"id": self.id, **self.result.to_dict()}
+        if self.error is not None:
+            return {
+                "id": self.id,
+                "checkResult": CheckStatus.UNKNOWN.value,
+                "error": self.error,
+            }
+        return {"id": self.id, "checkResult": CheckStatus.CHECKING.value}
+
+
+def get_workers_count(check_memory: int) -> int:
+    cpu_count = os.cpu_count() or 1
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError):
+        return cpu_count
+    return max(1, min(cpu_count, memory // check_memory))
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    # callback redirected to another host would bypass the allowed hosts
+    def redirect_request(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+class CheckQueue:
+    callback_timeout = 10.0
+    # finished jobs are removed at most this time after their TTL expired,
+    # but not more often than every min_sweep_interval (TTL may be 0)
+    sweep_interval = 60.0
+    min_sweep_interval = 0.1
+
+    def __init__(
+        self,
+        workers_count: int,
+        max_size: int,
+        job_ttl: float,
+        scheduler: PriorityScheduler | None = None,
+        callback_hosts: Collection[str] = (),
+    ):
+        self.workers_count = workers_count
+        self.max_size = max_size
+        self.job_ttl = job_ttl
+        # results are sent only to http(s) callbacks on these hosts
+        self.callback_hosts = {host.lower() for host in callback_hosts}
+        # jobs wait in the scheduler, the queue has only jobs allowed to run
+        self.scheduler = scheduler or PriorityScheduler(workers_count)
+
+        self._queue: Queue[CheckJob] = Queue()
+        self._jobs: dict[str, CheckJob] = {}
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(workers_count)
+        ]
+        for worker in self._workers:
+            worker.start()
+        threading.Thread(target=self._sweep, daemon=True).start()
+
+    def submit(
+        self,
+        checker: SolutionChecker,
+        callback_url: str | None,
+        ticket: Ticket | None = None,
+        priority: str | None = None,
+        api_key: str | None = None,
+    ) -> CheckJob:
+        job = CheckJob(
+            checker=checker, callback_url=callback_url, ticket=ticket, api_key=api_key
+        )
+        with self._lock:
+            full = self._pending >= self.max_size
+            if not full:
+                self._pending += 1
+                self._jobs[job.id] = job
+        if full:
+            admission = self.scheduler.admission
+            if admission is not None and ticket is not None:
+                admission.release(ticket)
+            raise CheckQueueFullError("Check queue is full, try again later")
+
+        try:
+            self.scheduler.submit(priority, lambda wait: self._start(job, wait), ticket)
+        except AdmissionRejectedError:
+            with self._lock:
+                self._pending -= 1
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def callback_allowed(self, url: str) -> bool:
+        try:
+            parts = urllib.parse.urlsplit(url)
+        except ValueError:
+            return False
+        return (
+            parts.scheme in ("http", "https")
+            and parts.hostname is not None
+            and parts.hostname in self.callback_hosts
+        )
+
+    def get(self, job_id: str) -> CheckJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers_count,
+                "queued": self._pending,
+                "running": self._running,
+                "jobs": len(self._jobs),
+            }
+
+    def _sweep(self) -> None:
+        while True:
+            interval = min(self.job_ttl, self.sweep_interval)
+            time.sleep(max(interval, self.min_sweep_interval))
+            self._remove_expired()
+
+    def _remove_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None and now - job.finished_at > self.job_ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _start(self, job: CheckJob, queue_time: float) -> None:
+        job.queue_time = queue_time
+        self._queue.put(job)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+            result = None
+            try:
+                result = job.checker.check_solution()
+                result.queue_time = round(job.queue_time, 4)
+            except Exception as e:
+                logger.exception("Check %s has failed", job.id)
+                job.error = str(e)
+            job.result = result
+            job.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+            self.scheduler.release(job.ticket, result)
+            self._queue.task_done()
+
+            if job.callback_url is not None:
+                self._send_callback(job)
+
+    def _send_callback(self, job: CheckJob) -> None:
+        assert job.callback_url is not None
+        if not self.callback_allowed(job.callback_url):
+            logger.error("Callback of check %s is not allowed", job.id)
+            return
+        callback_request = urllib.request.Request(
+            job.callback_url,
+            data=json.dumps(job.to_dict()).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        opener = urllib.request.build_opener(NoRedirectHandler)
+        try:
+            with opener.open(callback_request, timeout=self.callback_timeout):
+                pass
+        except Exception:
+            logger.exception("Unable to send result of check %s to callback", job.id)
@@ -1,34 +1,50 @@
 import time
 
-from docker.client import DockerClient
-from docker.models.containers import Container
-
 from src.solution_checker.models import BuildResult
 from src.solution_checker.models import CheckStatus
-from src.solution_checker.threads.docker_build_thread import DockerBuildThread
+from src.solution_checker.output import MAX_OUTPUT_SIZE, decode_output
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
 
 
 def build_solution(
-    client: DockerClient, container: Container, build_timeout: float
+    backend: SandboxBackend,
+    sandbox: Sandbox,
+    build_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
 ) -> BuildResult:
-    build_thread = DockerBuildThread(client, container, "/root/source")
-    start_time = time.time()
-    build_thread.start()
-    build_thread.join(build_timeout)
-    build_time = time.time() - start_time
-    result = build_thread.result
-
-    if result is None:
-        build_thread.terminate()
-        # waiting for container to stop and then thread will exit
-        build_thread.join()
+    result = backend.exec(
+        sandbox,
+        "make build",
+        workdir="/root/source",
+        timeout=build_timeout,
+        name="build",
+        max_output=max_output,
+    )
+
+    if result.timed_out:
         return BuildResult(
-            status=CheckStatus.BUILD_TIMEOUT, time=build_time, message=""
+            status=CheckStatus.BUILD_TIMEOUT, time=result.time, message=""
         )
 
-    exit_code, msg = result
+    if result.exit_code != 0:
+        msg = decode_output(result.output, result.output_truncated)
+        return BuildResult(
+            status=CheckStatus.BUILD_ERROR, time=result.time, message=msg
+        )
 
-    if exit_code != 0:
-        return BuildResult(status=CheckStatus.BUILD_ERROR, time=build_time, message=msg)
+    return BuildResult(status=CheckStatus.OK, time=result.time, message="")
 
-    return BuildResult(status=CheckStatus.OK, time=build_time, message="")
+
+def restore_build(
+    backend: SandboxBackend, sandbox: Sandbox, tar_source: bytes
+) -> BuildResult:
+    start_time = time.time()
+    # archive contains "source" directory with all the build artifacts
+    backend.put_archive(sandbox, "/root", tar_source)
+    restore_time = time.time() - start_time
+    return BuildResult(
+        status=CheckStatus.OK,
+        time=restore_time,
+        message="Build result was restored from cache",
+        cached=True,
+    )
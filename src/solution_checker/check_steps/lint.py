@@ -1,10 +1,29 @@
-from src.linter.linter import lint_dict, lint_errors_to_str
+import math
+
+from src.linter.executor import LintExecutor
+from src.linter.linter import lint_errors_to_str
 from src.solution_checker.models import LintResult
 
 
-def lint_solution(source_code: dict[str, str]) -> LintResult:
-    lint_errors = lint_dict(
-        source_code, [".c", ".h", ".cpp", ".hpp", ".go", ".js", ".cs", ".java"]
+def lint_solution(
+    source_code: dict[str, str],
+    executor: LintExecutor | None = None,
+    rules: tuple[str, ...] | None = None,
+) -> LintResult:
+    # files are linted in the calling thread without a CPU time limit by default
+    executor = executor or LintExecutor(0, math.inf, 0)
+    report = executor.lint(source_code, rules)
+    lint_errors_message = lint_errors_to_str(report.errors)
+    if report.partial:
+        if lint_errors_message:
+            lint_errors_message += "\n"
+        lint_errors_message += (
+            "--- Linting stopped, CPU time limit exceeded, not linted:\n"
+            + "".join(f"* {name}\n" for name in report.not_linted)
+        )
+    return LintResult(
+        success=not report.errors,
+        message=lint_errors_message,
+        partial=report.partial,
+        rule_times=report.rule_times,
     )
-    lint_errors_message = lint_errors_to_str(lint_errors)
-    return LintResult(success=not lint_errors_message, message=lint_errors_message)
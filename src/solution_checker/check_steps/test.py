@@ -1,67 +1,249 @@
-import time
+import json
+import logging
+import math
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable
 
-from docker.client import DockerClient
-from docker.models.containers import Container
-
-from src.solution_checker.models import TestsResult, TestResult
-from src.solution_checker.docker_utils import (
-    put_file_to_container,
-    get_file_from_container,
-)
+from src.solution_checker.comparators import Comparator, ComparatorSpec
+from src.solution_checker.models import ResourceUsage, TestsResult, TestResult
 from src.solution_checker.models import CheckStatus
-from src.solution_checker.threads.docker_test_thread import DockerTestThread
+from src.solution_checker.output import (
+    MAX_OUTPUT_SIZE,
+    BoundedOutput,
+    decode_output,
+    iter_tar_files,
+    preview,
+)
+from src.solution_checker.sandbox.backend import (
+    Sandbox,
+    SandboxBackend,
+    put_file,
+    stream_file,
+)
+from src.solution_checker.utils import TarStream
+
+logger = logging.getLogger(__name__)
+
+BATCH_RUNNER_SOURCE = (
+    Path(__file__).parent.parent / "runner" / "batch_runner.py"
+).read_text()
+# time for the runner itself to start and to store results
+BATCH_RUNNER_OVERHEAD = 5.0
+# when test timeout is enforced on CPU time, a test may still run this many
+# timeouts by the wall clock, e.g. waiting for input
+CPU_LIMIT_WALL_FACTOR = 3.0
+TIMES_PATTERN = re.compile(rb"(\d+)m(\d+[.,]?\d*)s")
+
+# gives a sandbox with the built solution in place of one lost by a test (e.g.
+# its container was killed or has died), None if it can't be replaced; only
+# sandboxes the backend confirms to be lost are replaced
+SandboxReplacer = Callable[[Sandbox], Sandbox | None]
+
+
+def get_comparator(
+    comparators: list[ComparatorSpec] | None, index: int
+) -> ComparatorSpec:
+    # answers are compared exactly unless another comparator is requested
+    return comparators[index] if comparators else ComparatorSpec()
+
+
+def get_output_limit(tests: list[list[str]], max_output: int) -> int:
+    # answer a bit longer than expected output must be seen to be rejected
+    longest = max((len(expected.encode()) for _, expected in tests), default=0)
+    return max(max_output, longest + 2)
+
+
+def get_wall_timeout(test_timeout: float, cpu_time_limit: bool) -> float:
+    return test_timeout * CPU_LIMIT_WALL_FACTOR if cpu_time_limit else test_timeout
+
+
+def parse_usage(output: bytes, marker: bytes) -> tuple[bytes, ResourceUsage | None]:
+    # splits output of the run command into output of the solution and its
+    # resource usage printed after the marker, which is lost if output was cut
+    position = output.rfind(marker)
+    if position == -1:
+        return output, None
+    trailer = output[position:].removeprefix(marker).split(b"\n")
+    # "times" prints CPU time of the shell and then of its children
+    times = TIMES_PATTERN.findall(b" ".join(trailer[:2]))
+    if len(times) != 4:
+        return output[:position], None
+    cpu_user, cpu_system = (
+        int(minutes) * 60 + float(seconds.replace(b",", b"."))
+        for minutes, seconds in times[2:]
+    )
+    output_file_size = trailer[2].strip() if len(trailer) > 2 else b""
+    output_bytes = position + (int(output_file_size) if output_file_size else 0)
+    return output[:position], ResourceUsage(cpu_user, cpu_system, None, output_bytes)
 
 
 def run_test(
-    client: DockerClient,
-    container: Container,
+    backend: SandboxBackend,
+    sandbox: Sandbox,
     test: list[str],
     io_path: str,
     test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    comparator: ComparatorSpec | None = None,
+    cpu_time_limit: bool = False,
 ) -> TestResult:
     input_file_path = io_path + "/input.txt"
     output_file_path = io_path + "/output.txt"
 
     test_input, expected_output = test
-    put_file_to_container(container, input_file_path, test_input)
+    put_file(backend, sandbox, input_file_path, test_input)
 
-    test_thread = DockerTestThread(
-        client, container, "/root/source", input_file_path, output_file_path
+    # CPU time used by the test is printed after its output, so it's taken
+    # with the same request, peak memory isn't known to the shell
+    marker = f"\n--usage-{uuid.uuid4().hex}--\n"
+    cpu_limit = f"ulimit -t {math.ceil(test_timeout)}; " if cpu_time_limit else ""
+    run_command = (
+        f"({cpu_limit}rm -f {output_file_path} && cat {input_file_path} | "
+        f"make -s ARGS='{input_file_path} {output_file_path}' run); code=$?; "
+        f"printf '%s' '{marker}'; times; "
+        f"[ -f {output_file_path} ] && wc -c < {output_file_path}; exit $code"
+    )
+    result = backend.exec(
+        sandbox,
+        run_command,
+        workdir="/root/source",
+        environment={
+            "ARGS": "{} {}".format(input_file_path, output_file_path),
+            "input_path": input_file_path,
+            "output_path": output_file_path,
+        },
+        timeout=get_wall_timeout(test_timeout, cpu_time_limit),
+        name="test",
+        # room for the usage printed after the output
+        max_output=max_output + len(marker) + 128,
     )
-    start_time = time.time()
-    test_thread.start()
-    test_thread.join(test_timeout)
-    test_time = time.time() - start_time
-    result = test_thread.result
-
-    if result is None:
-        test_thread.terminate()
-        # waiting for container to stop and then thread will exit
-        test_thread.join()
-        return TestResult(
+    test_time = result.time
+    output, usage = parse_usage(result.output, marker.encode())
+    output_truncated = result.output_truncated or len(output) > max_output
+    output = output[:max_output]
+
+    if result.timed_out or is_cpu_timeout(usage, test_timeout, cpu_time_limit):
+        test_result = TestResult(
             status=CheckStatus.EXECUTION_TIMEOUT, time=test_time, message=""
         )
-
-    exit_code, stdout = result
-    if exit_code != 0:
-        return TestResult(
-            status=CheckStatus.RUNTIME_ERROR, time=test_time, message=stdout
+    elif result.exit_code != 0:
+        msg = decode_output(output, output_truncated)
+        test_result = TestResult(
+            status=CheckStatus.RUNTIME_ERROR, time=test_time, message=msg
+        )
+    else:
+        # output file is streamed, so it's never kept in memory as a whole
+        answer = stream_file(backend, sandbox, output_file_path)
+        truncated = False
+        if answer is None:
+            answer = iter([output])
+            truncated = output_truncated
+        test_result = compare_answer(
+            test_input, expected_output, answer, test_time, comparator, truncated
         )
+    test_result.usage = usage
+    return test_result
+
+
+def run_test_replacing(
+    backend: SandboxBackend,
+    sandbox: Sandbox,
+    replace_sandbox: SandboxReplacer | None,
+    test: list[str],
+    io_path: str,
+    test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    comparator: ComparatorSpec | None = None,
+    cpu_time_limit: bool = False,
+) -> tuple[Sandbox, TestResult]:
+    # test is run again if its sandbox was lost, the returned sandbox is the one
+    # to run the following tests in
+    while True:
+        try:
+            test_result = run_test(
+                backend,
+                sandbox,
+                test,
+                io_path,
+                test_timeout,
+                max_output,
+                comparator,
+                cpu_time_limit,
+            )
+            return sandbox, test_result
+        except Exception as e:
+            sandbox = replace_lost_sandbox(
+                backend, sandbox, replace_sandbox, io_path, e
+            )
 
-    fout = get_file_from_container(container, output_file_path)
-    answer = fout if fout is not None else stdout
 
-    # it's a practice to add \n at the end of output, but usually tests don't have it
-    answer_has_end_newline = len(answer) > 0 and answer[-1] == "\n"
-    expected_has_not_end_newline = (
-        len(expected_output) > 0 and expected_output[-1] != "\n"
+def replace_lost_sandbox(
+    backend: SandboxBackend,
+    sandbox: Sandbox,
+    replace_sandbox: SandboxReplacer | None,
+    io_path: str,
+    error: Exception,
+) -> Sandbox:
+    if replace_sandbox is None or not backend.is_lost(sandbox, error):
+        raise error
+    replacement = replace_sandbox(sandbox)
+    if replacement is None:
+        raise error
+    logger.warning(
+        "Sandbox %s was lost, replaced by %s",
+        sandbox.id,
+        replacement.id,
+        exc_info=error,
     )
-    if answer_has_end_newline and expected_has_not_end_newline:
-        answer = answer[0:-1]
+    backend.exec(replacement, f"mkdir -p {io_path}", name="mkdir")
+    return replacement
+
+
+def is_cpu_timeout(
+    usage: ResourceUsage | None, test_timeout: float, cpu_time_limit: bool
+) -> bool:
+    return cpu_time_limit and usage is not None and usage.cpu_time > test_timeout
+
+
+def compare_answer(
+    test_input: str,
+    expected_output: str,
+    answer: Iterable[bytes],
+    test_time: float,
+    comparator_spec: ComparatorSpec | None = None,
+    truncated: bool = False,
+) -> TestResult:
+    comparator = (comparator_spec or ComparatorSpec()).create(expected_output)
+    feed_answer(comparator, answer)
+    return answer_result(test_input, expected_output, comparator, test_time, truncated)
+
+
+def feed_answer(comparator: Comparator, answer: Iterable[bytes]) -> None:
+    for chunk in answer:
+        # the rest of the answer is not read after the first difference
+        if not comparator.feed(chunk):
+            break
 
-    if answer != expected_output:
-        msg = 'For "{}" expected "{}", but got "{}"'.format(
-            test_input, expected_output, answer
+
+def answer_result(
+    test_input: str,
+    expected_output: str,
+    comparator: Comparator,
+    test_time: float,
+    truncated: bool = False,
+) -> TestResult:
+    passed = comparator.finish()
+    if not passed or truncated:
+        # answer cut at the output limit can't be accepted
+        position = comparator.mismatch or "the output limit"
+        msg = 'For "{}" expected "{}", but got "{}" (first difference at {})'.format(
+            preview(test_input),
+            preview(expected_output),
+            comparator.preview.text(),
+            position,
         )
         return TestResult(status=CheckStatus.TEST_ERROR, time=test_time, message=msg)
 
@@ -69,13 +251,18 @@ def run_test(
 
 
 def test_solution(
-    client: DockerClient,
-    container: Container,
+    backend: SandboxBackend,
+    sandbox: Sandbox,
     tests: list[list[str]],
     test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    comparators: list[ComparatorSpec] | None = None,
+    cpu_time_limit: bool = False,
+    replace_sandbox: SandboxReplacer | None = None,
 ) -> TestsResult:
     io_directory_path = "/root/io"
-    container.exec_run("mkdir -p {}".format(io_directory_path))
+    max_output = get_output_limit(tests, max_output)
+    backend.exec(sandbox, f"mkdir -p {io_directory_path}", name="mkdir")
 
     tests_result = TestsResult(
         tests_total=len(tests),
@@ -85,15 +272,283 @@ def test_solution(
         message="",
     )
 
-    for test in tests:
-        test_result = run_test(client, container, test, io_directory_path, test_timeout)
+    for i, test in enumerate(tests):
+        sandbox, test_result = run_test_replacing(
+            backend,
+            sandbox,
+            replace_sandbox,
+            test,
+            io_directory_path,
+            test_timeout,
+            max_output,
+            get_comparator(comparators, i),
+            cpu_time_limit,
+        )
+        if not add_test_result(tests_result, test_result):
+            break
+
+    return tests_result
+
+
+def add_test_result(tests_result: TestsResult, test_result: TestResult) -> bool:
+    tests_result.time += test_result.time
+    tests_result.results.append(test_result)
+    if test_result.status != CheckStatus.OK:
+        tests_result.status = test_result.status
+        tests_result.message = test_result.message
+        return False
+
+    tests_result.tests_passed += 1
+    return True
+
+
+def test_solution_parallel(
+    backend: SandboxBackend,
+    sandboxes: list[Sandbox],
+    tests: list[list[str]],
+    test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    comparators: list[ComparatorSpec] | None = None,
+    cpu_time_limit: bool = False,
+    replace_sandbox: SandboxReplacer | None = None,
+) -> TestsResult:
+    io_directory_path = "/root/io"
+    workers_count = len(sandboxes)
+    max_output = get_output_limit(tests, max_output)
+
+    lock = threading.Lock()
+    results: dict[int, TestResult] = {}
+    errors: list[Exception] = []
+    # index of the first failed test known so far, tests after it are not needed
+    first_failure = len(tests)
 
-        tests_result.time += test_result.time
-        if test_result.status != CheckStatus.OK:
-            tests_result.status = test_result.status
-            tests_result.message = test_result.message
-            return tests_result
+    def run_shard(shard: int) -> None:
+        nonlocal first_failure
+        sandbox = sandboxes[shard]
+        try:
+            backend.exec(sandbox, f"mkdir -p {io_directory_path}", name="mkdir")
+            # tests are interleaved, so every shard goes from the first tests
+            for i in range(shard, len(tests), workers_count):
+                with lock:
+                    if i > first_failure:
+                        return
+                sandbox, test_result = run_test_replacing(
+                    backend,
+                    sandbox,
+                    replace_sandbox,
+                    tests[i],
+                    io_directory_path,
+                    test_timeout,
+                    max_output,
+                    get_comparator(comparators, i),
+                    cpu_time_limit,
+                )
+                with lock:
+                    results[i] = test_result
+                    if test_result.status != CheckStatus.OK:
+                        first_failure = min(first_failure, i)
+                        return
+        except Exception as e:
+            with lock:
+                errors.append(e)
+                first_failure = -1
 
-        tests_result.tests_passed += 1
+    threads = [
+        threading.Thread(target=run_shard, args=(shard,))
+        for shard in range(workers_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    tests_result = TestsResult(
+        tests_total=len(tests),
+        tests_passed=0,
+        status=CheckStatus.OK,
+        time=0.0,
+        message="",
+    )
+    # all the tests before the first failed one have been run by some shard
+    for i in range(len(tests)):
+        if not add_test_result(tests_result, results[i]):
+            break
 
     return tests_result
+
+
+def create_io_archive(
+    tests: list[list[str]],
+    test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    cpu_time_limit: bool = False,
+) -> TarStream:
+    # runner, manifest and inputs of tests, the archive doesn't depend on the
+    # solution, so checks of many solutions against the same tests may share it
+    manifest = {
+        # relative to manifest directory
+        "sourcePath": "../source",
+        "testsCount": len(tests),
+        "testTimeout": test_timeout,
+        "wallTimeout": get_wall_timeout(test_timeout, cpu_time_limit),
+        "cpuTimeLimit": cpu_time_limit,
+        "maxOutput": get_output_limit(tests, max_output),
+    }
+    files = {"runner.py": BATCH_RUNNER_SOURCE, "manifest.json": json.dumps(manifest)}
+    for i, (test_input, _) in enumerate(tests):
+        files[f"inputs/{i}.txt"] = test_input
+    return TarStream(files, "io/")
+
+
+def test_solution_batch(
+    backend: SandboxBackend,
+    sandbox: Sandbox,
+    tests: list[list[str]],
+    test_timeout: float,
+    max_output: int = MAX_OUTPUT_SIZE,
+    comparators: list[ComparatorSpec] | None = None,
+    io_archive: TarStream | None = None,
+    cpu_time_limit: bool = False,
+    replace_sandbox: SandboxReplacer | None = None,
+) -> TestsResult:
+    if io_archive is None:
+        io_archive = create_io_archive(tests, test_timeout, max_output, cpu_time_limit)
+    # the whole batch is run again if its sandbox was lost
+    while True:
+        try:
+            return run_batch(
+                backend,
+                sandbox,
+                tests,
+                test_timeout,
+                max_output,
+                comparators,
+                io_archive,
+                cpu_time_limit,
+            )
+        except Exception as e:
+            sandbox = replace_lost_sandbox(
+                backend, sandbox, replace_sandbox, "/root/io", e
+            )
+
+
+def run_batch(
+    backend: SandboxBackend,
+    sandbox: Sandbox,
+    tests: list[list[str]],
+    test_timeout: float,
+    max_output: int,
+    comparators: list[ComparatorSpec] | None,
+    io_archive: TarStream,
+    cpu_time_limit: bool,
+) -> TestsResult:
+    io_directory_path = "/root/io"
+    results_path = io_directory_path + "/results"
+    runner_path = io_directory_path + "/runner.py"
+    manifest_path = io_directory_path + "/manifest.json"
+
+    tests_result = TestsResult(
+        tests_total=len(tests),
+        tests_passed=0,
+        status=CheckStatus.OK,
+        time=0.0,
+        message="",
+    )
+
+    backend.put_archive(sandbox, "/root", io_archive)
+
+    result = backend.exec(
+        sandbox,
+        f"python3 {runner_path} {manifest_path}",
+        timeout=get_wall_timeout(test_timeout, cpu_time_limit) * len(tests)
+        + BATCH_RUNNER_OVERHEAD,
+        name="batch_test",
+        max_output=max_output,
+    )
+
+    if result.timed_out:
+        tests_result.status = CheckStatus.EXECUTION_TIMEOUT
+        tests_result.time = result.time
+        return tests_result
+
+    if result.exit_code != 0:
+        # runner itself has failed, so nothing can be said about the tests
+        tests_result.status = CheckStatus.RUNTIME_ERROR
+        tests_result.time = result.time
+        tests_result.message = decode_output(result.output, result.output_truncated)
+        return tests_result
+
+    results_file = stream_file(backend, sandbox, results_path + "/results.json")
+    if results_file is None:
+        raise FileNotFoundError("Batch runner has not stored results")
+    results = json.loads(b"".join(results_file))
+
+    # outputs are compared while the archive is read, only stdout of a failed
+    # test is kept for the message
+    answers: dict[str, Comparator] = {}
+    failed_stdout = BoundedOutput(max_output)
+    for name, chunks in iter_tar_files(backend.stream_archive(sandbox, results_path)):
+        # archive contains requested directory as the root element
+        name = name.split("/", 1)[-1]
+        index, _, kind = name.partition(".")
+        if not index.isdigit() or int(index) >= len(results):
+            continue
+        test_run = results[int(index)]
+        if kind == "stdout" and (test_run["timedOut"] or test_run["exitCode"] != 0):
+            for chunk in chunks:
+                failed_stdout.write(chunk)
+        elif kind in ("stdout", "output"):
+            comparator = get_comparator(comparators, int(index))
+            answers[name] = comparator.create(tests[int(index)][1])
+            feed_answer(answers[name], chunks)
+
+    for i, (test, test_run) in enumerate(zip(tests, results)):
+        test_input, expected_output = test
+
+        if test_run["timedOut"]:
+            test_result = TestResult(
+                status=CheckStatus.EXECUTION_TIMEOUT,
+                time=test_run["time"],
+                message="",
+            )
+        elif test_run["exitCode"] != 0:
+            msg = decode_output(
+                failed_stdout.getvalue(),
+                failed_stdout.truncated or test_run.get("stdoutTruncated", False),
+            )
+            test_result = TestResult(
+                status=CheckStatus.RUNTIME_ERROR, time=test_run["time"], message=msg
+            )
+        else:
+            # answer is taken from output file if the solution has written it
+            kind = "output" if f"{i}.output" in answers else "stdout"
+            answer = answers.get(f"{i}.{kind}")
+            if answer is None:
+                answer = get_comparator(comparators, i).create(expected_output)
+            test_result = answer_result(
+                test_input,
+                expected_output,
+                answer,
+                test_run["time"],
+                test_run.get(f"{kind}Truncated", False),
+            )
+
+        test_result.usage = get_batch_usage(test_run)
+        if not add_test_result(tests_result, test_result):
+            break
+
+    return tests_result
+
+
+def get_batch_usage(test_run: dict[str, Any]) -> ResourceUsage | None:
+    if "cpuUser" not in test_run:
+        return None
+    return ResourceUsage(
+        test_run["cpuUser"],
+        test_run["cpuSystem"],
+        test_run.get("peakMemory"),
+        test_run.get("outputBytes"),
+    )
@@ -0,0 +1,294 @@
+import codecs
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from src.solution_checker.output import TextPreview
+
+# Comparators check answer against expected output as it arrives, chunk by
+# chunk, and stop on the first difference. Answer is never kept as a whole,
+# only a bounded preview of it and a token or a line being compared.
+
+TOKEN_PATTERN = re.compile(r"\S+")
+NUMBER_PATTERN = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+# answer number may be written with more digits than expected one
+MAX_NUMBER_LENGTH = 128
+
+
+class Comparator(ABC):
+    def __init__(self, expected: str):
+        self.expected = expected
+        # position of the first difference in the answer, e.g. "line 2, column 3"
+        self.mismatch: str | None = None
+        self.preview = TextPreview()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk: bytes) -> bool:
+        # returns False as soon as the answer is known to be wrong
+        self.preview.write(chunk)
+        if self.mismatch is None:
+            self._compare(self._decoder.decode(chunk))
+        return self.mismatch is None
+
+    def finish(self) -> bool:
+        if self.mismatch is None:
+            self._compare(self._decoder.decode(b"", final=True))
+        if self.mismatch is None:
+            self._finish()
+        return self.mismatch is None
+
+    @abstractmethod
+    def _compare(self, text: str) -> None:
+        ...
+
+    @abstractmethod
+    def _finish(self) -> None:
+        # called at the end of the answer if no difference was found
+        ...
+
+
+class ExactComparator(Comparator):
+    # it's a practice to add \n at the end of output, but usually tests don't
+    # have it, so a single trailing newline of the answer is ignored
+    def __init__(self, expected: str):
+        super().__init__(expected)
+        self.allow_trailing_newline = len(expected) > 0 and expected[-1] != "\n"
+        self._position = 0
+        self._line = 1
+        self._column = 1
+
+    def _compare(self, text: str) -> None:
+        start = self._position
+        end = start + len(text)
+        expected_part = self.expected[start:end]
+        compared = len(expected_part)
+
+        if text[:compared] != expected_part:
+            for i, (char, expected_char) in enumerate(zip(text, expected_part)):
+                if char != expected_char:
+                    self._set_mismatch(text, i)
+                    return
+
+        extra = text[compared:]
+        if extra:
+            trailing_newline = (
+                self.allow_trailing_newline
+                and start + compared == len(self.expected)
+                and extra[0] == "\n"
+            )
+            if not trailing_newline:
+                self._set_mismatch(text, compared)
+                return
+            if len(extra) > 1:
+                self._set_mismatch(text, compared + 1)
+                return
+
+        self._advance(text)
+
+    def _finish(self) -> None:
+        if self._position < len(self.expected):
+            self.mismatch = f"line {self._line}, column {self._column}"
+
+    def _advance(self, text: str) -> None:
+        self._position += len(text)
+        newlines = text.count("\n")
+        if newlines:
+            self._line += newlines
+            self._column = len(text) - text.rfind("\n")
+        else:
+            self._column += len(text)
+
+    def _set_mismatch(self, text: str, index: int) -> None:
+        self._advance(text[:index])
+        self.mismatch = f"line {self._line}, column {self._column}"
+
+
+class TokenComparator(Comparator):
+    # answer and expected output are compared as sequences of tokens separated
+    # by any whitespace
+    def __init__(self, expected: str):
+        super().__init__(expected)
+        self._expected_tokens: Iterator[re.Match[str]] = TOKEN_PATTERN.finditer(
+            expected
+        )
+        self._expected_token = self._next_expected()
+        self._index = 0
+        self._line = 1
+        # token which may be continued by the next chunk
+        self._partial = ""
+        self._partial_line = 1
+
+    def _compare(self, text: str) -> None:
+        position = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+            if self._partial and start > 0:
+                self._check(self._partial, self._partial_line)
+                self._partial = ""
+                if self.mismatch is not None:
+                    return
+            self._line += text.count("\n", position, start)
+            position = end
+
+            if not self._partial:
+                self._partial_line = self._line
+            self._partial += match.group()
+            if end < len(text):
+                self._check(self._partial, self._partial_line)
+                self._partial = ""
+            elif len(self._partial) > self._max_token_length():
+                # the token can't match whatever follows it
+                self._index += 1
+                self._set_mismatch(self._partial_line)
+            if self.mismatch is not None:
+                return
+
+        if self._partial and position < len(text):
+            self._check(self._partial, self._partial_line)
+            self._partial = ""
+        self._line += text.count("\n", position)
+
+    def _finish(self) -> None:
+        if self._partial:
+            self._check(self._partial, self._partial_line)
+            self._partial = ""
+        if self.mismatch is None and self._expected_token is not None:
+            # answer is shorter than expected
+            self._index += 1
+            self._set_mismatch(self._line)
+
+    def _check(self, token: str, line: int) -> None:
+        self._index += 1
+        expected = self._expected_token
+        if expected is None or not self._tokens_equal(expected, token):
+            self._set_mismatch(line)
+            return
+        self._expected_token = self._next_expected()
+
+    def _set_mismatch(self, line: int) -> None:
+        self.mismatch = f"token {self._index} at line {line}"
+
+    def _next_expected(self) -> str | None:
+        match = next(self._expected_tokens, None)
+        return match.group() if match is not None else None
+
+    def _max_token_length(self) -> int:
+        return len(self._expected_token or "")
+
+    def _tokens_equal(self, expected: str, token: str) -> bool:
+        return expected == token
+
+
+class FloatComparator(TokenComparator):
+    # numbers are equal within absolute or relative epsilon, other tokens
+    # must match exactly
+    def __init__(self, expected: str, abs_epsilon: float, rel_epsilon: float):
+        super().__init__(expected)
+        self.abs_epsilon = abs_epsilon
+        self.rel_epsilon = rel_epsilon
+
+    def _max_token_length(self) -> int:
+        expected = self._expected_token or ""
+        if NUMBER_PATTERN.fullmatch(expected):
+            return max(len(expected), MAX_NUMBER_LENGTH)
+        return len(expected)
+
+    def _tokens_equal(self, expected: str, token: str) -> bool:
+        if expected == token:
+            return True
+        if not (NUMBER_PATTERN.fullmatch(expected) and NUMBER_PATTERN.fullmatch(token)):
+            return False
+        return math.isclose(
+            float(token),
+            float(expected),
+            rel_tol=self.rel_epsilon,
+            abs_tol=self.abs_epsilon,
+        )
+
+
+class UnorderedLinesComparator(Comparator):
+    # answer must contain the same lines as expected output in any order,
+    # a trailing newline of both is ignored
+    def __init__(self, expected: str):
+        super().__init__(expected)
+        lines = expected.split("\n") if expected else []
+        if expected.endswith("\n"):
+            lines.pop()
+        self._remaining = Counter(lines)
+        self._missing = len(lines)
+        self._max_line_length = max(map(len, lines), default=0)
+        self._line = 0
+        # line which may be continued by the next chunk
+        self._partial = ""
+
+    def _compare(self, text: str) -> None:
+        lines = text.split("\n")
+        for line in lines[:-1]:
+            self._check(self._partial + line)
+            self._partial = ""
+            if self.mismatch is not None:
+                return
+
+        self._partial += lines[-1]
+        if len(self._partial) > self._max_line_length:
+            self.mismatch = f"line {self._line + 1}"
+
+    def _finish(self) -> None:
+        if self._partial:
+            self._check(self._partial)
+            self._partial = ""
+        if self.mismatch is None and self._missing > 0:
+            # some expected lines were not printed
+            self.mismatch = f"line {self._line + 1}"
+
+    def _check(self, line: str) -> None:
+        self._line += 1
+        if self._remaining[line] == 0:
+            self.mismatch = f"line {self._line}"
+            return
+        self._remaining[line] -= 1
+        self._missing -= 1
+
+
+@dataclass
+class ComparatorSpec:
+    name: str = "exact"
+    abs_epsilon: float = 1e-6
+    rel_epsilon: float = 1e-6
+
+    def create(self, expected: str) -> Comparator:
+        if self.name == "float":
+            return FloatComparator(expected, self.abs_epsilon, self.rel_epsilon)
+        return COMPARATORS[self.name](expected)
+
+
+COMPARATORS: dict[str, type[Comparator]] = {
+    "exact": ExactComparator,
+    "tokens": TokenComparator,
+    "float": FloatComparator,
+    "lines": UnorderedLinesComparator,
+}
+
+
+def parse_comparator(value: Any) -> ComparatorSpec:
+    # comparator is given by name or by object with "type" and float epsilons
+    if isinstance(value, str):
+        value = {"type": value}
+    if not isinstance(value, dict) or value.get("type") not in COMPARATORS:
+        raise ValueError(
+            "comparator must be one of {} or object with such type".format(
+                ", ".join(COMPARATORS)
+            )
+        )
+    spec = ComparatorSpec(value["type"])
+    for key, field in (("absEpsilon", "abs_epsilon"), ("relEpsilon", "rel_epsilon")):
+        epsilon = value.get(key, getattr(spec, field))
+        if isinstance(epsilon, bool) or not isinstance(epsilon, (int, float)):
+            raise ValueError(f"{key} must be non-negative number")
+        if epsilon < 0:
+            raise ValueError(f"{key} must be non-negative number")
+        setattr(spec, field, float(epsilon))
+    return spec
@@ -0,0 +1,212 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Any
+
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledContainer:
+    container: Sandbox
+    created_at: float
+    image: str
+    uses: int = 0
+
+
+class ContainerPool:
+    # how often idle containers are checked for max age when pool is not busy
+    maintenance_interval = 5.0
+    # delay before next attempt when docker failed to create a container
+    retry_delay = 5.0
+
+    def __init__(
+        self,
+        size: int,
+        max_age: float,
+        max_uses: int,
+        backend: SandboxBackend,
+        images: tuple[str, ...] | None = None,
+    ):
+        # size is the number of idle containers of every image kept warm,
+        # containers of other images are created on demand; container is reset
+        # and reused for max_uses checks, 1 removes it after its only check
+        self.size = size
+        self.max_age = max_age
+        self.max_uses = max_uses
+
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.replaced = 0
+
+        self.backend = backend
+        self.images = images or (backend.default_image,)
+        self._lock = threading.Lock()
+        self._idle: dict[str, deque[PooledContainer]] = {
+            image: deque() for image in self.images
+        }
+        self._in_use: dict[str, PooledContainer] = {}
+        self._released: Queue[PooledContainer | None] = Queue()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._maintain, daemon=True)
+        self._thread.start()
+
+    def acquire(self, image: str | None = None) -> Sandbox:
+        image = image or self.backend.default_image
+        pooled: PooledContainer | None = None
+        expired: list[PooledContainer] = []
+        with self._lock:
+            idle = self._idle.setdefault(image, deque())
+            while idle:
+                candidate = idle.popleft()
+                if self._is_expired(candidate):
+                    expired.append(candidate)
+                    continue
+                pooled = candidate
+                break
+            if pooled is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        for candidate in expired:
+            self._remove(candidate)
+
+        if pooled is None:
+            container = self.backend.create(image)
+            pooled = PooledContainer(
+                container=container, created_at=time.time(), image=image
+            )
+
+        pooled.uses += 1
+        with self._lock:
+            self._in_use[pooled.container.id] = pooled
+        # wakes maintenance thread up to replace the container that was taken
+        self._released.put(None)
+        return pooled.container
+
+    def release(self, container: Sandbox) -> None:
+        with self._lock:
+            pooled = self._in_use.pop(container.id, None)
+        if pooled is None:
+            self.backend.destroy(container)
+            return
+        self._released.put(pooled)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "idleByImage": {image: len(idle) for image, idle in self._idle.items()},
+                "inUse": len(self._in_use),
+                "hits": self.hits,
+                "misses": self.misses,
+                "recycled": self.recycled,
+                "replaced": self.replaced,
+            }
+
+    def close(self) -> None:
+        self._closed = True
+        self._released.put(None)
+        self._thread.join()
+        with self._lock:
+            idle = [pooled for queue in self._idle.values() for pooled in queue]
+            for queue in self._idle.values():
+                queue.clear()
+        while not self._released.empty():
+            released = self._released.get()
+            if released is not None:
+                idle.append(released)
+        for pooled in idle:
+            self._remove(pooled)
+
+    def _is_expired(self, pooled: PooledContainer) -> bool:
+        return time.time() - pooled.created_at > self.max_age
+
+    def _remove(self, pooled: PooledContainer) -> None:
+        try:
+            self.backend.destroy(pooled.container)
+        except Exception:
+            logger.exception("Unable to remove container %s", pooled.container.id)
+
+    def _maintain(self) -> None:
+        while not self._closed:
+            self._remove_expired()
+            if not self._fill():
+                time.sleep(self.retry_delay)
+
+            try:
+                pooled = self._released.get(timeout=self.maintenance_interval)
+            except Empty:
+                continue
+            if pooled is not None:
+                self._recycle(pooled)
+
+    def _recycle(self, pooled: PooledContainer) -> None:
+        reusable = (
+            pooled.uses < self.max_uses
+            and not self._is_expired(pooled)
+            and not self._closed
+        )
+        if reusable and self._reset(pooled):
+            with self._lock:
+                idle = self._idle.setdefault(pooled.image, deque())
+                if len(idle) < self.size:
+                    idle.append(pooled)
+                    self.recycled += 1
+                    return
+
+        with self._lock:
+            self.replaced += 1
+        self._remove(pooled)
+
+    def _reset(self, pooled: PooledContainer) -> bool:
+        try:
+            return self.backend.reset(pooled.container)
+        except Exception:
+            logger.exception("Unable to reset container %s", pooled.container.id)
+            return False
+
+    def _remove_expired(self) -> None:
+        with self._lock:
+            expired = [
+                pooled
+                for idle in self._idle.values()
+                for pooled in idle
+                if self._is_expired(pooled)
+            ]
+            for pooled in expired:
+                self._idle[pooled.image].remove(pooled)
+        for pooled in expired:
+            self._remove(pooled)
+
+    def _fill(self) -> bool:
+        # image failing to start doesn't keep the others from being filled
+        filled = [self._fill_image(image) for image in self.images]
+        return all(filled)
+
+    def _fill_image(self, image: str) -> bool:
+        while not self._closed:
+            with self._lock:
+                if len(self._idle[image]) >= self.size:
+                    return True
+            try:
+                container = self.backend.create(image)
+            except Exception:
+                logger.exception("Unable to create container of image %s", image)
+                return False
+            with self._lock:
+                self._idle[image].append(
+                    PooledContainer(
+                        container=container, created_at=time.time(), image=image
+                    )
+                )
+        return True
@@ -0,0 +1,364 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+# Coordinator mode: checker nodes register themselves with their capacity and
+# send it again every few seconds, the coordinator forwards every check to the
+# least loaded node having a free slot and enough memory for it, preferring
+# nodes with warm containers of the solution's language. Node which failed to
+# answer is forgotten until its next heartbeat and the check goes to another one,
+# while a check which timed out is not sent again, the node may still run it.
+
+logger = logging.getLogger(__name__)
+
+# key of warm containers of the default image in NodeCapacity.warm
+DEFAULT_POOL = "default"
+# checks created with POST /checks whose nodes are remembered
+MAX_CHECKS = 100000
+
+
+class NoNodeAvailableError(Exception):
+    ...
+
+
+@dataclass
+class NodeCapacity:
+    # checks the node runs at once and checks running or queued on it
+    slots: int
+    running: int = 0
+    cpu_count: int = 1
+    # 1 minute load average of the host
+    load: float = 0.0
+    free_memory: int = 0
+    # idle warm containers by language, DEFAULT_POOL for the default image
+    warm: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "running": self.running,
+            "cpuCount": self.cpu_count,
+            "load": self.load,
+            "freeMemory": self.free_memory,
+            "warm": self.warm,
+        }
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "NodeCapacity":
+        warm = data.get("warm", {})
+        if not isinstance(warm, dict):
+            raise ValueError('"warm" must be dict')
+        try:
+            return NodeCapacity(
+                slots=int(data["slots"]),
+                running=int(data.get("running", 0)),
+                cpu_count=max(int(data.get("cpuCount", 1)), 1),
+                load=float(data.get("load", 0.0)),
+                free_memory=int(data.get("freeMemory", 0)),
+                warm={str(key): int(value) for key, value in warm.items()},
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Incorrect node capacity: {e}")
+
+
+@dataclass
+class Node:
+    url: str
+    capacity: NodeCapacity
+    seen_at: float = field(default_factory=time.time)
+    # checks forwarded by the coordinator and not answered yet, the reported
+    # running count lags behind them until the next heartbeat
+    dispatched: int = 0
+    checks: int = 0
+    failures: int = 0
+
+    @property
+    def busy(self) -> int:
+        return max(self.capacity.running, self.dispatched)
+
+    def fits(self, check_memory: int) -> bool:
+        return (
+            self.busy < self.capacity.slots
+            and self.capacity.free_memory >= check_memory
+        )
+
+    def score(self, language: str | None) -> tuple[float, bool, float]:
+        # the smaller the better: used share of slots, then warm containers,
+        # then CPU load of the host
+        warm = self.capacity.warm.get(language or DEFAULT_POOL)
+        if warm is None:
+            warm = self.capacity.warm.get(DEFAULT_POOL, 0)
+        return (
+            self.busy / max(self.capacity.slots, 1),
+            warm <= 0,
+            self.capacity.load / self.capacity.cpu_count,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "seenAt": self.seen_at,
+            "dispatched": self.dispatched,
+            "checks": self.checks,
+            "failures": self.failures,
+            **self.capacity.to_dict(),
+        }
+
+
+@dataclass
+class DispatchResult:
+    status: int
+    body: bytes
+    node: str
+    attempts: int
+    retry_after: str | None = None
+
+
+class Coordinator:
+    def __init__(
+        self,
+        node_ttl: float,
+        attempts: int,
+        timeout: float,
+        check_memory: int = 0,
+    ):
+        # node is considered dead if it didn't send heartbeat for node_ttl seconds
+        self.node_ttl = node_ttl
+        self.attempts = attempts
+        self.timeout = timeout
+        self.check_memory = check_memory
+
+        self.retries = 0
+        self._nodes: dict[str, Node] = {}
+        # node urls by ids of checks created on them
+        self._checks: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, url: str, capacity: NodeCapacity) -> Node:
+        with self._lock:
+            node = self._nodes.get(url)
+            if node is None:
+                node = self._nodes[url] = Node(url, capacity)
+            else:
+                node.capacity = capacity
+                node.seen_at = time.time()
+            return node
+
+    def nodes(self) -> list[Node]:
+        self._remove_expired()
+        with self._lock:
+            return list(self._nodes.values())
+
+    def dispatch(
+        self, path: str, body: bytes, language: str | None = None
+    ) -> DispatchResult:
+        # check is sent to nodes one by one until one of them answers, every
+        # response is returned as it is (a 500 may be caused by the check
+        # itself), except 429 (node is busy) returned only if every node
+        # rejected the check; only nodes which can't be reached are failed
+        tried: set[str] = set()
+        error = "No checker nodes are registered"
+        rejected: DispatchResult | None = None
+        for attempt in range(1, self.attempts + 1):
+            node = self._acquire(language, tried)
+            if node is None:
+                break
+            tried.add(node.url)
+            if attempt > 1:
+                self.retries += 1
+            try:
+                status, response, headers = self._send(node, path, body)
+            except TimeoutError:
+                # node has the check and is still running it, another node
+                # would run it twice
+                logger.warning("Checker node %s timed out", node.url)
+                error = f"Checker node {node.url} timed out"
+                response = json.dumps({"error": error}).encode()
+                return DispatchResult(504, response, node.url, attempt)
+            except Exception as e:
+                logger.exception("Checker node %s failed", node.url)
+                error = f"Checker node {node.url} failed: {e}"
+                self._fail(node)
+                continue
+            finally:
+                self._release(node)
+
+            if status == 429:
+                retry_after = headers.get("Retry-After")
+                if rejected is None or _seconds(retry_after) < _seconds(
+                    rejected.retry_after
+                ):
+                    rejected = DispatchResult(
+                        status, response, node.url, attempt, retry_after
+                    )
+                continue
+            with self._lock:
+                node.checks += 1
+            return DispatchResult(status, response, node.url, attempt)
+        if rejected is not None:
+            return rejected
+        raise NoNodeAvailableError(error)
+
+    def add_check(self, check_id: str, node_url: str) -> None:
+        with self._lock:
+            self._checks[check_id] = node_url
+            while len(self._checks) > MAX_CHECKS:
+                self._checks.popitem(last=False)
+
+    def get_check(self, check_id: str, path: str) -> DispatchResult | None:
+        # state of the check is requested from the node which runs it
+        with self._lock:
+            node_url = self._checks.get(check_id)
+        if node_url is None:
+            return None
+        try:
+            status, response, _ = self._get(node_url, path)
+        except Exception as e:
+            logger.exception("Checker node %s failed", node_url)
+            raise NoNodeAvailableError(f"Checker node {node_url} failed: {e}")
+        return DispatchResult(status, response, node_url, 1)
+
+    def _acquire(self, language: str | None, tried: set[str]) -> Node | None:
+        self._remove_expired()
+        with self._lock:
+            candidates = [
+                node for node in self._nodes.values() if node.url not in tried
+            ]
+            if not candidates:
+                return None
+            # when every node is full the check still goes to the least loaded
+            # one, nodes queue checks themselves
+            fitting = [node for node in candidates if node.fits(self.check_memory)]
+            candidates = fitting or candidates
+            node = min(candidates, key=lambda candidate: candidate.score(language))
+            node.dispatched += 1
+            return node
+
+    def _release(self, node: Node) -> None:
+        with self._lock:
+            node.dispatched -= 1
+
+    def _fail(self, node: Node) -> None:
+        # node is forgotten until it registers again
+        with self._lock:
+            node.failures += 1
+            if self._nodes.get(node.url) is node:
+                del self._nodes[node.url]
+
+    def _remove_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            expired = [
+                url
+                for url, node in self._nodes.items()
+                if now - node.seen_at > self.node_ttl
+            ]
+            for url in expired:
+                del self._nodes[url]
+
+    def _send(
+        self, node: Node, path: str, body: bytes
+    ) -> tuple[int, bytes, dict[str, str]]:
+        return post(node.url + path, body, self.timeout)
+
+    def _get(self, node_url: str, path: str) -> tuple[int, bytes, dict[str, str]]:
+        return get(node_url + path, self.timeout)
+
+
+def _seconds(retry_after: str | None) -> float:
+    try:
+        return float(retry_after) if retry_after is not None else math.inf
+    except ValueError:
+        return math.inf
+
+
+def post(url: str, body: bytes, timeout: float) -> tuple[int, bytes, dict[str, str]]:
+    post_request = urllib.request.Request(
+        url,
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    return send(post_request, timeout)
+
+
+def get(url: str, timeout: float) -> tuple[int, bytes, dict[str, str]]:
+    return send(urllib.request.Request(url, method="GET"), timeout)
+
+
+def send(
+    request: urllib.request.Request, timeout: float
+) -> tuple[int, bytes, dict[str, str]]:
+    # TimeoutError is raised when the node doesn't answer in time, failures to
+    # connect are raised as urllib.error.URLError
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read(), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), dict(e.headers)
+
+
+def get_free_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError):
+        return 0
+
+
+def get_load() -> float:
+    try:
+        return os.getloadavg()[0]
+    except OSError:
+        return 0.0
+
+
+class NodeAgent:
+    # sends capacity of this node to the coordinator every interval seconds
+    timeout = 5.0
+
+    def __init__(
+        self,
+        coordinator_url: str,
+        node_url: str,
+        api_key: str,
+        capacity: Callable[[], NodeCapacity],
+        interval: float,
+    ):
+        self.url = f"{coordinator_url.rstrip('/')}/nodes?api_key={api_key}"
+        self.node_url = node_url
+        self.capacity = capacity
+        self.interval = interval
+        self._stopped = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def register(self) -> bool:
+        body = json.dumps({"url": self.node_url, **self.capacity().to_dict()})
+        try:
+            status, response, _ = post(self.url, body.encode(), self.timeout)
+        except Exception:
+            logger.exception("Unable to register node %s", self.node_url)
+            return False
+        if status != 200:
+            logger.error(
+                "Node registration failed with status %s: %r", status, response
+            )
+        return status == 200
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.register()
+            self._stopped.wait(self.interval)
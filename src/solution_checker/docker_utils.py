@@ -1,62 +1,171 @@
-import tarfile
-from io import BytesIO
+import logging
+import threading
+import time
+from typing import Iterator
 
 import docker
 from docker.client import DockerClient
+from docker.constants import DEFAULT_MAX_POOL_SIZE
 from docker.models.containers import Container
 
+from src.solution_checker.metrics import (
+    CONTAINERS_ALIVE,
+    DOCKER_API_CALLS_SAVED,
+    DOCKER_API_SECONDS,
+    timed,
+)
+from src.solution_checker.output import READ_CHUNK_SIZE
+from src.solution_checker.utils import TarStream
 
-def create_container() -> tuple[DockerClient, Container]:
-    client = docker.from_env()
-    container = client.containers.run(
-        "liokorcode_checker",
-        detach=True,
-        tty=True,
-        network_disabled=True,
-        mem_limit="128m",
-    )
-    return client, container
+logger = logging.getLogger(__name__)
 
+# kills everything left by the previous solution (PID 1 is not affected)
+# and removes its files, so the container can be used for the next check
+RESET_COMMAND = '/bin/sh -c "kill -9 -1; rm -rf /root/source /root/io /tmp/*"'
 
-def remove_container(client: DockerClient, container_id: str) -> None:
-    container = client.containers.get(container_id)
-    if container.status == "running":
-        container.kill()
-    container.remove()
+IMAGE_NAME = "liokorcode_checker"
+# image id is cached to avoid extra request to dockerd on every check
+IMAGE_ID_TTL = 60.0
+_image_id_cache: dict[str, tuple[str, float]] = {}
 
+# events of containers meaning that they are not running anymore
+STOP_EVENTS = ("die", "oom", "destroy")
 
-def put_file_to_container(container: Container, path: str, content: str) -> None:
-    path_parts = path.split("/")
-    name, directory = path_parts[-1], "/".join(path_parts[0:-1])
+_client: DockerClient | None = None
+_client_lock = threading.Lock()
 
-    bio = BytesIO()
-    tar = tarfile.open(fileobj=bio, mode="w")
-    encoded = content.encode()
-    file = BytesIO(encoded)
-    tarinfo = tarfile.TarInfo(name)
-    tarinfo.size = len(encoded)
-    tar.addfile(tarinfo, fileobj=file)
-    tar.close()
-    bio.seek(0)
 
-    container.put_archive(directory, bio.read())
+def get_docker_client(max_pool_size: int | None = None) -> DockerClient:
+    # one client for the whole process, so its connections to dockerd are
+    # reused by all checks, the pool size is chosen by the first caller
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = docker.from_env(
+                max_pool_size=max_pool_size or DEFAULT_MAX_POOL_SIZE
+            )
+        return _client
 
 
-def get_file_from_container(container: Container, fname: str) -> str | None:
-    try:
-        bits, stats = container.get_archive(fname)
-        bio = BytesIO()
-        for chunk in bits:
-            bio.write(chunk)
-        bio.seek(0)
+class ContainerTracker:
+    # running containers of the checker, the state is updated from results of
+    # execs and the events stream of dockerd instead of inspecting containers
+    reconnect_delay = 1.0
+
+    def __init__(self) -> None:
+        self._running: set[str] = set()
+        self._watcher: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def add(self, container_id: str) -> None:
+        with self._lock:
+            self._running.add(container_id)
+
+    def remove(self, container_id: str) -> bool:
+        # returns whether the container was running
+        with self._lock:
+            running = container_id in self._running
+            self._running.discard(container_id)
+            return running
+
+    def mark_stopped(self, container_id: str) -> None:
+        with self._lock:
+            self._running.discard(container_id)
+
+    def is_running(self, container_id: str) -> bool:
+        with self._lock:
+            return container_id in self._running
+
+    def watch(self, client: DockerClient) -> None:
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(
+                target=self._watch, args=(client,), daemon=True
+            )
+        self._watcher.start()
+
+    def _watch(self, client: DockerClient) -> None:
+        # events missed while reconnecting only make reset of a dead container
+        # fail, which is reported as not reusable container anyway
+        while True:
+            try:
+                events = client.events(
+                    decode=True,
+                    filters={"type": "container", "event": list(STOP_EVENTS)},
+                )
+                for event in events:
+                    self.mark_stopped(event.get("id", ""))
+            except Exception:
+                logger.exception("Docker events stream failed, reconnecting")
+            time.sleep(self.reconnect_delay)
+
 
-        tar = tarfile.open(fileobj=bio)
-        file = tar.extractfile(tar.getmembers()[0])
-        tar.close()
+def create_container(client: DockerClient, image_name: str = IMAGE_NAME) -> Container:
+    # containers.run() inspects the created container, which is not needed
+    with timed(DOCKER_API_SECONDS, call="create_container"):
+        created = client.api.create_container(
+            image_name,
+            detach=True,
+            tty=True,
+            network_disabled=True,
+            host_config=client.api.create_host_config(mem_limit="128m"),
+        )
+        try:
+            client.api.start(created["Id"])
+        except Exception:
+            # container which failed to start is not left behind
+            client.api.remove_container(created["Id"], force=True)
+            raise
+    DOCKER_API_CALLS_SAVED.inc(call="inspect_container")
+    CONTAINERS_ALIVE.inc()
+    container: Container = client.containers.prepare_model({"Id": created["Id"]})
+    return container
 
-        if file is None:
-            return None
 
-        return file.read().decode()
+def put_archive_to_container(
+    container: Container, path: str, data: bytes | TarStream
+) -> None:
+    # stream is sent as the request body as it's produced, with known length
+    with timed(DOCKER_API_SECONDS, call="put_archive"):
+        container.put_archive(path, data)
+
+
+def get_image_id(client: DockerClient, image_name: str = IMAGE_NAME) -> str:
+    cached = _image_id_cache.get(image_name)
+    if cached is not None and time.time() - cached[1] < IMAGE_ID_TTL:
+        return cached[0]
+    with timed(DOCKER_API_SECONDS, call="get_image"):
+        image_id = str(client.images.get(image_name).id)
+    _image_id_cache[image_name] = (image_id, time.time())
+    return image_id
+
+
+def remove_container(
+    client: DockerClient, container_id: str, running: bool = True
+) -> None:
+    # running container is killed by the same request
+    with timed(DOCKER_API_SECONDS, call="remove_container"):
+        client.api.remove_container(container_id, force=True)
+    DOCKER_API_CALLS_SAVED.inc(call="inspect_container")
+    if running:
+        DOCKER_API_CALLS_SAVED.inc(call="kill_container")
+    CONTAINERS_ALIVE.dec()
+
+
+def reset_container(container: Container) -> bool:
+    # the caller knows that the container is running
+    try:
+        with timed(DOCKER_API_SECONDS, call="reset_container"):
+            execute_result = container.exec_run(RESET_COMMAND)
     except Exception:
-        return None
+        return False
+    DOCKER_API_CALLS_SAVED.inc(call="inspect_container")
+    return bool(execute_result.exit_code == 0)
+
+
+def stream_archive_from_container(container: Container, path: str) -> Iterator[bytes]:
+    with timed(DOCKER_API_SECONDS, call="get_archive"):
+        bits, stats = container.get_archive(path, chunk_size=READ_CHUNK_SIZE)
+    chunks: Iterator[bytes] = bits
+    return chunks
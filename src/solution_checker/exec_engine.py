@@ -0,0 +1,328 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from src.solution_checker.metrics import DOCKER_API_SECONDS
+from src.solution_checker.output import BoundedOutput
+
+# Runs command ($2) in a new session and kills its whole process group when
+# timeout ($1) expires, so only the solution is killed and the container stays
+# alive for the next exec. Exits with TIMEOUT_EXIT_CODE on timeout. Processes
+# left in background by the command are killed when it exits too. The timer
+# signals the wrapper from a session of its own, killed with its sleep when the
+# command exits first (wait -n misses a command which exited before it's called).
+EXEC_WRAPPER = """
+trap 'timed_out=1' USR1
+setsid /bin/bash -c "$2" & pid=$!
+exec 2>/dev/null
+setsid /bin/bash -c 'sleep "$1" && kill -USR1 $2' timer "$1" $$ >/dev/null &
+timer=$!
+wait $pid
+code=$?
+kill -9 -- -$pid $timer -$timer
+if [ -n "$timed_out" ]; then wait $pid; exit 124; fi
+exit $code
+"""
+TIMEOUT_EXIT_CODE = 124
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+
+
+class DockerExecError(Exception):
+    ...
+
+
+@dataclass
+class ExecResult:
+    exit_code: int | None
+    output: bytes
+    timed_out: bool
+    time: float
+    # output was longer than max_output and its end was dropped
+    output_truncated: bool = False
+
+
+class DockerExecEngine:
+    # time for the wrapper to kill timed out process group and exit,
+    # if it's exceeded the whole container is killed
+    kill_grace = 2.0
+    exit_code_poll_interval = 0.005
+    # idle keep-alive connections of the engine loop used by API requests
+    max_idle_connections = 8
+
+    def __init__(self, docker_host: str | None = None):
+        self.docker_host = docker_host or os.environ.get(
+            "DOCKER_HOST", DEFAULT_DOCKER_HOST
+        )
+        self._loop = asyncio.new_event_loop()
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def exec(
+        self,
+        container_id: str,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        # blocks the calling thread only, all the I/O is done by the engine loop
+        future = asyncio.run_coroutine_threadsafe(
+            self.exec_async(
+                container_id, command, workdir, environment, timeout, name, max_output
+            ),
+            self._loop,
+        )
+        return future.result()
+
+    async def exec_async(
+        self,
+        container_id: str,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        if timeout is None:
+            cmd = ["/bin/bash", "-c", command]
+        else:
+            cmd = ["/bin/bash", "-c", EXEC_WRAPPER, "exec", str(timeout), command]
+
+        body: dict[str, Any] = {
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": False,
+            "Cmd": cmd,
+        }
+        if workdir is not None:
+            body["WorkingDir"] = workdir
+        if environment is not None:
+            body["Env"] = [f"{key}={value}" for key, value in environment.items()]
+
+        start_time = time.perf_counter()
+        status, data = await self._request(
+            "POST", f"/containers/{container_id}/exec", body
+        )
+        if status != 201:
+            raise DockerExecError(f"Unable to create exec: {data.decode()}")
+        exec_id = json.loads(data)["Id"]
+
+        run_start_time = time.perf_counter()
+        output = BoundedOutput(max_output)
+        try:
+            await asyncio.wait_for(
+                self._start(exec_id, output),
+                None if timeout is None else timeout + self.kill_grace,
+            )
+        except asyncio.TimeoutError:
+            await self._request("POST", f"/containers/{container_id}/kill")
+            self._observe(name, start_time)
+            assert timeout is not None
+            return ExecResult(
+                exit_code=None,
+                output=output.getvalue(),
+                timed_out=True,
+                time=timeout,
+                output_truncated=output.truncated,
+            )
+        run_time = time.perf_counter() - run_start_time
+
+        # exec has to exit by the end of its timeout and the grace period
+        remaining = 0.0 if timeout is None else max(timeout - run_time, 0.0)
+        exit_code = await self._exit_code(
+            container_id, exec_id, time.monotonic() + remaining + self.kill_grace
+        )
+        self._observe(name, start_time)
+
+        timed_out = (
+            timeout is not None
+            and exit_code == TIMEOUT_EXIT_CODE
+            and run_time >= timeout
+        )
+        if timed_out:
+            assert timeout is not None
+            # run time includes wrapper startup, solution was run exactly timeout
+            run_time = timeout
+        return ExecResult(
+            exit_code=exit_code,
+            output=output.getvalue(),
+            timed_out=timed_out,
+            time=run_time,
+            output_truncated=output.truncated,
+        )
+
+    def _observe(self, name: str, start_time: float) -> None:
+        DOCKER_API_SECONDS.observe(
+            time.perf_counter() - start_time, call=f"exec_{name}"
+        )
+
+    async def _exit_code(
+        self, container_id: str, exec_id: str, deadline: float
+    ) -> int | None:
+        # exec may still be reported as running right after its output is closed
+        while True:
+            status, data = await self._request("GET", f"/exec/{exec_id}/json")
+            if status != 200:
+                raise DockerExecError(f"Unable to inspect exec: {data.decode()}")
+            exec_info = json.loads(data)
+            if not exec_info["Running"]:
+                exit_code: int | None = exec_info["ExitCode"]
+                return exit_code
+            if time.monotonic() >= deadline:
+                # container is killed, as with timed out exec, so it's known
+                # to be stopped
+                await self._request("POST", f"/containers/{container_id}/kill")
+                raise DockerExecError(f"Exec {exec_id} didn't exit in time")
+            await asyncio.sleep(self.exit_code_poll_interval)
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self.docker_host.startswith("unix://"):
+            return await asyncio.open_unix_connection(
+                self.docker_host.removeprefix("unix://")
+            )
+        host, port = self.docker_host.split("://", 1)[-1].rsplit(":", 1)
+        return await asyncio.open_connection(host, int(port))
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        body: dict[str, Any] | None,
+        headers: dict[str, str],
+    ) -> None:
+        data = json.dumps(body).encode() if body is not None else b""
+        request_headers = {
+            "Host": "docker",
+            "Content-Type": "application/json",
+            "Content-Length": str(len(data)),
+            **headers,
+        }
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(
+            f"{key}: {value}\r\n" for key, value in request_headers.items()
+        )
+        writer.write(head.encode() + b"\r\n" + data)
+        await writer.drain()
+
+    async def _read_head(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, dict[str, str]]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise DockerExecError("Docker closed connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, value = line.decode().split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+        return status, headers
+
+    async def _read_body(
+        self, reader: asyncio.StreamReader, headers: dict[str, str]
+    ) -> bytes:
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return b"".join(chunks)
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"]))
+        return await reader.read()
+
+    async def _request(
+        self, method: str, path: str, body: dict[str, Any] | None = None
+    ) -> tuple[int, bytes]:
+        # idle connections are reused, one closed by docker meanwhile is
+        # replaced with a new connection
+        while True:
+            reused = len(self._idle) > 0
+            reader, writer = self._idle.pop() if reused else await self._connect()
+            try:
+                await self._send(writer, method, path, body, {})
+                status, headers = await self._read_head(reader)
+                data = await self._read_body(reader, headers)
+            except BaseException as e:
+                writer.close()
+                if reused and isinstance(e, (ConnectionError, DockerExecError)):
+                    continue
+                raise
+            self._keep(reader, writer, headers)
+            return status, data
+
+    def _keep(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        headers: dict[str, str],
+    ) -> None:
+        # connection can take the next request if the response was read to
+        # its end without closing it
+        if (
+            headers.get("connection", "").lower() != "close"
+            and (
+                "content-length" in headers
+                or headers.get("transfer-encoding") == "chunked"
+            )
+            and len(self._idle) < self.max_idle_connections
+        ):
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def _start(self, exec_id: str, output: BoundedOutput) -> None:
+        # connection is upgraded to the output stream, so it's never reused
+        reader, writer = await self._connect()
+        try:
+            await self._send(
+                writer,
+                "POST",
+                f"/exec/{exec_id}/start",
+                {"Detach": False, "Tty": False},
+                {"Connection": "Upgrade", "Upgrade": "tcp"},
+            )
+            status, headers = await self._read_head(reader)
+            if status not in (101, 200):
+                body = await self._read_body(reader, headers)
+                raise DockerExecError(f"Unable to start exec: {body.decode()}")
+
+            # stdout and stderr are multiplexed, each frame has 8 bytes header:
+            # stream type, 3 zero bytes and big endian payload size; output over
+            # the limit is still read, so the command isn't blocked on write
+            while True:
+                try:
+                    header = await reader.readexactly(8)
+                except asyncio.IncompleteReadError:
+                    break
+                size = int.from_bytes(header[4:], "big")
+                output.write(await reader.readexactly(size))
+        finally:
+            writer.close()
+
+
+_engine: DockerExecEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_exec_engine() -> DockerExecEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = DockerExecEngine()
+        return _engine
@@ -0,0 +1,54 @@
+import os
+import re
+from dataclasses import dataclass
+
+# Language of a solution is detected by extensions of its files and, if
+# there are no known sources, by tools called in Makefile recipes. It's used
+# to pick a slim sandbox image with warm toolchain caches; mixed or unknown
+# solutions go to the default image containing every toolchain.
+
+
+@dataclass
+class Language:
+    name: str
+    extensions: tuple[str, ...]
+    tools: tuple[str, ...]
+
+
+LANGUAGES = [
+    # C and C++ share the toolchain and the image
+    Language("c", (".c", ".h", ".cpp", ".cc", ".cxx", ".hpp"), ("gcc", "g++", "cc")),
+    Language("go", (".go",), ("go",)),
+    Language("java", (".java",), ("javac", "java")),
+    Language("python", (".py",), ("python3", "python")),
+    Language("javascript", (".js",), ("node",)),
+    Language("php", (".php",), ("php",)),
+    Language("csharp", (".cs",), ("mcs", "mono")),
+    Language("pascal", (".pas",), ("fpc",)),
+    Language("fortran", (".f", ".f90", ".f95"), ("gfortran",)),
+    Language("lua", (".lua",), ("lua",)),
+    Language("asm", (".asm",), ("nasm",)),
+]
+RECIPE_WORD_PATTERN = re.compile(r"[\w+.-]+")
+
+
+def detect_language(source_code: dict[str, str]) -> str | None:
+    by_extension = set()
+    for path in source_code:
+        extension = os.path.splitext(path)[1].lower()
+        for language in LANGUAGES:
+            if extension in language.extensions:
+                by_extension.add(language.name)
+    if by_extension:
+        return by_extension.pop() if len(by_extension) == 1 else None
+
+    by_tool = set()
+    for line in source_code.get("Makefile", "").splitlines():
+        # only recipe lines run commands
+        if not line.startswith("\t"):
+            continue
+        words = set(RECIPE_WORD_PATTERN.findall(line))
+        for language in LANGUAGES:
+            if words.intersection(language.tools):
+                by_tool.add(language.name)
+    return by_tool.pop() if len(by_tool) == 1 else None
@@ -0,0 +1,248 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# minimal metrics registry rendered in Prometheus text exposition format
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._label_values(labels)] = value
+
+
+class FunctionGauge(Metric):
+    # value is read from the callback when metrics are rendered
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], float],
+        metric_type: str = "gauge",
+    ):
+        super().__init__(name, description)
+        self.callback = callback
+        self.type = metric_type
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {float(self.callback())}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+
+        lines = []
+        for key, bucket_counts in counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, bucket_counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += bucket_counts[-1]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {sums[key]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DOCKER_API_SECONDS = Histogram(
+    "checker_docker_api_seconds", "Duration of Docker API calls", ("call",)
+)
+DOCKER_API_CALLS_SAVED = Counter(
+    "checker_docker_api_calls_saved_total",
+    "Docker API calls avoided by tracking containers state locally",
+    ("call",),
+)
+STAGE_SECONDS = Histogram(
+    "checker_stage_seconds", "Duration of solution check stages", ("stage",)
+)
+CHECKS_TOTAL = Counter(
+    "checker_checks_total", "Finished checks by resulting status", ("status",)
+)
+CONTAINERS_ALIVE = Gauge(
+    "checker_containers_alive", "Containers created by the checker and not removed"
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "checker_queue_wait_seconds",
+    "Time checks waited in the scheduler by priority",
+    ("priority",),
+)
+LINT_RULE_SECONDS = Histogram(
+    "checker_lint_rule_seconds",
+    "Time spent by lint rules (and the tokenizer) on a solution",
+    ("rule",),
+)
+SANDBOX_REPLACEMENTS = Counter(
+    "checker_sandbox_replacements_total",
+    "Sandboxes lost during tests and replaced by ones started from the build snapshot",
+)
+for _metric in (
+    DOCKER_API_SECONDS,
+    DOCKER_API_CALLS_SAVED,
+    STAGE_SECONDS,
+    CHECKS_TOTAL,
+    CONTAINERS_ALIVE,
+    QUEUE_WAIT_SECONDS,
+    LINT_RULE_SECONDS,
+    SANDBOX_REPLACEMENTS,
+):
+    REGISTRY.register(_metric)
+
+
+@contextmanager
+def timed(
+    histogram: Histogram, timings: dict[str, float] | None = None, **labels: str
+) -> Iterator[None]:
+    # observes duration of the block, timings dict (if given) gets the sum of
+    # durations by the first label value
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        histogram.observe(duration, **labels)
+        if timings is not None:
+            key = next(iter(labels.values()), histogram.name)
+            timings[key] = timings.get(key, 0.0) + duration
@@ -1,6 +1,7 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
+from typing import Any
 
 
 class CheckStatus(Enum):
@@ -22,9 +23,24 @@ class CheckResult:
     message: str
     tests_passed: int
     tests_total: int
-    lint_success: bool
+    lint_success: bool | None
+    build_cached: bool = False
+    timings: dict[str, float] | None = None
+    # detected language of the solution and image it was checked in
+    language: str | None = None
+    image: str | None = None
+    # time the check waited in the scheduler before it was started
+    queue_time: float | None = None
+    lint_partial: bool = False
+    # CPU time of all tests and resources used by every test run, the usage
+    # is null for tests run where it can't be measured
+    tests_cpu_time: float | None = None
+    tests_usage: list[dict[str, Any]] | None = None
 
     def json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def to_dict(self) -> dict[str, Any]:
         # todo: remove when backend is ready to use new fields
         datakey_mapper = {
             "tests_time": "check_time",
@@ -32,7 +48,7 @@ class CheckResult:
             "message": "check_message",
         }
 
-        json_data = {}
+        json_data: dict[str, Any] = {}
         for key, value in self.__dict__.items():
             datakey = datakey_mapper.get(key)
             key = datakey if datakey is not None else key
@@ -40,10 +56,10 @@ class CheckResult:
             new_key = key_split[0] + "".join(
                 word.capitalize() for word in key_split[1:]
             )
-            if type(value) == CheckStatus:
+            if isinstance(value, CheckStatus):
                 value = value.value
             json_data[new_key] = value
-        return json.dumps(json_data)
+        return json_data
 
 
 @dataclass
@@ -51,6 +67,32 @@ class BuildResult:
     status: CheckStatus
     time: float
     message: str
+    cached: bool = False
+
+
+@dataclass
+class ResourceUsage:
+    # CPU time of the test processes counted by the kernel, unlike the time
+    # it doesn't depend on the host load and docker API latency
+    cpu_user: float
+    cpu_system: float
+    # peak resident memory of the largest process, None if it's not known
+    peak_memory: int | None = None
+    # bytes written to stdout and to the output file
+    output_bytes: int | None = None
+
+    @property
+    def cpu_time(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "cpuTime": round(self.cpu_time, 4),
+            "cpuUser": round(self.cpu_user, 4),
+            "cpuSystem": round(self.cpu_system, 4),
+            "peakMemory": self.peak_memory,
+            "outputBytes": self.output_bytes,
+        }
 
 
 @dataclass
@@ -58,6 +100,7 @@ class TestResult:
     status: CheckStatus
     time: float
     message: str
+    usage: ResourceUsage | None = None
 
 
 @dataclass
@@ -67,9 +110,15 @@ class TestsResult:
     message: str
     tests_passed: int
     tests_total: int
+    # every test run, up to the first failed one
+    results: list[TestResult] = field(default_factory=list)
 
 
 @dataclass
 class LintResult:
     success: bool
     message: str
+    # some files were not linted as the CPU budget of linting was exceeded
+    partial: bool = False
+    # seconds spent by the tokenizer and every lint rule
+    rule_times: dict[str, float] = field(default_factory=dict)
@@ -0,0 +1,116 @@
+import codecs
+import io
+import tarfile
+from typing import Generator, Iterable, Iterator
+
+OUTPUT_TRUNCATED_MARKER = "... [output truncated]"
+# output of a command kept by default, the rest is dropped
+MAX_OUTPUT_SIZE = 1024 * 1024
+# size of outputs and inputs quoted in check messages
+MESSAGE_PREVIEW_SIZE = 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class BoundedOutput:
+    # keeps only the first limit bytes of output, the rest is counted and dropped
+    def __init__(self, limit: int | None):
+        self.limit = limit
+        self.size = 0
+        self._chunks: list[bytes] = []
+        self._kept = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.limit is not None and self.size > self.limit
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.limit is not None:
+            free = max(self.limit - self._kept, 0)
+            chunk = chunk[:free]
+        if chunk:
+            self._chunks.append(chunk)
+            self._kept += len(chunk)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def preview(
+    text: str, truncated: bool = False, size: int = MESSAGE_PREVIEW_SIZE
+) -> str:
+    if len(text) > size:
+        return text[:size] + OUTPUT_TRUNCATED_MARKER
+    return text + OUTPUT_TRUNCATED_MARKER if truncated else text
+
+
+def decode_output(data: bytes, truncated: bool = False) -> str:
+    text = data.decode(errors="replace")
+    return text + OUTPUT_TRUNCATED_MARKER if truncated else text
+
+
+class TextPreview:
+    # decodes stream of bytes keeping only the beginning of the text
+    def __init__(self, size: int = MESSAGE_PREVIEW_SIZE):
+        self.size = size
+        self.truncated = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parts: list[str] = []
+        self._length = 0
+
+    def write(self, chunk: bytes) -> None:
+        if self.truncated:
+            return
+        text = self._decoder.decode(chunk)
+        if self._length + len(text) > self.size:
+            free = self.size - self._length
+            text = text[:free]
+            self.truncated = True
+        self._parts.append(text)
+        self._length += len(text)
+
+    def text(self) -> str:
+        text = "".join(self._parts)
+        return text + OUTPUT_TRUNCATED_MARKER if self.truncated else text
+
+
+class ChunksReader(io.RawIOBase):
+    # file-like object over an iterable of chunks, e.g. Docker archive stream
+    def __init__(self, chunks: Iterable[bytes | memoryview]):
+        self._chunks = iter(chunks)
+        self._buffer: bytes | memoryview = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: "bytearray | memoryview") -> int:  # type: ignore[override]
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def open_tar_stream(
+    chunks: Iterable[bytes | memoryview], chunk_size: int = READ_CHUNK_SIZE
+) -> tarfile.TarFile:
+    # members of the archive can be read only in order
+    reader = io.BufferedReader(ChunksReader(chunks), chunk_size)
+    return tarfile.open(fileobj=reader, mode="r|")
+
+
+def iter_tar_files(
+    chunks: Iterable[bytes | memoryview], chunk_size: int = READ_CHUNK_SIZE
+) -> Generator[tuple[str, Iterator[bytes]], None, None]:
+    # reads tar archive as a stream, contents of every regular file are yielded
+    # by chunks and must be consumed before the next file is taken
+    with open_tar_stream(chunks, chunk_size) as tar:
+        for member in tar:
+            file = tar.extractfile(member)
+            if file is None:
+                continue
+            yield member.name, iter(lambda: file.read(chunk_size), b"")
@@ -0,0 +1,60 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Any]
+    # stages that must finish successfully before this one is started
+    depends_on: tuple[str, ...] = ()
+    # tells whether stage result allows dependent stages to run
+    succeeded: Callable[[Any], bool] = lambda result: True
+
+
+class Pipeline:
+    # runs independent stages concurrently, dependent ones as soon as their
+    # dependencies are done; with fail_fast stages not started by the first
+    # failure are skipped, stages already running (e.g. lint) are finished
+    def __init__(self, stages: list[Stage], fail_fast: bool):
+        self.stages = stages
+        self.fail_fast = fail_fast
+
+    def run(self) -> dict[str, Any]:
+        results: dict[str, Any] = {}
+        succeeded: set[str] = set()
+        pending = {stage.name: stage for stage in self.stages}
+        running: dict[Future[Any], Stage] = {}
+
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.stages)))
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    finished = all(
+                        dependency in results for dependency in stage.depends_on
+                    )
+                    if not finished:
+                        continue
+                    del pending[name]
+                    if all(dependency in succeeded for dependency in stage.depends_on):
+                        running[executor.submit(stage.run)] = stage
+                    else:
+                        # stage is skipped, so is everything depending on it
+                        results[name] = None
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    result = future.result()
+                    results[stage.name] = result
+                    if stage.succeeded(result):
+                        succeeded.add(stage.name)
+                    elif self.fail_fast:
+                        pending.clear()
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return results
@@ -0,0 +1,132 @@
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from src.solution_checker.models import CheckResult, CheckStatus
+
+# results depending on host load are not reused, as well as results of
+# lint stopped by its CPU budget
+NOT_CACHED_STATUSES = (CheckStatus.EXECUTION_TIMEOUT, CheckStatus.BUILD_TIMEOUT)
+
+
+class InFlightCheck:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: CheckResult | None = None
+        self.error: Exception | None = None
+
+
+class ResultCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[CheckResult, float]] = OrderedDict()
+        self._in_flight: dict[str, InFlightCheck] = {}
+
+    @staticmethod
+    def make_key(
+        source_code: dict[str, str],
+        tests: list[list[str]],
+        build_timeout: float,
+        test_timeout: float,
+        image_id: str,
+        stages: list[str],
+        fail_fast: bool,
+        comparators: list[dict[str, Any]],
+        lint_rules: list[str] | None = None,
+        cpu_time_limit: bool = False,
+    ) -> str:
+        data = json.dumps(
+            {
+                "sourceCode": source_code,
+                "tests": tests,
+                "buildTimeout": build_timeout,
+                "testTimeout": test_timeout,
+                "image": image_id,
+                "stages": stages,
+                "failFast": fail_fast,
+                "comparators": comparators,
+                "lintRules": lint_rules,
+                "cpuTimeLimit": cpu_time_limit,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get_or_check(self, key: str, check: Callable[[], CheckResult]) -> CheckResult:
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                self.hits += 1
+                return dataclasses.replace(cached)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                self.misses += 1
+                in_flight = InFlightCheck()
+                self._in_flight[key] = in_flight
+                owner = True
+            else:
+                self.deduplicated += 1
+                owner = False
+
+        if not owner:
+            # identical check is running already, so its result is reused
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            assert in_flight.result is not None
+            return dataclasses.replace(in_flight.result)
+
+        try:
+            result = check()
+        except Exception as e:
+            in_flight.error = e
+            raise
+        else:
+            in_flight.result = result
+            with self._lock:
+                if result.status not in NOT_CACHED_STATUSES and not result.lint_partial:
+                    self._put(key, result)
+            return dataclasses.replace(result)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+            }
+
+    def _get(self, key: str) -> CheckResult | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, stored_at = entry
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: str, result: CheckResult) -> None:
+        self._entries[key] = (dataclasses.replace(result), time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,176 @@
+# This script is executed inside the checker container, so it must depend only
+# on python3 standard library. It runs every test listed in manifest and stores
+# outputs, exit codes, timings and resource usage in results directory, which
+# is downloaded by the checker in one archive. Paths are resolved relative to
+# the manifest directory, so the runner doesn't depend on container layout.
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import IO
+
+IO_PATH = "/root/io"
+READ_CHUNK_SIZE = 64 * 1024
+# time to read the rest of stdout after the test is finished, a process which
+# left the process group of the test may keep the pipe open forever
+READER_JOIN_TIMEOUT = 1.0
+
+
+class BoundedReader(threading.Thread):
+    # keeps only the first limit bytes of the stream, the rest is read and
+    # dropped, so the solution is never blocked on a full pipe
+    def __init__(self, stream: IO[bytes], limit: int | None):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.limit = limit
+        self.size = 0
+        self.chunks: list[bytes] = []
+
+    def run(self) -> None:
+        kept = 0
+        while chunk := self.stream.read(READ_CHUNK_SIZE):
+            self.size += len(chunk)
+            if self.limit is not None:
+                free = max(self.limit - kept, 0)
+                chunk = chunk[:free]
+            if chunk:
+                self.chunks.append(chunk)
+                kept += len(chunk)
+
+    @property
+    def truncated(self) -> bool:
+        return self.limit is not None and self.size > self.limit
+
+
+def run_test(
+    source_path: str,
+    input_path: str,
+    output_path: str,
+    timeout: float,
+    max_output: int | None = None,
+    wall_timeout: float | None = None,
+    cpu_time_limit: bool = False,
+) -> tuple[dict[str, object], bytes]:
+    # timeout is enforced on CPU time if cpu_time_limit is set, the test is
+    # still killed after wall_timeout, e.g. if it waits for input
+    run_command = (
+        f"rm -f {output_path} && cat {input_path} | "
+        f"make -s ARGS='{input_path} {output_path}' run"
+    )
+    if cpu_time_limit:
+        # every process of the test gets SIGXCPU when it exceeds the limit
+        run_command = f"ulimit -t {math.ceil(timeout)}; {run_command}"
+    env = dict(os.environ)
+    env.update(
+        {
+            "ARGS": f"{input_path} {output_path}",
+            "input_path": input_path,
+            "output_path": output_path,
+        }
+    )
+
+    start_time = time.time()
+    process = subprocess.Popen(
+        ["/bin/bash", "-c", run_command],
+        cwd=source_path,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+        bufsize=0,
+    )
+    assert process.stdout is not None
+    reader = BoundedReader(process.stdout, max_output)
+    reader.start()
+
+    killed = threading.Event()
+
+    def kill() -> None:
+        killed.set()
+        kill_group(process.pid)
+
+    timer = threading.Timer(wall_timeout or timeout, kill)
+    timer.start()
+    # unlike wait, wait4 returns CPU time and peak memory of the test process
+    # and all its children it has waited for
+    _, status, usage = os.wait4(process.pid, 0)
+    timer.cancel()
+    # children left in background must not outlive the test, e.g. to write its
+    # output after it was scored
+    kill_group(process.pid)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    reader.join(READER_JOIN_TIMEOUT)
+    test_time = time.time() - start_time
+    cpu_time = usage.ru_utime + usage.ru_stime
+
+    result: dict[str, object] = {
+        "exitCode": process.returncode,
+        "time": test_time,
+        "timedOut": killed.is_set() or (cpu_time_limit and cpu_time > timeout),
+        "stdoutTruncated": reader.truncated,
+        "outputTruncated": False,
+        "cpuUser": usage.ru_utime,
+        "cpuSystem": usage.ru_stime,
+        # kilobytes on Linux
+        "peakMemory": usage.ru_maxrss * 1024,
+        "outputBytes": reader.size,
+    }
+    if os.path.isfile(output_path):
+        output_size = os.path.getsize(output_path)
+        result["outputBytes"] = reader.size + output_size
+        # output file is downloaded by the checker, so it's cut at the limit too
+        if max_output is not None and output_size > max_output:
+            os.truncate(output_path, max_output)
+            result["outputTruncated"] = True
+    return result, b"".join(list(reader.chunks))
+
+
+def kill_group(pid: int) -> None:
+    # solution may spawn children, so the whole process group is killed
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def main() -> None:
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else IO_PATH + "/manifest.json"
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    io_path = os.path.dirname(os.path.abspath(manifest_path))
+    source_path = os.path.normpath(os.path.join(io_path, manifest["sourcePath"]))
+    results_path = io_path + "/results"
+    os.makedirs(results_path, exist_ok=True)
+
+    results = []
+    for i in range(manifest["testsCount"]):
+        input_path = f"{io_path}/inputs/{i}.txt"
+        output_path = f"{results_path}/{i}.output"
+        result, stdout = run_test(
+            source_path,
+            input_path,
+            output_path,
+            manifest["testTimeout"],
+            manifest.get("maxOutput"),
+            manifest.get("wallTimeout"),
+            manifest.get("cpuTimeLimit", False),
+        )
+        with open(f"{results_path}/{i}.stdout", "wb") as f:
+            f.write(stdout)
+        results.append(result)
+
+        # the checker stops on the first failed test, so the rest is not needed
+        if result["timedOut"] or result["exitCode"] != 0:
+            break
+
+    with open(results_path + "/results.json", "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
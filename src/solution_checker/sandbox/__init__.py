@@ -0,0 +1,30 @@
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
+from src.solution_checker.sandbox.docker_backend import DockerBackend
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.sandbox.local_backend import LocalBackend
+
+BACKENDS: dict[str, type[SandboxBackend]] = {
+    DockerBackend.name: DockerBackend,
+    LocalBackend.name: LocalBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def create_backend(name: str, concurrency: int | None = None) -> SandboxBackend:
+    # concurrency is the number of threads using the backend at once
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown sandbox backend {name}")
+    if backend_class is DockerBackend:
+        return DockerBackend(max_pool_size=concurrency)
+    return backend_class()
+
+
+__all__ = [
+    "Sandbox",
+    "SandboxBackend",
+    "DockerBackend",
+    "FakeBackend",
+    "LocalBackend",
+    "create_backend",
+]
@@ -0,0 +1,107 @@
+import tarfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator
+
+from src.solution_checker.exec_engine import ExecResult
+from src.solution_checker.output import iter_tar_files, open_tar_stream
+from src.solution_checker.utils import TarStream
+
+# tar archive given whole (e.g. restored from build cache) or produced on the fly
+ArchiveData = bytes | TarStream
+
+
+@dataclass
+class Sandbox:
+    id: str
+
+
+class SandboxBackend(ABC):
+    # runtime executing solutions: every sandbox has /root and /tmp directories
+    # and commands are run by bash, so check steps don't depend on the runtime
+    name = "abstract"
+    # image used when a check doesn't ask for a specific one
+    default_image = "default"
+
+    @abstractmethod
+    def create(self, image: str | None = None) -> Sandbox:
+        # image defines toolchains available in the sandbox
+        ...
+
+    @abstractmethod
+    def put_archive(self, sandbox: Sandbox, path: str, data: ArchiveData) -> None:
+        ...
+
+    @abstractmethod
+    def stream_archive(self, sandbox: Sandbox, path: str) -> Iterator[bytes]:
+        # archive contains requested path as the root element, missing path
+        # is reported when the first chunk is requested at the latest
+        ...
+
+    def get_archive(self, sandbox: Sandbox, path: str) -> bytes:
+        return b"".join(self.stream_archive(sandbox, path))
+
+    @abstractmethod
+    def exec(
+        self,
+        sandbox: Sandbox,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        # only the first max_output bytes of output are kept
+        ...
+
+    def is_lost(self, sandbox: Sandbox, error: Exception) -> bool:
+        # tells whether the error was caused by the sandbox being gone (e.g. its
+        # container was killed), so the work may be repeated in another one
+        return False
+
+    @abstractmethod
+    def reset(self, sandbox: Sandbox) -> bool:
+        # cleans sandbox up after a check, False means it can't be reused
+        ...
+
+    @abstractmethod
+    def destroy(self, sandbox: Sandbox) -> None:
+        ...
+
+    @abstractmethod
+    def image_id(self, image: str | None = None) -> str:
+        # identifies toolchain available in sandboxes, used in cache keys
+        ...
+
+
+def put_file(
+    backend: SandboxBackend, sandbox: Sandbox, path: str, content: str
+) -> None:
+    directory, name = path.rsplit("/", 1)
+    backend.put_archive(sandbox, directory, TarStream({name: content}))
+
+
+def open_archive(data: ArchiveData) -> tarfile.TarFile:
+    # archive is read as a stream, so it's never joined into one buffer
+    return open_tar_stream([data] if isinstance(data, bytes) else data)
+
+
+def stream_file(
+    backend: SandboxBackend, sandbox: Sandbox, path: str
+) -> Iterator[bytes] | None:
+    # returns None if the file doesn't exist, contents are read by chunks
+    try:
+        files = iter_tar_files(backend.stream_archive(sandbox, path))
+        _, chunks = next(files)
+    except Exception:
+        return None
+
+    def read() -> Iterator[bytes]:
+        # archive stream is kept open until the file is read
+        try:
+            yield from chunks
+        finally:
+            files.close()
+
+    return read()
@@ -0,0 +1,125 @@
+import threading
+from dataclasses import dataclass
+from typing import Iterator
+
+from docker.client import DockerClient
+from docker.errors import NotFound
+from docker.models.containers import Container
+
+from src.solution_checker.docker_utils import (
+    IMAGE_NAME,
+    ContainerTracker,
+    create_container,
+    get_docker_client,
+    get_image_id,
+    put_archive_to_container,
+    remove_container,
+    reset_container,
+    stream_archive_from_container,
+)
+from src.solution_checker.exec_engine import (
+    DockerExecEngine,
+    DockerExecError,
+    ExecResult,
+    get_exec_engine,
+)
+from src.solution_checker.metrics import DOCKER_API_CALLS_SAVED
+from src.solution_checker.sandbox.backend import ArchiveData, Sandbox, SandboxBackend
+
+
+@dataclass
+class DockerSandbox(Sandbox):
+    container: Container
+
+
+class DockerBackend(SandboxBackend):
+    name = "docker"
+    default_image = IMAGE_NAME
+
+    def __init__(
+        self,
+        client: DockerClient | None = None,
+        exec_engine: DockerExecEngine | None = None,
+        max_pool_size: int | None = None,
+    ):
+        self._client = client
+        self._exec_engine = exec_engine
+        # connections to dockerd kept open, threads using the backend at once
+        self.max_pool_size = max_pool_size
+        self.tracker = ContainerTracker()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> DockerClient:
+        # client is created lazily, so the backend may be constructed without dockerd
+        with self._lock:
+            if self._client is None:
+                self._client = get_docker_client(self.max_pool_size)
+            return self._client
+
+    @property
+    def exec_engine(self) -> DockerExecEngine:
+        # shared engine is started only when the first check needs it
+        with self._lock:
+            if self._exec_engine is None:
+                self._exec_engine = get_exec_engine()
+            return self._exec_engine
+
+    def create(self, image: str | None = None) -> Sandbox:
+        container = create_container(self.client, image or self.default_image)
+        self.tracker.add(container.id)
+        self.tracker.watch(self.client)
+        return DockerSandbox(id=container.id, container=container)
+
+    def put_archive(self, sandbox: Sandbox, path: str, data: ArchiveData) -> None:
+        put_archive_to_container(self._container(sandbox), path, data)
+
+    def stream_archive(self, sandbox: Sandbox, path: str) -> Iterator[bytes]:
+        return stream_archive_from_container(self._container(sandbox), path)
+
+    def exec(
+        self,
+        sandbox: Sandbox,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        try:
+            result = self.exec_engine.exec(
+                sandbox.id, command, workdir, environment, timeout, name, max_output
+            )
+        except DockerExecError:
+            # exec can't be created in a stopped container, and the engine
+            # kills the container if the exec didn't exit after its output
+            self.tracker.mark_stopped(sandbox.id)
+            raise
+        if result.timed_out and result.exit_code is None:
+            # the engine kills the container if the exec didn't stop in time
+            self.tracker.mark_stopped(sandbox.id)
+        return result
+
+    def is_lost(self, sandbox: Sandbox, error: Exception) -> bool:
+        # exec in a stopped container marks it stopped, other requests fail
+        # with NotFound once the container is removed
+        return isinstance(error, NotFound) or not self.tracker.is_running(sandbox.id)
+
+    def reset(self, sandbox: Sandbox) -> bool:
+        if not self.tracker.is_running(sandbox.id):
+            DOCKER_API_CALLS_SAVED.inc(call="inspect_container")
+            return False
+        return reset_container(self._container(sandbox))
+
+    def destroy(self, sandbox: Sandbox) -> None:
+        running = self.tracker.remove(sandbox.id)
+        remove_container(self.client, sandbox.id, running)
+
+    def image_id(self, image: str | None = None) -> str:
+        return get_image_id(self.client, image or self.default_image)
+
+    @staticmethod
+    def _container(sandbox: Sandbox) -> Container:
+        assert isinstance(sandbox, DockerSandbox)
+        return sandbox.container
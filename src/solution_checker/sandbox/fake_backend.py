@@ -0,0 +1,147 @@
+import io
+import os
+import tarfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from src.solution_checker.exec_engine import ExecResult
+from src.solution_checker.sandbox.backend import (
+    ArchiveData,
+    Sandbox,
+    SandboxBackend,
+    open_archive,
+)
+
+# Deterministic in-memory backend for tests and benchmarks: nothing is executed,
+# results of commands are produced by the handler given to the backend.
+
+
+@dataclass
+class FakeExec:
+    command: str
+    workdir: str | None
+    environment: dict[str, str]
+    timeout: float | None
+    name: str
+
+
+@dataclass
+class FakeSandbox(Sandbox):
+    files: dict[str, bytes] = field(default_factory=dict)
+    execs: list[FakeExec] = field(default_factory=list)
+    alive: bool = True
+    destroyed: bool = False
+    image: str = ""
+
+    def read(self, path: str) -> str:
+        return self.files[os.path.normpath(path)].decode()
+
+    def write(self, path: str, content: str | bytes) -> None:
+        data = content.encode() if isinstance(content, str) else content
+        self.files[os.path.normpath(path)] = data
+
+
+ExecHandler = Callable[[FakeSandbox, FakeExec], ExecResult]
+
+
+def succeed(sandbox: FakeSandbox, fake_exec: FakeExec) -> ExecResult:
+    return ExecResult(exit_code=0, output=b"", timed_out=False, time=0.0)
+
+
+class FakeBackend(SandboxBackend):
+    name = "fake"
+
+    def __init__(self, handler: ExecHandler = succeed, latency: float = 0.0):
+        self.handler = handler
+        # emulated duration of every call
+        self.latency = latency
+        self.sandboxes: dict[str, FakeSandbox] = {}
+        self._lock = threading.Lock()
+
+    def create(self, image: str | None = None) -> Sandbox:
+        self._wait()
+        with self._lock:
+            sandbox = FakeSandbox(
+                id=f"fake{len(self.sandboxes) + 1}", image=image or self.default_image
+            )
+            self.sandboxes[sandbox.id] = sandbox
+        return sandbox
+
+    def put_archive(self, sandbox: Sandbox, path: str, data: ArchiveData) -> None:
+        self._wait()
+        fake_sandbox = self._sandbox(sandbox)
+        with open_archive(data) as tar:
+            for member in tar:
+                file = tar.extractfile(member)
+                if file is not None:
+                    fake_sandbox.write(os.path.join(path, member.name), file.read())
+
+    def stream_archive(self, sandbox: Sandbox, path: str) -> Iterator[bytes]:
+        self._wait()
+        fake_sandbox = self._sandbox(sandbox)
+        path = os.path.normpath(path)
+        name = os.path.basename(path)
+        files = {
+            name + file_path.removeprefix(path): data
+            for file_path, data in fake_sandbox.files.items()
+            if file_path == path or file_path.startswith(path + "/")
+        }
+        if not files:
+            raise FileNotFoundError(f"Could not find {path} in sandbox")
+
+        bio = io.BytesIO()
+        with tarfile.open(fileobj=bio, mode="w") as tar:
+            for file_name, data in sorted(files.items()):
+                tarinfo = tarfile.TarInfo(file_name)
+                tarinfo.size = len(data)
+                tar.addfile(tarinfo, io.BytesIO(data))
+        return iter([bio.getvalue()])
+
+    def exec(
+        self,
+        sandbox: Sandbox,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        self._wait()
+        fake_sandbox = self._sandbox(sandbox)
+        fake_exec = FakeExec(command, workdir, dict(environment or {}), timeout, name)
+        fake_sandbox.execs.append(fake_exec)
+        result = self.handler(fake_sandbox, fake_exec)
+        if max_output is not None and len(result.output) > max_output:
+            result.output = result.output[:max_output]
+            result.output_truncated = True
+        return result
+
+    def is_lost(self, sandbox: Sandbox, error: Exception) -> bool:
+        return not self._sandbox(sandbox).alive
+
+    def reset(self, sandbox: Sandbox) -> bool:
+        self._wait()
+        fake_sandbox = self._sandbox(sandbox)
+        fake_sandbox.files.clear()
+        return fake_sandbox.alive
+
+    def destroy(self, sandbox: Sandbox) -> None:
+        self._wait()
+        fake_sandbox = self._sandbox(sandbox)
+        fake_sandbox.alive = False
+        fake_sandbox.destroyed = True
+
+    def image_id(self, image: str | None = None) -> str:
+        return f"fake:{image or self.default_image}"
+
+    def _wait(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _sandbox(sandbox: Sandbox) -> FakeSandbox:
+        assert isinstance(sandbox, FakeSandbox)
+        return sandbox
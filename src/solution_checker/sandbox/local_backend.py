@@ -0,0 +1,331 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+from src.solution_checker.exec_engine import (
+    EXEC_WRAPPER,
+    TIMEOUT_EXIT_CODE,
+    ExecResult,
+)
+from src.solution_checker.output import READ_CHUNK_SIZE, BoundedOutput
+from src.solution_checker.sandbox.backend import (
+    ArchiveData,
+    Sandbox,
+    SandboxBackend,
+    open_archive,
+)
+
+# Sandboxes are temporary directories on the host and commands are run as the
+# checker user with /root and /tmp paths mapped into them. Processes are put
+# into new user, pid and network namespaces and into a cgroup v2 with memory
+# limit where the host allows it. It's much cheaper than a container, but the
+# isolation is weaker, so it's meant for trusted (internal) workloads only.
+
+logger = logging.getLogger(__name__)
+
+SANDBOX_PATH_PATTERN = re.compile(r"(?<![\w/.])/(root|tmp)(?=/|\b)")
+NAMESPACES_COMMAND = [
+    "unshare",
+    "--user",
+    "--map-root-user",
+    "--pid",
+    "--fork",
+    "--kill-child",
+    "--net",
+]
+# moves the shell into the cgroup given as the first argument, then runs the rest
+CGROUP_WRAPPER = 'echo $$ > "$1/cgroup.procs" && shift && exec "$@"'
+
+
+class LocalSandboxError(Exception):
+    ...
+
+
+@dataclass
+class LocalSandbox(Sandbox):
+    directory: str
+    cgroup: str | None = None
+
+
+class LocalBackend(SandboxBackend):
+    name = "local"
+    # time for the wrapper to kill timed out process group and exit,
+    # if it's exceeded the whole process tree is killed
+    kill_grace = 2.0
+
+    def __init__(
+        self,
+        base_directory: str | None = None,
+        use_namespaces: bool = True,
+        memory_limit: int | None = 128 * 1024 * 1024,
+    ):
+        self.base_directory = base_directory
+        self.use_namespaces = use_namespaces and self._namespaces_available()
+        self.memory_limit = memory_limit
+        self.cgroup_root = self._find_cgroup_root() if memory_limit else None
+
+    def create(self, image: str | None = None) -> Sandbox:
+        # host toolchains are used whatever image is requested
+        directory = tempfile.mkdtemp(prefix="sandbox_", dir=self.base_directory)
+        for name in ("root", "tmp"):
+            os.makedirs(os.path.join(directory, name))
+        sandbox = LocalSandbox(id=os.path.basename(directory), directory=directory)
+        sandbox.cgroup = self._create_cgroup(sandbox.id)
+        return sandbox
+
+    def put_archive(self, sandbox: Sandbox, path: str, data: ArchiveData) -> None:
+        target = self._map_paths(sandbox, path)
+        os.makedirs(target, exist_ok=True)
+        root = os.path.realpath(self._sandbox(sandbox).directory)
+        # members are extracted one by one as the archive is read
+        with open_archive(data) as tar:
+            for member in tar:
+                # archive comes from user, it must not write outside the sandbox
+                names = [member.name]
+                if member.issym() or member.islnk():
+                    names.append(
+                        os.path.join(os.path.dirname(member.name), member.linkname)
+                    )
+                for name in names:
+                    member_path = os.path.realpath(os.path.join(target, name))
+                    if not member_path.startswith(root + os.sep):
+                        raise LocalSandboxError(f"Path {name} is outside of sandbox")
+                tar.extract(member, target)
+
+    def stream_archive(self, sandbox: Sandbox, path: str) -> Iterator[bytes]:
+        local_path = self._map_paths(sandbox, path)
+        if not os.path.lexists(local_path):
+            raise FileNotFoundError(f"Could not find {path} in sandbox")
+        return stream_tar(local_path, os.path.basename(local_path))
+
+    def exec(
+        self,
+        sandbox: Sandbox,
+        command: str,
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        name: str = "command",
+        max_output: int | None = None,
+    ) -> ExecResult:
+        local_sandbox = self._sandbox(sandbox)
+        command = self._map_paths(sandbox, command)
+        if timeout is None:
+            cmd = ["/bin/bash", "-c", command]
+        else:
+            cmd = ["/bin/bash", "-c", EXEC_WRAPPER, "exec", str(timeout), command]
+        if self.use_namespaces:
+            cmd = NAMESPACES_COMMAND + cmd
+        if local_sandbox.cgroup is not None:
+            cgroup = local_sandbox.cgroup
+            cmd = ["/bin/bash", "-c", CGROUP_WRAPPER, "cgroup", cgroup] + cmd
+
+        env = dict(os.environ)
+        env["TMPDIR"] = self._map_paths(sandbox, "/tmp")
+        for key, value in (environment or {}).items():
+            env[key] = self._map_paths(sandbox, value)
+
+        output = BoundedOutput(max_output)
+        start_time = time.perf_counter()
+        process = subprocess.Popen(
+            cmd,
+            cwd=self._map_paths(sandbox, workdir or "/root"),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        # the wrapper kills timed out command itself, it's only a safety net
+        killer = threading.Timer(
+            (timeout or 0) + self.kill_grace, lambda: self._kill(process)
+        )
+        if timeout is not None:
+            killer.start()
+        try:
+            assert process.stdout is not None
+            # output over the limit is still read, so the command isn't blocked
+            while chunk := process.stdout.read(READ_CHUNK_SIZE):
+                output.write(chunk)
+            exit_code = process.wait()
+        finally:
+            killer.cancel()
+        run_time = time.perf_counter() - start_time
+
+        timed_out = timeout is not None and (
+            run_time >= timeout
+            and exit_code == TIMEOUT_EXIT_CODE
+            or run_time >= timeout + self.kill_grace
+        )
+        if timed_out:
+            assert timeout is not None
+            run_time = timeout
+        return ExecResult(
+            exit_code=exit_code,
+            output=output.getvalue(),
+            timed_out=timed_out,
+            time=run_time,
+            output_truncated=output.truncated,
+        )
+
+    def is_lost(self, sandbox: Sandbox, error: Exception) -> bool:
+        return not os.path.isdir(self._sandbox(sandbox).directory)
+
+    def reset(self, sandbox: Sandbox) -> bool:
+        local_sandbox = self._sandbox(sandbox)
+        if local_sandbox.cgroup is not None:
+            self._kill_cgroup(local_sandbox.cgroup)
+        try:
+            for name in ("root", "tmp"):
+                path = os.path.join(local_sandbox.directory, name)
+                shutil.rmtree(path)
+                os.makedirs(path)
+        except OSError:
+            logger.exception("Unable to reset sandbox %s", sandbox.id)
+            return False
+        return True
+
+    def destroy(self, sandbox: Sandbox) -> None:
+        local_sandbox = self._sandbox(sandbox)
+        if local_sandbox.cgroup is not None:
+            self._kill_cgroup(local_sandbox.cgroup)
+            try:
+                os.rmdir(local_sandbox.cgroup)
+            except OSError:
+                logger.exception("Unable to remove cgroup %s", local_sandbox.cgroup)
+        shutil.rmtree(local_sandbox.directory, ignore_errors=True)
+
+    def image_id(self, image: str | None = None) -> str:
+        # solutions are built with host toolchain
+        return f"local:{os.uname().release}"
+
+    def _map_paths(self, sandbox: Sandbox, text: str) -> str:
+        directory = self._sandbox(sandbox).directory
+        return SANDBOX_PATH_PATTERN.sub(
+            lambda match: os.path.join(directory, match.group(1)), text
+        )
+
+    @staticmethod
+    def _kill(process: "subprocess.Popen[bytes]") -> None:
+        try:
+            process.kill()
+        except OSError:
+            logger.exception("Unable to kill process %s", process.pid)
+
+    @staticmethod
+    def _sandbox(sandbox: Sandbox) -> LocalSandbox:
+        assert isinstance(sandbox, LocalSandbox)
+        return sandbox
+
+    @staticmethod
+    def _namespaces_available() -> bool:
+        try:
+            result = subprocess.run(
+                NAMESPACES_COMMAND + ["true"], capture_output=True, timeout=5
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+    @staticmethod
+    def _find_cgroup_root() -> str | None:
+        # cgroup v2 subtree of the checker must be delegated to its user
+        try:
+            with open("/proc/self/cgroup") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        for line in lines:
+            if line.startswith("0::"):
+                path = "/sys/fs/cgroup" + line[3:]
+                controllers = os.path.join(path, "cgroup.subtree_control")
+                if os.access(path, os.W_OK) and os.path.exists(controllers):
+                    with open(controllers) as f:
+                        if "memory" in f.read().split():
+                            return path
+        return None
+
+    def _create_cgroup(self, sandbox_id: str) -> str | None:
+        if self.cgroup_root is None or self.memory_limit is None:
+            return None
+        path = os.path.join(self.cgroup_root, sandbox_id)
+        try:
+            os.mkdir(path)
+            with open(os.path.join(path, "memory.max"), "w") as f:
+                f.write(str(self.memory_limit))
+            swap_max = os.path.join(path, "memory.swap.max")
+            if os.path.exists(swap_max):
+                with open(swap_max, "w") as f:
+                    f.write("0")
+        except OSError:
+            logger.exception("Unable to create cgroup of sandbox %s", sandbox_id)
+            return None
+        return path
+
+    @staticmethod
+    def _kill_cgroup(path: str) -> None:
+        try:
+            with open(os.path.join(path, "cgroup.kill"), "w") as f:
+                f.write("1")
+        except OSError:
+            logger.exception("Unable to kill cgroup %s", path)
+
+
+def stream_tar(path: str, arcname: str) -> Iterator[bytes]:
+    # writes tar archive of the path by chunks, so big files are never loaded
+    # into memory as a whole
+    entries = [(path, arcname)]
+    if os.path.isdir(path) and not os.path.islink(path):
+        for directory, directories, files in os.walk(path):
+            directories.sort()
+            relative = os.path.relpath(directory, path)
+            for name in directories + sorted(files):
+                entry_path = os.path.join(directory, name)
+                entries.append(
+                    (
+                        entry_path,
+                        os.path.normpath(os.path.join(arcname, relative, name)),
+                    )
+                )
+
+    for entry_path, name in entries:
+        try:
+            stat = os.lstat(entry_path)
+        except OSError:
+            continue
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.mode = stat.st_mode & 0o7777
+        tarinfo.mtime = int(stat.st_mtime)
+        if os.path.islink(entry_path):
+            tarinfo.type = tarfile.SYMTYPE
+            tarinfo.linkname = os.readlink(entry_path)
+        elif os.path.isdir(entry_path):
+            tarinfo.type = tarfile.DIRTYPE
+        elif os.path.isfile(entry_path):
+            tarinfo.size = stat.st_size
+        else:
+            continue
+        yield tarinfo.tobuf()
+
+        if tarinfo.isfile():
+            with open(entry_path, "rb") as f:
+                left = tarinfo.size
+                while left > 0:
+                    chunk = f.read(min(left, READ_CHUNK_SIZE))
+                    if not chunk:
+                        # file was truncated while it was read
+                        chunk = bytes(left)
+                    left -= len(chunk)
+                    yield chunk
+            remainder = tarinfo.size % tarfile.BLOCKSIZE
+            if remainder:
+                yield bytes(tarfile.BLOCKSIZE - remainder)
+
+    yield bytes(tarfile.BLOCKSIZE * 2)
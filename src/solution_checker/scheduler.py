@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.solution_checker.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    Ticket,
+)
+from src.solution_checker.metrics import QUEUE_WAIT_SECONDS
+from src.solution_checker.models import CheckResult
+
+# Checks of every priority wait in their own queue and share slots by weights
+# of priorities (stride scheduling: the queue served least relative to its
+# weight goes next), so interactive checks are not stuck behind a regrade of
+# thousands of solutions. Check waiting longer than aging time goes first
+# whatever its priority, so low priority checks are never starved.
+
+DEFAULT_WEIGHTS = {"interactive": 4.0, "bulk": 1.0}
+
+StartCheck = Callable[[float], None]
+
+
+@dataclass(eq=False)
+class Waiter:
+    priority: str
+    start: StartCheck
+    ticket: Ticket | None = None
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class PriorityScheduler:
+    def __init__(
+        self,
+        slots: int,
+        weights: dict[str, float] | None = None,
+        aging: float = 30.0,
+        max_waiting: int = 100,
+        admission: AdmissionController | None = None,
+        default_priority: str | None = None,
+    ):
+        self.slots = slots
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.default_priority = default_priority or next(iter(self.weights))
+        self.aging = aging
+        # checks waiting in the queue of one priority
+        self.max_waiting = max_waiting
+        # admission reserves memory of checks, so a check may wait for it too
+        self.admission = admission
+
+        self.running = 0
+        self.started = {priority: 0 for priority in self.weights}
+        self.aged = 0
+        self.rejected = 0
+        self._waiting: dict[str, deque[Waiter]] = {
+            priority: deque() for priority in self.weights
+        }
+        # virtual time of every priority grows by 1 / weight on every started
+        # check, the priority with the smallest one is served next
+        self._pass = {priority: 0.0 for priority in self.weights}
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    def submit(
+        self, priority: str | None, start: StartCheck, ticket: Ticket | None = None
+    ) -> None:
+        # start is called with the time the check waited once it may run,
+        # maybe right away in the calling thread
+        priority = priority or self.default_priority
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority {priority}")
+        with self._lock:
+            waiting = self._waiting[priority]
+            if len(waiting) >= self.max_waiting:
+                retry_after = self._predict_wait()
+                if self.admission is not None and ticket is not None:
+                    self.admission.release(ticket)
+                self.rejected += 1
+                raise AdmissionRejectedError(
+                    f"Queue of {priority} checks is full", retry_after
+                )
+            if not waiting:
+                # idle priority doesn't save its share for later
+                self._pass[priority] = max(self._pass[priority], self._virtual_time)
+            waiting.append(Waiter(priority, start, ticket))
+            started = self._dispatch()
+        self._start(started)
+
+    def acquire(self, priority: str | None, ticket: Ticket | None = None) -> float:
+        # blocks until the check may run and returns the time it waited
+        started = threading.Event()
+        wait_time = []
+
+        def start(waited: float) -> None:
+            wait_time.append(waited)
+            started.set()
+
+        self.submit(priority, start, ticket)
+        started.wait()
+        return wait_time[0]
+
+    def release(
+        self, ticket: Ticket | None = None, result: CheckResult | None = None
+    ) -> None:
+        if self.admission is not None and ticket is not None:
+            self.admission.release(ticket, result)
+        with self._lock:
+            self.running -= 1
+            started = self._dispatch()
+        self._start(started)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "slots": self.slots,
+                "running": self.running,
+                "waiting": {
+                    priority: len(waiting)
+                    for priority, waiting in self._waiting.items()
+                },
+                "started": dict(self.started),
+                "aged": self.aged,
+                "rejected": self.rejected,
+            }
+
+    def _dispatch(self) -> list[tuple[Waiter, float]]:
+        started = []
+        while self.running < self.slots:
+            waiter, aged = self._next()
+            if waiter is None:
+                break
+            # the chosen check waits for memory, so others don't overtake it
+            if self.admission is not None and waiter.ticket is not None:
+                if not self.admission.try_start(waiter.ticket):
+                    break
+            self._waiting[waiter.priority].popleft()
+            self.running += 1
+            self.aged += aged
+            self.started[waiter.priority] += 1
+            self._virtual_time = self._pass[waiter.priority]
+            self._pass[waiter.priority] += 1 / self.weights[waiter.priority]
+            started.append((waiter, time.time() - waiter.enqueued_at))
+        return started
+
+    def _next(self) -> tuple[Waiter | None, bool]:
+        # returns the next check and whether it overtakes others due to aging
+        heads = [waiting[0] for waiting in self._waiting.values() if waiting]
+        if not heads:
+            return None, False
+        fair = min(
+            heads, key=lambda waiter: (self._pass[waiter.priority], waiter.enqueued_at)
+        )
+        oldest = min(heads, key=lambda waiter: waiter.enqueued_at)
+        if time.time() - oldest.enqueued_at >= self.aging:
+            return oldest, oldest is not fair
+        return fair, False
+
+    def _predict_wait(self) -> float:
+        # predicted time of waiting checks spread over all slots
+        cost = sum(
+            waiter.ticket.cost.time
+            for waiting in self._waiting.values()
+            for waiter in waiting
+            if waiter.ticket is not None
+        )
+        return cost / max(self.slots, 1)
+
+    def _start(self, started: list[tuple[Waiter, float]]) -> None:
+        for waiter, wait_time in started:
+            QUEUE_WAIT_SECONDS.observe(wait_time, priority=waiter.priority)
+            waiter.start(wait_time)
@@ -1,10 +1,45 @@
-from src.solution_checker.check_steps.build import build_solution
-from src.solution_checker.check_steps.test import test_solution
+import dataclasses
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from src.linter.executor import LintExecutor
+from src.solution_checker.build_cache import BuildCache
+from src.solution_checker.check_steps.build import build_solution, restore_build
+from src.solution_checker.check_steps.test import (
+    test_solution,
+    test_solution_batch,
+    test_solution_parallel,
+)
 from src.solution_checker.check_steps.lint import lint_solution
-from src.solution_checker.models import CheckResult, BuildResult
-from src.solution_checker.utils import files_to_tar
-from src.solution_checker.docker_utils import create_container, remove_container
+from src.solution_checker.comparators import ComparatorSpec
+from src.solution_checker.models import (
+    BuildResult,
+    CheckResult,
+    LintResult,
+    TestsResult,
+)
+from src.solution_checker.utils import TarStream
+from src.solution_checker.container_pool import ContainerPool
 from src.solution_checker.models import CheckStatus
+from src.solution_checker.output import MAX_OUTPUT_SIZE
+from src.solution_checker.languages import detect_language
+from src.solution_checker.metrics import (
+    CHECKS_TOTAL,
+    LINT_RULE_SECONDS,
+    SANDBOX_REPLACEMENTS,
+    STAGE_SECONDS,
+    timed,
+)
+from src.solution_checker.pipeline import Pipeline, Stage
+from src.solution_checker.result_cache import ResultCache
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
+from src.solution_checker.sandbox.docker_backend import DockerBackend
+
+logger = logging.getLogger(__name__)
+
+CHECK_STAGES = ("build", "test", "lint")
 
 
 class MakefileValidationError(Exception):
@@ -18,69 +53,413 @@ class SolutionChecker:
         tests: list[list[str]],
         build_timeout: float,
         test_timeout: float,
+        container_pool: ContainerPool | None = None,
+        batch_tests: bool = False,
+        build_cache: BuildCache | None = None,
+        result_cache: ResultCache | None = None,
+        test_workers: int = 1,
+        fail_fast: bool = True,
+        stages: tuple[str, ...] = CHECK_STAGES,
+        collect_timings: bool = False,
+        backend: SandboxBackend | None = None,
+        max_output: int = MAX_OUTPUT_SIZE,
+        comparators: list[ComparatorSpec] | None = None,
+        images: dict[str, str] | None = None,
+        io_archive: TarStream | None = None,
+        lint_executor: LintExecutor | None = None,
+        lint_rules: tuple[str, ...] | None = None,
+        cpu_time_limit: bool = False,
+        test_retries: int = 0,
     ):
         self.source_code = source_code
         self.tests = tests
         self.build_timeout = build_timeout
         self.test_timeout = test_timeout
+        self.container_pool = container_pool
+        self.batch_tests = batch_tests
+        self.build_cache = build_cache
+        self.result_cache = result_cache
+        self.test_workers = test_workers
+        self.fail_fast = fail_fast
+        # tests can't be run without build, so it's added when needed
+        self.stages = set(stages) | ({"build"} if "test" in stages else set())
+        self.collect_timings = collect_timings
+        self.timings: dict[str, float] = {}
+        # sandboxes are taken from the pool, so it defines the backend
+        if backend is None:
+            backend = container_pool.backend if container_pool else DockerBackend()
+        self.backend = backend
+        self.max_output = max_output
+        # comparator of every test, answers are compared exactly by default
+        self.comparators = comparators
+        # solution is run in the image of its language if there is one
+        self.language = detect_language(source_code)
+        image = (images or {}).get(self.language or "")
+        self.image = image or self.backend.default_image
+        # archive of test inputs for the batch runner made for the same tests,
+        # test timeout and max output, shared by checks of many solutions
+        self.io_archive = io_archive
+        self.lint_executor = lint_executor
+        # rules of language profiles to lint with, all of them by default
+        self.lint_rules = lint_rules
+        # test timeout is enforced on CPU time instead of the wall clock
+        self.cpu_time_limit = cpu_time_limit
+        # sandbox with the uploaded source acquired by prepare()
+        self._prepared: Sandbox | None = None
+        # built source tree taken once after the build when parallel tests or
+        # the build cache need it, sandboxes replacing the ones lost by tests
+        # are started from it if it was taken or build the solution again,
+        # test_retries is the number of sandboxes a check may replace
+        self._snapshot: bytes | None = None
+        self.test_retries = test_retries
+        self._replacements: list[Sandbox] = []
+        self._replaced = 0
+        self._lock = threading.Lock()
 
         self.makefile = source_code.get("Makefile")
         self.need_to_build = (
             self.makefile.find("build:") != -1 if self.makefile else False
         )
 
+    def prepare(self) -> None:
+        # acquires the container and uploads the source ahead of the check, e.g.
+        # while it waits for a slot, so the check starts right with the build
+        if self._prepared is None and self._needs_sandbox():
+            self._validate_makefile()
+            self._prepared = self._prepare_sandbox(self._create_source_archive())
+
     def check_solution(self) -> CheckResult:
+        try:
+            return self._check_solution_cached()
+        finally:
+            # prepared sandbox is not used if the result was found in cache
+            if self._prepared is not None:
+                self._release_sandbox(self._prepared)
+                self._prepared = None
+
+    def _check_solution_cached(self) -> CheckResult:
         self._validate_makefile()
 
+        if self.result_cache is None:
+            check_result = self._check_solution()
+        else:
+            cache_key = ResultCache.make_key(
+                self.source_code,
+                self.tests,
+                self.build_timeout,
+                self.test_timeout,
+                self.backend.image_id(self.image),
+                sorted(self.stages),
+                self.fail_fast,
+                [
+                    dataclasses.asdict(comparator)
+                    for comparator in self.comparators or []
+                ],
+                list(self.lint_rules) if self.lint_rules is not None else None,
+                self.cpu_time_limit,
+            )
+            check_result = self.result_cache.get_or_check(
+                cache_key, self._check_solution
+            )
+
+        CHECKS_TOTAL.inc(status=check_result.status.name)
+        if self.collect_timings:
+            check_result.timings = {
+                name: round(value, 4) for name, value in self.timings.items()
+            }
+        return check_result
+
+    def _check_solution(self) -> CheckResult:
+        tar_source = self._create_source_archive()
+
+        if not self._needs_sandbox():
+            # nothing needs a container, so it's not even created
+            results = Pipeline(self._create_stages(None), self.fail_fast).run()
+            return self._create_check_result(results)
+
+        sandbox, self._prepared = self._prepared, None
+        if sandbox is None:
+            sandbox = self._prepare_sandbox(tar_source)
+
         try:
-            tar_source = files_to_tar(self.source_code, "source/")
+            stages = self._create_stages(sandbox)
+            results = Pipeline(stages, self.fail_fast).run()
+        finally:
+            with timed(STAGE_SECONDS, self.timings, stage="release_container"):
+                self._release_sandbox(sandbox)
+
+        return self._create_check_result(results)
+
+    def _needs_sandbox(self) -> bool:
+        return "build" in self.stages or "test" in self.stages
+
+    def _create_source_archive(self) -> TarStream:
+        try:
+            return TarStream(self.source_code, "source/")
         except Exception:
             raise Exception("Unable to parse source code!")
 
-        client, container = create_container()
+    def _prepare_sandbox(self, tar_source: TarStream) -> Sandbox:
+        with timed(STAGE_SECONDS, self.timings, stage="acquire_container"):
+            sandbox = self._acquire_sandbox()
 
         try:
-            container.put_archive("/root", tar_source.read())
+            with timed(STAGE_SECONDS, self.timings, stage="upload_source"):
+                self.backend.put_archive(sandbox, "/root", tar_source)
         except Exception:
-            remove_container(client, container.id)
+            self._release_sandbox(sandbox)
             raise Exception("Unable to create requested filesystem!")
+        return sandbox
 
-        check_message = ""
-
-        build_result: BuildResult | None = None
-        if self.need_to_build:
-            build_result = build_solution(client, container, self.build_timeout)
-            check_message += f"{build_result.message}\n" if build_result.message else ""
-
-            if build_result.status != CheckStatus.OK:
-                remove_container(client, container.id)
-                return CheckResult(
-                    tests_time=0.0,
-                    build_time=build_result.time,
-                    status=build_result.status,
-                    message=build_result.message,
-                    tests_passed=0,
-                    tests_total=len(self.tests),
-                    lint_success=False,
+    def _create_stages(self, sandbox: Sandbox | None) -> list[Stage]:
+        stages = []
+        test_dependencies: tuple[str, ...] = ()
+        if self.need_to_build and "build" in self.stages:
+            assert sandbox is not None
+            stages.append(
+                Stage(
+                    name="build",
+                    run=self._timed_stage("build", lambda: self._build(sandbox)),
+                    succeeded=lambda result: result.status == CheckStatus.OK,
+                )
+            )
+            test_dependencies = ("build",)
+        if "test" in self.stages:
+            assert sandbox is not None
+            stages.append(
+                Stage(
+                    name="test",
+                    run=self._timed_stage("test", lambda: self._test(sandbox)),
+                    depends_on=test_dependencies,
+                    succeeded=lambda result: result.status == CheckStatus.OK,
                 )
+            )
+        if "lint" in self.stages:
+            # linter needs only source code, so it runs concurrently with build
+            stages.append(
+                Stage(
+                    name="lint",
+                    run=self._timed_stage("lint", self._lint),
+                )
+            )
+        return stages
+
+    def _timed_stage(self, name: str, run: Callable[[], Any]) -> Callable[[], Any]:
+        def timed_run() -> Any:
+            with timed(STAGE_SECONDS, self.timings, stage=name):
+                return run()
+
+        return timed_run
+
+    def _create_check_result(self, results: dict[str, Any]) -> CheckResult:
+        build_result: BuildResult | None = results.get("build")
+        tests_result: TestsResult | None = results.get("test")
+        lint_result: LintResult | None = results.get("lint")
+
+        check_message = ""
+        for result in (build_result, tests_result, lint_result):
+            if result is not None and result.message:
+                check_message += f"{result.message}\n"
 
-        tests_result = test_solution(client, container, self.tests, self.test_timeout)
-        check_message += f"{tests_result.message}\n" if tests_result.message else ""
+        status = CheckStatus.OK
+        if build_result is not None and build_result.status != CheckStatus.OK:
+            status = build_result.status
+        elif tests_result is not None:
+            status = tests_result.status
 
-        lint_result = lint_solution(self.source_code)
-        check_message += f"{lint_result.message}\n" if lint_result.message else ""
+        lint_success = lint_result.success if lint_result is not None else None
 
-        remove_container(client, container.id)
+        tests_cpu_time = None
+        tests_usage = None
+        if tests_result is not None and tests_result.results:
+            usages = [test_result.usage for test_result in tests_result.results]
+            if all(usages):
+                tests_cpu_time = round(sum(u.cpu_time for u in usages if u), 4)
+            tests_usage = [
+                {
+                    "status": test_result.status.value,
+                    "time": round(test_result.time, 4),
+                    **(test_result.usage.to_dict() if test_result.usage else {}),
+                }
+                for test_result in tests_result.results
+            ]
 
         return CheckResult(
-            tests_time=round(tests_result.time, 4),
+            tests_time=round(tests_result.time, 4) if tests_result else 0.0,
             build_time=round(build_result.time, 4) if build_result else 0.0,
-            status=tests_result.status,
+            status=status,
             message=check_message,
-            tests_passed=tests_result.tests_passed,
-            tests_total=tests_result.tests_total,
-            lint_success=lint_result.success,
+            tests_passed=tests_result.tests_passed if tests_result else 0,
+            tests_total=len(self.tests),
+            lint_success=lint_success,
+            lint_partial=lint_result.partial if lint_result else False,
+            build_cached=build_result.cached if build_result else False,
+            language=self.language,
+            image=self.image,
+            tests_cpu_time=tests_cpu_time,
+            tests_usage=tests_usage,
+        )
+
+    def _lint(self) -> LintResult:
+        result = lint_solution(self.source_code, self.lint_executor, self.lint_rules)
+        # expensive rules are spotted by their time
+        for rule, seconds in result.rule_times.items():
+            LINT_RULE_SECONDS.observe(seconds, rule=rule)
+            if self.collect_timings:
+                self.timings[f"lint:{rule}"] = seconds
+        return result
+
+    def _build(self, sandbox: Sandbox) -> BuildResult:
+        if self.build_cache is None:
+            return build_solution(
+                self.backend, sandbox, self.build_timeout, self.max_output
+            )
+
+        cache_key = BuildCache.make_key(
+            self.source_code, self.backend.image_id(self.image)
+        )
+        # cached build is the snapshot, so it's not taken from the sandbox again
+        self._snapshot = self.build_cache.get(cache_key)
+        if self._snapshot is not None:
+            return restore_build(self.backend, sandbox, self._snapshot)
+
+        build_result = build_solution(
+            self.backend, sandbox, self.build_timeout, self.max_output
         )
+        if build_result.status == CheckStatus.OK:
+            try:
+                self.build_cache.put(cache_key, self._take_snapshot(sandbox))
+            except Exception:
+                logger.exception("Unable to store build in cache")
+        return build_result
+
+    def _take_snapshot(self, sandbox: Sandbox) -> bytes:
+        # taken before tests are run, as they may change the source directory;
+        # it costs a request and a copy of the whole tree, so it's taken only
+        # when needed
+        if self._snapshot is None:
+            with timed(STAGE_SECONDS, self.timings, stage="snapshot"):
+                self._snapshot = self.backend.get_archive(sandbox, "/root/source")
+        return self._snapshot
+
+    def _fork_sandbox(self) -> Sandbox:
+        # sandbox with the built solution, taken from the pool when it's warm
+        assert self._snapshot is not None
+        sandbox = self._acquire_sandbox()
+        try:
+            self.backend.put_archive(sandbox, "/root", self._snapshot)
+        except Exception:
+            self._release_sandbox(sandbox)
+            raise
+        return sandbox
+
+    def _rebuild_sandbox(self) -> Sandbox | None:
+        # sandbox with the solution built again, when there's no snapshot
+        sandbox = self._prepare_sandbox(self._create_source_archive())
+        if not (self.need_to_build and "build" in self.stages):
+            return sandbox
+        build_result = build_solution(
+            self.backend, sandbox, self.build_timeout, self.max_output
+        )
+        if build_result.status != CheckStatus.OK:
+            logger.error("Unable to build solution again: %s", build_result.message)
+            self._release_sandbox(sandbox)
+            return None
+        return sandbox
+
+    def _replace_sandbox(self, lost: Sandbox) -> Sandbox | None:
+        # lost sandbox is released with the others after the tests
+        with self._lock:
+            if self._replaced >= self.test_retries:
+                return None
+            self._replaced += 1
+        SANDBOX_REPLACEMENTS.inc()
+        if self._snapshot is not None:
+            sandbox: Sandbox | None = self._fork_sandbox()
+        else:
+            sandbox = self._rebuild_sandbox()
+        if sandbox is not None:
+            with self._lock:
+                self._replacements.append(sandbox)
+        return sandbox
+
+    def _test(self, sandbox: Sandbox) -> TestsResult:
+        try:
+            return self._run_tests(sandbox)
+        finally:
+            for replacement in self._replacements:
+                self._release_sandbox(replacement)
+            self._replacements = []
+
+    def _run_tests(self, sandbox: Sandbox) -> TestsResult:
+        workers_count = min(self.test_workers, len(self.tests))
+        if workers_count > 1:
+            return self._test_parallel(sandbox, workers_count)
+        if self.batch_tests:
+            return test_solution_batch(
+                self.backend,
+                sandbox,
+                self.tests,
+                self.test_timeout,
+                self.max_output,
+                self.comparators,
+                self.io_archive,
+                self.cpu_time_limit,
+                self._replace_sandbox,
+            )
+        return test_solution(
+            self.backend,
+            sandbox,
+            self.tests,
+            self.test_timeout,
+            self.max_output,
+            self.comparators,
+            self.cpu_time_limit,
+            self._replace_sandbox,
+        )
+
+    def _test_parallel(self, sandbox: Sandbox, workers_count: int) -> TestsResult:
+        # built solution is copied to other sandboxes instead of building it again
+        self._take_snapshot(sandbox)
+        with ThreadPoolExecutor(workers_count - 1) as executor:
+            futures = [
+                executor.submit(self._fork_sandbox) for _ in range(workers_count - 1)
+            ]
+        workers: list[Sandbox] = []
+        errors = []
+        for future in futures:
+            try:
+                workers.append(future.result())
+            except Exception as e:
+                errors.append(e)
+
+        try:
+            if errors:
+                raise errors[0]
+            return test_solution_parallel(
+                self.backend,
+                [sandbox, *workers],
+                self.tests,
+                self.test_timeout,
+                self.max_output,
+                self.comparators,
+                self.cpu_time_limit,
+                self._replace_sandbox,
+            )
+        finally:
+            for worker in workers:
+                self._release_sandbox(worker)
+
+    def _acquire_sandbox(self) -> Sandbox:
+        if self.container_pool is not None:
+            return self.container_pool.acquire(self.image)
+        return self.backend.create(self.image)
+
+    def _release_sandbox(self, sandbox: Sandbox) -> None:
+        if self.container_pool is not None:
+            self.container_pool.release(sandbox)
+        else:
+            self.backend.destroy(sandbox)
 
     def _validate_makefile(self) -> None:
         if self.makefile is None:
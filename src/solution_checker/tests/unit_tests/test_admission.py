@@ -0,0 +1,83 @@
+import unittest
+
+from src.solution_checker.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    CheckCost,
+    CostModel,
+    Quota,
+)
+from src.solution_checker.models import CheckResult, CheckStatus
+
+MB = 1024 * 1024
+
+
+def create_result(build_time: float, tests_time: float, passed: int) -> CheckResult:
+    return CheckResult(
+        tests_time=tests_time,
+        build_time=build_time,
+        status=CheckStatus.OK,
+        message="",
+        tests_passed=passed,
+        tests_total=passed,
+        lint_success=True,
+    )
+
+
+class CostModelTest(unittest.TestCase):
+    def test_estimate(self) -> None:
+        model = CostModel(256 * MB, {"java": 512 * MB})
+        # worst case until the first check of the language
+        self.assertEqual(model.estimate("java", 4, 1, 10), CheckCost(14, 512 * MB))
+        self.assertEqual(model.estimate(None, 4, 1, 2, 2), CheckCost(6, 512 * MB))
+
+        model.observe("java", create_result(2.0, 1.0, 10))
+        self.assertAlmostEqual(model.estimate("java", 4, 1, 10).time, 3.0)
+        model.observe("java", create_result(3.0, 1.0, 10))
+        self.assertAlmostEqual(model.estimate("java", 4, 1, 10).time, 3.2)
+        # prediction never exceeds the worst case
+        self.assertEqual(model.estimate("java", 1, 0.05, 10).time, 1.5)
+        self.assertEqual(model.estimate("c", 4, 1, 10).time, 14)
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def test_memory_budget(self) -> None:
+        admission = AdmissionController(600 * MB, CostModel(256 * MB, {}))
+        big = admission.admit("key", CheckCost(1, 1024 * MB))
+        small = admission.admit("key", CheckCost(1, 256 * MB))
+        # check bigger than the budget is run alone
+        self.assertTrue(admission.try_start(big))
+        self.assertFalse(admission.try_start(small))
+        self.assertEqual(admission.stats()["queued"], 1)
+
+        admission.release(big)
+        self.assertTrue(admission.try_start(small))
+        self.assertTrue(admission.try_start(admission.admit("key", CheckCost(1, 64))))
+        self.assertEqual(admission.stats()["running"], 2)
+
+    def test_quotas(self) -> None:
+        quotas = {"small": Quota(max_checks=1), "slow": Quota(cost_per_minute=10)}
+        admission = AdmissionController(8192 * MB, CostModel(MB, {}), quotas)
+        admission.admit("small", CheckCost(5, MB))
+        with self.assertRaises(AdmissionRejectedError) as context:
+            admission.admit("small", CheckCost(1, MB))
+        self.assertEqual(context.exception.retry_after_header, "5")
+        admission.admit("other", CheckCost(1, MB))
+
+        first = admission.admit("slow", CheckCost(6, MB))
+        admission.release(first)
+        # cost is charged for a minute even after the check is finished
+        with self.assertRaises(AdmissionRejectedError) as context:
+            admission.admit("slow", CheckCost(6, MB))
+        self.assertEqual(context.exception.retry_after_header, "60")
+        admission.admit("slow", CheckCost(4, MB))
+
+    def test_quota_from_dict(self) -> None:
+        self.assertEqual(Quota.from_dict({"maxChecks": 2}), Quota(2, None))
+        self.assertEqual(
+            Quota.from_dict({"maxChecks": None, "costPerMinute": 30}), Quota(None, 30.0)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+
+from src.solution_checker.admission import (
+    AdmissionController,
+    CheckCost,
+    CostModel,
+    Quota,
+    Ticket,
+)
+from src.solution_checker.batch import check_admitted, run_completed
+from src.solution_checker.check_steps.test import create_io_archive
+from src.solution_checker.result_cache import ResultCache
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.scheduler import PriorityScheduler
+from src.solution_checker.solution_checker import SolutionChecker
+from src.solution_checker.tests.unit_tests.test_check_queue import BlockingChecker
+
+
+class RunCompletedTest(unittest.TestCase):
+    def test_completion_order(self) -> None:
+        def slow() -> float:
+            time.sleep(0.05)
+            return 0.05
+
+        def fail() -> float:
+            raise ValueError("broken")
+
+        tasks = [slow, lambda: 0.0, fail]
+        results = list(run_completed(tasks, 3))
+        self.assertEqual([i for i, _, _ in results][-1], 0)
+        errors = {i: str(error) for i, _, error in results if error is not None}
+        self.assertEqual(errors, {2: "broken"})
+
+
+class CheckAdmittedTest(unittest.TestCase):
+    def test_waits_for_quota(self) -> None:
+        admission = AdmissionController(
+            1024, CostModel(1, {}), default_quota=Quota(max_checks=1)
+        )
+        scheduler = PriorityScheduler(2, admission=admission)
+        event = threading.Event()
+
+        def admit(checker: SolutionChecker) -> Ticket:
+            return admission.admit("key", CheckCost(0.1, 1))
+
+        # quota allows one check at once, so the second one waits for the first
+        tasks = [
+            lambda: check_admitted(BlockingChecker(event), admit, scheduler, "bulk")
+            for _ in range(2)
+        ]
+        threading.Timer(0.05, event.set).start()
+        results = list(run_completed(tasks, 2))
+        self.assertTrue(all(result is not None for _, result, _ in results))
+        self.assertGreaterEqual(admission.rejected, 1)
+        self.assertEqual(admission.stats()["running"], 0)
+        self.assertEqual(scheduler.stats()["running"], 0)
+
+
+class IOArchiveTest(unittest.TestCase):
+    def test_shared_archive(self) -> None:
+        tests = [["1 2", "3"], ["2 2", "4"]]
+        archive = create_io_archive(tests, 1)
+        # archive is uploaded to every sandbox of the batch
+        self.assertEqual(archive.getvalue(), archive.getvalue())
+        self.assertIn(b"io/inputs/1.txt", archive.getvalue())
+        checker = SolutionChecker({"main.c": ""}, tests, 1, 1, io_archive=archive)
+        self.assertIs(checker.io_archive, archive)
+
+
+class PrepareTest(unittest.TestCase):
+    def create_checker(
+        self, backend: FakeBackend, result_cache: ResultCache
+    ) -> SolutionChecker:
+        source_code = {"Makefile": "build:\n\tcc main.c\nrun:\n\t./a.out\n"}
+        return SolutionChecker(
+            source_code,
+            [],
+            1,
+            1,
+            result_cache=result_cache,
+            stages=("build",),
+            backend=backend,
+        )
+
+    def test_prepared_sandbox(self) -> None:
+        backend = FakeBackend()
+        result_cache = ResultCache(600, 10)
+        checker = self.create_checker(backend, result_cache)
+        checker.prepare()
+        sandbox = backend.sandboxes["fake1"]
+        self.assertIn("/root/source/Makefile", sandbox.files)
+
+        checker.check_solution()
+        # the check is run in the prepared sandbox
+        self.assertEqual(len(backend.sandboxes), 1)
+        self.assertEqual([e.name for e in sandbox.execs], ["build"])
+        self.assertTrue(sandbox.destroyed)
+
+        # sandbox is released when the result is taken from cache
+        checker = self.create_checker(backend, result_cache)
+        checker.prepare()
+        checker.check_solution()
+        self.assertEqual(result_cache.hits, 1)
+        self.assertTrue(backend.sandboxes["fake2"].destroyed)
+        self.assertEqual(backend.sandboxes["fake2"].execs, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+
+from src.solution_checker.build_cache import BuildCache
+
+
+class BuildCacheTest(unittest.TestCase):
+    def test_key(self) -> None:
+        key = BuildCache.make_key({"main.c": "a", "Makefile": "b"}, "image1")
+        self.assertEqual(
+            key, BuildCache.make_key({"Makefile": "b", "./main.c": "a"}, "image1")
+        )
+        self.assertNotEqual(
+            key, BuildCache.make_key({"Makefile": "b", "main.c": "a"}, "image2")
+        )
+        self.assertNotEqual(
+            key, BuildCache.make_key({"Makefile": "b", "main.c": "c"}, "image1")
+        )
+
+    def test_lru_eviction(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = BuildCache(directory, 10)
+            cache.put("a", b"1234")
+            cache.put("b", b"1234")
+            self.assertEqual(cache.get("a"), b"1234")
+            # "b" is the least recently used one now
+            cache.put("c", b"1234")
+
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), b"1234")
+            self.assertEqual(cache.get("c"), b"1234")
+            self.assertEqual(cache.stats()["bytes"], 8)
+
+            cache.put("d", b"12345678901")
+            self.assertIsNone(cache.get("d"))
+
+            reloaded = BuildCache(directory, 10)
+            self.assertEqual(reloaded.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
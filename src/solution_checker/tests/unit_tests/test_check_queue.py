@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+
+from src.solution_checker.check_queue import CheckQueue, CheckQueueFullError
+from src.solution_checker.models import CheckResult, CheckStatus
+from src.solution_checker.solution_checker import SolutionChecker
+
+
+class BlockingChecker(SolutionChecker):
+    def __init__(self, event: threading.Event):
+        super().__init__({"Makefile": "run:\n\techo 3\n"}, [["", "3"]], 1, 1)
+        self.event = event
+
+    def check_solution(self) -> CheckResult:
+        self.event.wait()
+        return CheckResult(
+            tests_time=0.1,
+            build_time=0.0,
+            status=CheckStatus.OK,
+            message="",
+            tests_passed=1,
+            tests_total=1,
+            lint_success=True,
+        )
+
+
+class CheckQueueTest(unittest.TestCase):
+    def test_job_lifecycle(self) -> None:
+        event = threading.Event()
+        queue = CheckQueue(1, 10, 600)
+
+        job = queue.submit(BlockingChecker(event), None)
+        found = queue.get(job.id)
+        assert found is not None
+        self.assertEqual(found.to_dict()["checkResult"], CheckStatus.CHECKING.value)
+
+        event.set()
+        queue._queue.join()
+        job_dict = job.to_dict()
+        self.assertEqual(job_dict["id"], job.id)
+        self.assertEqual(job_dict["checkResult"], CheckStatus.OK.value)
+        self.assertEqual(job_dict["testsPassed"], 1)
+
+    def test_queue_is_bounded(self) -> None:
+        event = threading.Event()
+        queue = CheckQueue(1, 1, 600)
+
+        first = queue.submit(BlockingChecker(event), None)
+        # waiting for the worker to take the first job
+        while queue.stats()["queued"] != 0:
+            pass
+        queue.submit(BlockingChecker(event), None)
+        with self.assertRaises(CheckQueueFullError):
+            queue.submit(BlockingChecker(event), None)
+
+        event.set()
+        queue._queue.join()
+        self.assertIsNotNone(first.result)
+
+    def test_expired_jobs_are_removed(self) -> None:
+        event = threading.Event()
+        event.set()
+        queue = CheckQueue(1, 10, 0.05)
+        job = queue.submit(BlockingChecker(event), None)
+        queue._queue.join()
+        # jobs are swept without waiting for the next submission
+        deadline = time.time() + 1
+        while queue.get(job.id) is not None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(queue.get(job.id))
+
+    def test_callback_allowed(self) -> None:
+        queue = CheckQueue(1, 1, 600, callback_hosts=["Example.com"])
+        self.assertTrue(queue.callback_allowed("https://example.com/result?id=1"))
+        self.assertTrue(queue.callback_allowed("http://EXAMPLE.com:8080/"))
+        for url in (
+            "https://example.com.evil.org/",
+            "https://evil.org/?https://example.com",
+            "https://example.com@169.254.169.254/",
+            "file://example.com/etc/passwd",
+            "https://[::1/",
+        ):
+            with self.subTest(url=url):
+                self.assertFalse(queue.callback_allowed(url))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+
+from src.solution_checker.check_steps.test import compare_answer
+from src.solution_checker.comparators import (
+    Comparator,
+    ComparatorSpec,
+    ExactComparator,
+    FloatComparator,
+    TokenComparator,
+    UnorderedLinesComparator,
+    parse_comparator,
+)
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.output import (
+    OUTPUT_TRUNCATED_MARKER,
+    BoundedOutput,
+    TextPreview,
+    iter_tar_files,
+)
+from src.solution_checker.utils import TarStream
+
+
+def compare(
+    expected: str,
+    chunks: list[bytes],
+    comparator_type: type[Comparator] = ExactComparator,
+) -> Comparator:
+    comparator = comparator_type(expected)
+    for chunk in chunks:
+        if not comparator.feed(chunk):
+            break
+    comparator.finish()
+    return comparator
+
+
+class ExactComparatorTest(unittest.TestCase):
+    def test_equal(self) -> None:
+        self.assertIsNone(compare("1 2\n3", [b"1 ", b"2\n", b"3"]).mismatch)
+        self.assertIsNone(compare("", []).mismatch)
+
+    def test_trailing_newline(self) -> None:
+        self.assertIsNone(compare("3", [b"3", b"\n"]).mismatch)
+        self.assertEqual(compare("3", [b"3\n\n"]).mismatch, "line 2, column 1")
+        self.assertEqual(compare("3\n", [b"3\n\n"]).mismatch, "line 2, column 1")
+        self.assertEqual(compare("3\n", [b"3"]).mismatch, "line 1, column 2")
+
+    def test_first_mismatch(self) -> None:
+        self.assertEqual(compare("12345", [b"12", b"35"]).mismatch, "line 1, column 4")
+        self.assertEqual(compare("12345", [b"123"]).mismatch, "line 1, column 4")
+        self.assertEqual(compare("123", [b"12345"]).mismatch, "line 1, column 4")
+        self.assertEqual(compare("1\n23", [b"1\n", b"24"]).mismatch, "line 2, column 2")
+
+    def test_stops_at_first_mismatch(self) -> None:
+        comparator = ExactComparator("1")
+        self.assertFalse(comparator.feed(b"2"))
+        self.assertFalse(comparator.feed(b"1"))
+        self.assertEqual(comparator.mismatch, "line 1, column 1")
+
+    def test_multibyte_characters_split_between_chunks(self) -> None:
+        encoded = "привет".encode()
+        self.assertIsNone(compare("привет", [encoded[:3], encoded[3:]]).mismatch)
+
+
+class TokenComparatorTest(unittest.TestCase):
+    def test_whitespace_is_ignored(self) -> None:
+        expected = "1 2\n3"
+        self.assertIsNone(
+            compare(expected, [b"  1\t", b"2 3\n\n"], TokenComparator).mismatch
+        )
+        self.assertIsNone(compare(expected, [b"1 2 3"], TokenComparator).mismatch)
+
+    def test_tokens_split_between_chunks(self) -> None:
+        chunks = [b"12", b"3 4", b"5", b"6\n"]
+        self.assertIsNone(compare("123 456", chunks, TokenComparator).mismatch)
+        comparator = compare("123 45", chunks, TokenComparator)
+        self.assertEqual(comparator.mismatch, "token 2 at line 1")
+
+    def test_first_mismatch(self) -> None:
+        comparator = compare("1\n2\n3", [b"1\n2\n4"], TokenComparator)
+        self.assertEqual(comparator.mismatch, "token 3 at line 3")
+        comparator = compare("1 2", [b"1"], TokenComparator)
+        self.assertEqual(comparator.mismatch, "token 2 at line 1")
+        comparator = compare("1", [b"1 2"], TokenComparator)
+        self.assertEqual(comparator.mismatch, "token 2 at line 1")
+
+    def test_long_token_is_rejected_early(self) -> None:
+        comparator = TokenComparator("1")
+        self.assertFalse(comparator.feed(b"1" * 100))
+
+
+class FloatComparatorTest(unittest.TestCase):
+    def compare(self, expected: str, answer: bytes) -> str | None:
+        comparator = FloatComparator(expected, abs_epsilon=1e-3, rel_epsilon=1e-6)
+        comparator.feed(answer)
+        comparator.finish()
+        return comparator.mismatch
+
+    def test_epsilon(self) -> None:
+        self.assertIsNone(self.compare("0.5 1", b"0.5004 1.0000"))
+        self.assertIsNone(self.compare("1000000", b"1000000.5"))
+        self.assertIsNone(self.compare("-1e3 yes", b"-1000.0 yes"))
+        self.assertEqual(self.compare("0.5 1", b"0.5 1.01"), "token 2 at line 1")
+        self.assertEqual(self.compare("1 yes", b"1 no"), "token 2 at line 1")
+        self.assertEqual(self.compare("nan", b"nan"), None)
+        self.assertEqual(self.compare("1_0", b"10"), "token 1 at line 1")
+
+
+class UnorderedLinesComparatorTest(unittest.TestCase):
+    def test_any_order(self) -> None:
+        expected = "a\nb\nb\nc"
+        chunks = [b"b\nc", b"\nb\na\n"]
+        self.assertIsNone(compare(expected, chunks, UnorderedLinesComparator).mismatch)
+        self.assertIsNone(compare("", [], UnorderedLinesComparator).mismatch)
+
+    def test_first_mismatch(self) -> None:
+        expected = "a\nb\nb\nc"
+        comparator = compare(expected, [b"b\nb\nb\n"], UnorderedLinesComparator)
+        self.assertEqual(comparator.mismatch, "line 3")
+        comparator = compare(expected, [b"b\nc\na"], UnorderedLinesComparator)
+        self.assertEqual(comparator.mismatch, "line 4")
+        comparator = UnorderedLinesComparator(expected)
+        self.assertFalse(comparator.feed(b"x" * 10))
+
+
+class ParseComparatorTest(unittest.TestCase):
+    def test_parse(self) -> None:
+        self.assertEqual(parse_comparator("tokens"), ComparatorSpec("tokens"))
+        self.assertEqual(
+            parse_comparator({"type": "float", "absEpsilon": 0.1}),
+            ComparatorSpec("float", abs_epsilon=0.1),
+        )
+        self.assertIsInstance(
+            parse_comparator({"type": "float"}).create("1"), FloatComparator
+        )
+        for value in ("unknown", 1, {"type": "float", "relEpsilon": -1}):
+            with self.assertRaises(ValueError):
+                parse_comparator(value)
+
+
+class OutputTest(unittest.TestCase):
+    def test_bounded_output(self) -> None:
+        output = BoundedOutput(5)
+        for chunk in (b"abc", b"def", b"ghi"):
+            output.write(chunk)
+        self.assertEqual(output.getvalue(), b"abcde")
+        self.assertEqual(output.size, 9)
+        self.assertTrue(output.truncated)
+
+    def test_text_preview(self) -> None:
+        text_preview = TextPreview(4)
+        text_preview.write(b"ab")
+        text_preview.write(b"cdef")
+        self.assertEqual(text_preview.text(), "abcd" + OUTPUT_TRUNCATED_MARKER)
+
+    def test_iter_tar_files(self) -> None:
+        data = TarStream({"a.txt": "a" * 100, "b.txt": "b"}, "io/").getvalue()
+        chunks = [bytes(chunk) for chunk in zip(*[iter(data)] * 8)]
+        files = {
+            name: b"".join(content)
+            for name, content in iter_tar_files(chunks, chunk_size=16)
+        }
+        self.assertEqual(files, {"io/a.txt": b"a" * 100, "io/b.txt": b"b"})
+
+    def test_long_answer_message_is_truncated(self) -> None:
+        answer = (b"x" * 4096 for _ in range(1000))
+        result = compare_answer("input", "1", answer, 0.1)
+        self.assertEqual(result.status, CheckStatus.TEST_ERROR)
+        self.assertIn(OUTPUT_TRUNCATED_MARKER + '"', result.message)
+        self.assertTrue(
+            result.message.endswith("(first difference at line 1, column 1)")
+        )
+        self.assertLess(len(result.message), 2048)
+
+
+if __name__ == "__main__":
+    unittest.main()
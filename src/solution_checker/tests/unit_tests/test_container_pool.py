@@ -0,0 +1,84 @@
+import time
+import unittest
+from typing import Any
+
+from src.solution_checker.container_pool import ContainerPool
+from src.solution_checker.sandbox.fake_backend import FakeBackend, FakeSandbox
+
+
+def wait_for(condition: Any, timeout: float = 2.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class ContainerPoolTest(unittest.TestCase):
+    def test_hit_and_miss(self) -> None:
+        backend = FakeBackend()
+        pool = ContainerPool(1, 600, 20, backend)
+        self.assertTrue(wait_for(lambda: pool.stats()["idle"] == 1))
+
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertNotEqual(first.id, second.id)
+        stats = pool.stats()
+        # the pool may be refilled in background before the second acquire
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertEqual(stats["hits"] + stats["misses"], 2)
+        self.assertEqual(stats["inUse"], 2)
+
+        pool.release(first)
+        pool.release(second)
+        self.assertTrue(wait_for(lambda: pool.stats()["inUse"] == 0))
+        pool.close()
+
+        alive = [s for s in backend.sandboxes.values() if not s.destroyed]
+        self.assertEqual(alive, [])
+
+    def test_max_uses(self) -> None:
+        backend = FakeBackend()
+        pool = ContainerPool(1, 600, 1, backend)
+        self.assertTrue(wait_for(lambda: pool.stats()["idle"] == 1))
+
+        sandbox = pool.acquire()
+        pool.release(sandbox)
+        self.assertTrue(wait_for(lambda: pool.stats()["replaced"] == 1))
+        self.assertTrue(backend.sandboxes[sandbox.id].destroyed)
+        pool.close()
+
+    def test_killed_container_is_not_reused(self) -> None:
+        backend = FakeBackend()
+        pool = ContainerPool(1, 600, 20, backend)
+        self.assertTrue(wait_for(lambda: pool.stats()["idle"] == 1))
+
+        sandbox = pool.acquire()
+        assert isinstance(sandbox, FakeSandbox)
+        sandbox.alive = False
+        pool.release(sandbox)
+        self.assertTrue(wait_for(lambda: pool.stats()["replaced"] == 1))
+        self.assertEqual(pool.stats()["recycled"], 0)
+        pool.close()
+
+    def test_images(self) -> None:
+        backend = FakeBackend()
+        pool = ContainerPool(1, 600, 20, backend, ("default", "go"))
+        self.assertTrue(wait_for(lambda: pool.stats()["idle"] == 2))
+
+        go = pool.acquire("go")
+        java = pool.acquire("java")
+        assert isinstance(go, FakeSandbox) and isinstance(java, FakeSandbox)
+        self.assertEqual((go.image, java.image), ("go", "java"))
+        self.assertEqual(pool.stats()["hits"], 1)
+
+        # containers of images which are not kept warm are still reused
+        pool.release(java)
+        self.assertTrue(wait_for(lambda: pool.stats()["idleByImage"]["java"] == 1))
+        self.assertEqual(pool.acquire("java").id, java.id)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import threading
+import time
+import unittest
+
+from src.solution_checker.coordinator import (
+    Coordinator,
+    Node,
+    NodeCapacity,
+    NoNodeAvailableError,
+)
+
+
+class FakeCoordinator(Coordinator):
+    def __init__(self, failing: set[str] | None = None):
+        super().__init__(15, 3, 1)
+        self.failing = failing or set()
+        self.busy: dict[str, str] = {}
+        self.sent: list[str] = []
+        self.event: threading.Event | None = None
+        self.timing_out: set[str] = set()
+        self.erroring: set[str] = set()
+
+    def _send(
+        self, node: Node, path: str, body: bytes
+    ) -> tuple[int, bytes, dict[str, str]]:
+        self.sent.append(node.url)
+        if self.event is not None:
+            self.event.wait()
+        if node.url in self.failing:
+            raise ConnectionRefusedError("Connection refused")
+        if node.url in self.timing_out:
+            raise TimeoutError("timed out")
+        if node.url in self.erroring:
+            return 500, b'{"error": "Internal error"}', {}
+        if node.url in self.busy:
+            return 429, b"{}", {"Retry-After": self.busy[node.url]}
+        return 200, body, {}
+
+
+class CoordinatorTest(unittest.TestCase):
+    def test_least_loaded_node(self) -> None:
+        coordinator = FakeCoordinator()
+        coordinator.register("http://a", NodeCapacity(slots=4, running=3))
+        coordinator.register("http://b", NodeCapacity(slots=2, running=1))
+        coordinator.register("http://c", NodeCapacity(slots=3, running=1))
+
+        result = coordinator.dispatch("/check_solution", b"{}")
+        self.assertEqual((result.status, result.node), (200, "http://c"))
+
+        # checks being dispatched are counted before the next heartbeat
+        coordinator.event = threading.Event()
+        threads = [
+            threading.Thread(target=coordinator.dispatch, args=("/", b"{}"))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while len(coordinator.sent) < 4:
+            time.sleep(0.001)
+        coordinator.event.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(coordinator.sent[1:]), ["http://b", "http://c", "http://c"]
+        )
+
+    def test_warm_language_and_memory(self) -> None:
+        coordinator = FakeCoordinator()
+        coordinator.check_memory = 100
+        warm_go = NodeCapacity(slots=2, free_memory=200, warm={"go": 1, "default": 0})
+        coordinator.register("http://go", warm_go)
+        warm_default = NodeCapacity(slots=2, free_memory=200, warm={"default": 2})
+        coordinator.register("http://default", warm_default)
+        coordinator.register("http://small", NodeCapacity(slots=8, free_memory=50))
+
+        self.assertEqual(coordinator.dispatch("/", b"", "go").node, "http://go")
+        self.assertEqual(coordinator.dispatch("/", b"", "java").node, "http://default")
+
+    def test_retry_on_node_failure(self) -> None:
+        coordinator = FakeCoordinator({"http://a"})
+        coordinator.register("http://a", NodeCapacity(slots=4))
+        coordinator.register("http://b", NodeCapacity(slots=2, running=1))
+
+        result = coordinator.dispatch("/", b"{}")
+        self.assertEqual((result.node, result.attempts), ("http://b", 2))
+        self.assertEqual(coordinator.retries, 1)
+        # failed node is not used until it registers again
+        self.assertEqual([node.url for node in coordinator.nodes()], ["http://b"])
+
+        coordinator.failing.add("http://b")
+        with self.assertRaises(NoNodeAvailableError):
+            coordinator.dispatch("/", b"{}")
+        with self.assertRaises(NoNodeAvailableError):
+            coordinator.dispatch("/", b"{}")
+
+    def test_timeout(self) -> None:
+        # check which timed out may still run, it is not sent to another node
+        coordinator = FakeCoordinator()
+        coordinator.timing_out.add("http://a")
+        coordinator.register("http://a", NodeCapacity(slots=4))
+        coordinator.register("http://b", NodeCapacity(slots=2, running=1))
+
+        result = coordinator.dispatch("/", b"{}")
+        self.assertEqual((result.status, result.node), (504, "http://a"))
+        self.assertEqual(coordinator.sent, ["http://a"])
+        self.assertEqual(len(coordinator.nodes()), 2)
+
+    def test_server_error(self) -> None:
+        # node answering with an error is not failed, nor is the check retried
+        coordinator = FakeCoordinator()
+        coordinator.erroring.add("http://a")
+        coordinator.register("http://a", NodeCapacity(slots=4))
+        coordinator.register("http://b", NodeCapacity(slots=2, running=1))
+
+        result = coordinator.dispatch("/", b"{}")
+        self.assertEqual((result.status, result.node), (500, "http://a"))
+        self.assertEqual(coordinator.sent, ["http://a"])
+        self.assertEqual(len(coordinator.nodes()), 2)
+
+    def test_busy_nodes(self) -> None:
+        coordinator = FakeCoordinator()
+        coordinator.register("http://a", NodeCapacity(slots=4))
+        coordinator.register("http://b", NodeCapacity(slots=2, running=1))
+        coordinator.busy = {"http://a": "5"}
+        self.assertEqual(coordinator.dispatch("/", b"{}").node, "http://b")
+
+        # node rejecting the check is not failed, the earliest retry is returned
+        coordinator.busy["http://b"] = "2"
+        result = coordinator.dispatch("/", b"{}")
+        self.assertEqual((result.status, result.retry_after), (429, "2"))
+        self.assertEqual(len(coordinator.nodes()), 2)
+
+    def test_expired_nodes(self) -> None:
+        coordinator = FakeCoordinator()
+        coordinator.node_ttl = 0.05
+        coordinator.register("http://a", NodeCapacity(slots=1))
+        time.sleep(0.1)
+        coordinator.register("http://b", NodeCapacity(slots=1))
+        self.assertEqual([node.url for node in coordinator.nodes()], ["http://b"])
+
+    def test_capacity_from_dict(self) -> None:
+        capacity = NodeCapacity(4, 1, 8, 0.5, 1024, {"c": 2})
+        self.assertEqual(NodeCapacity.from_dict(capacity.to_dict()), capacity)
+        with self.assertRaises(ValueError):
+            NodeCapacity.from_dict({"running": 1})
+        with self.assertRaises(ValueError):
+            NodeCapacity.from_dict({"slots": 1, "warm": {"c": "many"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import queue
+import time
+import unittest
+from typing import Any, Callable, Iterator
+
+from docker.models.containers import ContainerCollection
+
+from src.solution_checker.exec_engine import DockerExecEngine, ExecResult
+from src.solution_checker.metrics import DOCKER_API_CALLS_SAVED
+from src.solution_checker.sandbox.docker_backend import DockerBackend
+
+
+class FakeAPI:
+    # records low level API calls, create_host_config is not a request
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.start_error: Exception | None = None
+
+    def create_host_config(self, **kwargs: Any) -> dict[str, Any]:
+        return kwargs
+
+    def create_container(self, image: str, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append("create_container")
+        return {"Id": f"container{len(self.calls)}"}
+
+    def start(self, container_id: str) -> None:
+        self.calls.append("start")
+        if self.start_error is not None:
+            raise self.start_error
+
+    def exec_create(self, container_id: str, cmd: str, **kwargs: Any) -> Any:
+        self.calls.append("exec_create")
+        return {"Id": "exec1"}
+
+    def exec_inspect(self, exec_id: str) -> dict[str, Any]:
+        self.calls.append("exec_inspect")
+        return {"ExitCode": 0}
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        def call(*args: Any, **kwargs: Any) -> None:
+            self.calls.append(name)
+
+        return call
+
+
+class FakeDockerClient:
+    def __init__(self) -> None:
+        self.api = FakeAPI()
+        self.containers = ContainerCollection(client=self)
+        self.stop_events: queue.Queue[str] = queue.Queue()
+
+    def events(self, **kwargs: Any) -> Iterator[dict[str, str]]:
+        while True:
+            yield {"status": "die", "id": self.stop_events.get()}
+
+
+class FakeExecEngine(DockerExecEngine):
+    def __init__(self, result: ExecResult):
+        self.result = result
+
+    def exec(self, *args: Any, **kwargs: Any) -> ExecResult:
+        return self.result
+
+
+class DockerBackendTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = FakeDockerClient()
+        self.engine = FakeExecEngine(ExecResult(0, b"", False, 0.1))
+        self.backend = DockerBackend(self.client, self.engine)
+
+    def test_check_lifecycle(self) -> None:
+        saved = DOCKER_API_CALLS_SAVED.get(call="inspect_container")
+        sandbox = self.backend.create()
+        self.assertFalse(self.backend.is_lost(sandbox, Exception()))
+        self.assertTrue(self.backend.reset(sandbox))
+        self.backend.destroy(sandbox)
+        # nothing is inspected and the container is killed by remove request
+        self.assertEqual(
+            self.client.api.calls,
+            [
+                "create_container",
+                "start",
+                "exec_create",
+                "exec_start",
+                "exec_inspect",
+                "remove_container",
+            ],
+        )
+        self.assertEqual(
+            DOCKER_API_CALLS_SAVED.get(call="inspect_container") - saved, 3
+        )
+
+    def test_stopped_container(self) -> None:
+        sandbox = self.backend.create()
+        self.client.stop_events.put(sandbox.id)
+        deadline = time.time() + 1
+        while self.backend.tracker.is_running(sandbox.id) and time.time() < deadline:
+            time.sleep(0.001)
+        # stopped container is not reset, its state is known from the events
+        self.assertFalse(self.backend.reset(sandbox))
+        self.assertTrue(self.backend.is_lost(sandbox, Exception()))
+        self.assertEqual(self.client.api.calls, ["create_container", "start"])
+
+        # timed out exec kills the whole container
+        self.engine.result = ExecResult(None, b"", True, 1.0)
+        sandbox = self.backend.create()
+        self.backend.exec(sandbox, "sleep 10", timeout=1.0)
+        self.assertFalse(self.backend.reset(sandbox))
+
+    def test_container_failed_to_start(self) -> None:
+        self.client.api.start_error = Exception("Cannot start container")
+        with self.assertRaisesRegex(Exception, "Cannot start"):
+            self.backend.create()
+        self.assertEqual(
+            self.client.api.calls, ["create_container", "start", "remove_container"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
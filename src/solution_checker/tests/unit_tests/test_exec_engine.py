@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any
+
+from src.solution_checker.exec_engine import DockerExecEngine, DockerExecError
+
+
+class FakeDockerServer:
+    # serves exec endpoints of Docker API, commands are run locally; connections
+    # are kept alive unless keep_alive is False
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.keep_alive = True
+        self.connections = 0
+        self.commands: dict[str, list[str]] = {}
+        self.exit_codes: dict[str, int] = {}
+        self.killed: list[str] = []
+        # execs are reported as running after their output is closed
+        self.stuck = False
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self) -> None:
+        await asyncio.start_unix_server(self._handle, self.socket_path)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        while await self._handle_request(reader, writer) and self.keep_alive:
+            pass
+        writer.close()
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        # returns False when the connection can't take more requests
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+        method, path, _ = request_line.decode().split()
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            key, value = line.decode().split(":", 1)
+            headers[key.lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        parts = path.strip("/").split("/")
+        if parts[0] == "containers" and parts[2] == "exec":
+            exec_id = str(len(self.commands))
+            self.commands[exec_id] = json.loads(body)["Cmd"]
+            self._respond(writer, 201, {"Id": exec_id})
+        elif parts[0] == "containers" and parts[2] == "kill":
+            self.killed.append(parts[1])
+            self._respond(writer, 204, None)
+        elif parts[0] == "exec" and parts[2] == "start":
+            writer.write(b"HTTP/1.1 101 UPGRADED\r\n\r\n")
+            process = await asyncio.create_subprocess_exec(
+                *self.commands[parts[1]],
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            assert process.stdout is not None
+            while data := await process.stdout.read(1024):
+                writer.write(b"\x01\x00\x00\x00" + len(data).to_bytes(4, "big") + data)
+            self.exit_codes[parts[1]] = await process.wait()
+            await writer.drain()
+            return False
+        else:
+            exit_code = None if self.stuck else self.exit_codes.get(parts[1])
+            self._respond(
+                writer, 200, {"Running": exit_code is None, "ExitCode": exit_code}
+            )
+        await writer.drain()
+        return True
+
+    def _respond(
+        self, writer: asyncio.StreamWriter, status: int, data: dict[str, Any] | None
+    ) -> None:
+        body = json.dumps(data).encode() if data is not None else b""
+        writer.write(
+            f"HTTP/1.1 {status} OK\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+
+
+class TestExecEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        socket_path = os.path.join(self.directory.name, "docker.sock")
+        self.server = FakeDockerServer(socket_path)
+        self.engine = DockerExecEngine(f"unix://{socket_path}")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_output_and_exit_code(self) -> None:
+        result = self.engine.exec("container", "echo out; echo err >&2; exit 3")
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(result.output, b"out\nerr\n")
+        self.assertFalse(result.timed_out)
+
+    def test_connections_are_reused(self) -> None:
+        for i in range(2):
+            self.assertEqual(self.engine.exec("container", "exit 2").exit_code, 2)
+        # one connection for API requests and one for output of every exec
+        self.assertEqual(self.server.connections, 3)
+
+        # connections closed by docker are replaced
+        self.server.keep_alive = False
+        self.assertEqual(self.engine.exec("container", "exit 3").exit_code, 3)
+
+    def test_exec_not_exited(self) -> None:
+        # exec still running after its deadline is an error, not a runtime error
+        self.server.stuck = True
+        self.engine.kill_grace = 0.1
+        with self.assertRaisesRegex(DockerExecError, "didn't exit"):
+            self.engine.exec("container", "true", timeout=0.1)
+        self.assertEqual(self.server.killed, ["container"])
+
+    def test_timeout(self) -> None:
+        result = self.engine.exec("container", "echo started; sleep 10", timeout=0.3)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.time, 0.3)
+        self.assertEqual(result.output, b"started\n")
+        self.assertEqual(self.server.killed, [])
+
+    def test_background_process_is_killed(self) -> None:
+        late_path = os.path.join(self.directory.name, "late")
+        result = self.engine.exec(
+            "container", f"(sleep 0.3; touch {late_path}) & echo done", timeout=5
+        )
+        self.assertEqual(result.output, b"done\n")
+        self.assertLess(result.time, 0.3)
+        time.sleep(0.5)
+        self.assertFalse(os.path.exists(late_path))
+
+    def test_concurrent_execs(self) -> None:
+        results = []
+
+        def run(i: int) -> None:
+            results.append(self.engine.exec("container", f"sleep 0.2; echo {i}"))
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(result.output for result in results),
+            [f"{i}\n".encode() for i in range(8)],
+        )
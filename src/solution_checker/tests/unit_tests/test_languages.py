@@ -0,0 +1,106 @@
+import runpy
+import unittest
+from pathlib import Path
+from typing import Any
+
+import docker
+
+from src.solution_checker.check_steps import test as test_step
+from src.solution_checker.languages import detect_language
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox.docker_backend import DockerBackend
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.solution_checker import SolutionChecker
+from src.solution_checker.utils import TarStream
+
+ROOT = Path(__file__).parents[4]
+
+
+class DetectLanguageTest(unittest.TestCase):
+    def test_extensions(self) -> None:
+        source = {"Makefile": "run:\n\t./main", "main.c": "", "lib/sum.h": ""}
+        self.assertEqual(detect_language(source), "c")
+        self.assertEqual(detect_language({"Main.java": "", "Makefile": ""}), "java")
+        self.assertEqual(detect_language({"main.cpp": "", "main.c": ""}), "c")
+
+    def test_makefile_tools(self) -> None:
+        makefile = "build:\n\tgo build -o main main\nrun:\n\t./main"
+        self.assertEqual(detect_language({"Makefile": makefile, "main": ""}), "go")
+        # words outside of recipes are not commands
+        self.assertIsNone(detect_language({"Makefile": "go:\n\techo 1"}))
+
+    def test_mixed_and_unknown(self) -> None:
+        self.assertIsNone(detect_language({"main.c": "", "gen.py": ""}))
+        self.assertIsNone(detect_language({"Makefile": "run:\n\tcat"}))
+
+
+class ImageSelectionTest(unittest.TestCase):
+    def test_image_is_reported(self) -> None:
+        backend = FakeBackend()
+        images = {"c": "checker_c"}
+        source = {"Makefile": "run:\n\t./main", "main.c": ""}
+        checker = SolutionChecker(source, [], 1, 1, backend=backend, images=images)
+        result = checker.check_solution()
+        self.assertEqual((result.language, result.image), ("c", "checker_c"))
+        self.assertEqual(
+            [sandbox.image for sandbox in backend.sandboxes.values()], ["checker_c"]
+        )
+
+        source = {"Makefile": "run:\n\tpython3 main.py", "main.py": ""}
+        checker = SolutionChecker(source, [], 1, 1, backend=backend, images=images)
+        result = checker.check_solution()
+        self.assertEqual((result.language, result.image), ("python", "default"))
+
+
+def get_language_images() -> dict[str, str]:
+    settings: Any = runpy.run_path(str(ROOT / "config.template.py"))
+    images: dict[str, str] = settings["LANGUAGE_IMAGES"]
+    return images
+
+
+def docker_images() -> set[str]:
+    try:
+        client = docker.from_env()
+        return {
+            tag.split(":")[0] for image in client.images.list() for tag in image.tags
+        }
+    except Exception:
+        return set()
+
+
+class LanguageImagesTest(unittest.TestCase):
+    def test_images_install_python(self) -> None:
+        # tests are run by the batch runner, which is a python script
+        for language in get_language_images():
+            with self.subTest(language=language):
+                dockerfile = ROOT / "liokorcode_checker_image" / language / "Dockerfile"
+                packages = [
+                    package
+                    for line in dockerfile.read_text().splitlines()
+                    if line.startswith("RUN apk add ")
+                    for package in line.split()[3:]
+                ]
+                self.assertIn("python3", packages)
+
+    def test_batch_runner_in_images(self) -> None:
+        available = docker_images()
+        images = [i for i in get_language_images().values() if i in available]
+        if not images:
+            self.skipTest("Language images are not built")
+        backend = DockerBackend()
+        for image in images:
+            with self.subTest(image=image):
+                sandbox = backend.create(image)
+                try:
+                    source = TarStream({"Makefile": "run:\n\tcat\n"}, "source/")
+                    backend.put_archive(sandbox, "/root", source)
+                    result = test_step.test_solution_batch(
+                        backend, sandbox, [["1", "1"]], 5
+                    )
+                    self.assertEqual(result.status, CheckStatus.OK, result.message)
+                finally:
+                    backend.destroy(sandbox)
+
+
+if __name__ == "__main__":
+    unittest.main()
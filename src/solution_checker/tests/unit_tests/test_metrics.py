@@ -0,0 +1,40 @@
+import unittest
+
+from src.solution_checker.metrics import Counter, Histogram, Registry, timed
+
+
+class MetricsTest(unittest.TestCase):
+    def test_render(self) -> None:
+        registry = Registry()
+        counter = Counter("checks_total", "Checks", ("status",))
+        histogram = Histogram("call_seconds", "Calls", ("call",), buckets=(0.1, 1.0))
+        registry.register(counter)
+        registry.register(histogram)
+
+        counter.inc(status="OK")
+        counter.inc(2, status="OK")
+        histogram.observe(0.05, call="exec")
+        histogram.observe(0.5, call="exec")
+        histogram.observe(5, call="exec")
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE checks_total counter", lines)
+        self.assertIn('checks_total{status="OK"} 3.0', lines)
+        self.assertIn('call_seconds_bucket{call="exec",le="0.1"} 1', lines)
+        self.assertIn('call_seconds_bucket{call="exec",le="1.0"} 2', lines)
+        self.assertIn('call_seconds_bucket{call="exec",le="+Inf"} 3', lines)
+        self.assertIn('call_seconds_count{call="exec"} 3', lines)
+
+    def test_timed(self) -> None:
+        histogram = Histogram("stage_seconds", "Stages", ("stage",))
+        timings: dict[str, float] = {}
+        with timed(histogram, timings, stage="build"):
+            pass
+        with timed(histogram, timings, stage="build"):
+            pass
+        self.assertEqual(list(timings.keys()), ["build"])
+        self.assertIn('stage_seconds_count{stage="build"} 2', histogram.samples())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import time
+import unittest
+from typing import Any
+from unittest import mock
+
+from src.solution_checker.check_steps import test as test_step
+from src.solution_checker import models
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox.backend import Sandbox, SandboxBackend
+
+
+def fake_run_test(
+    backend: Any,
+    sandbox: Any,
+    test: list[str],
+    io_path: str,
+    test_timeout: float,
+    max_output: int,
+    comparator: Any,
+    cpu_time_limit: bool = False,
+) -> models.TestResult:
+    test_input, expected_output = test
+    # later tests are faster to check that shards don't rely on the order
+    time.sleep(0.01 / (int(test_input) + 1))
+    if test_input != expected_output:
+        return models.TestResult(
+            status=CheckStatus.TEST_ERROR, time=0.1, message=test_input
+        )
+    return models.TestResult(status=CheckStatus.OK, time=0.1, message="")
+
+
+class ParallelTestsTest(unittest.TestCase):
+    def run_tests(self, tests: list[list[str]], workers_count: int) -> Any:
+        sandboxes = [Sandbox(id=str(i)) for i in range(workers_count)]
+        with mock.patch.object(test_step, "run_test", fake_run_test):
+            backend = mock.Mock(spec=SandboxBackend)
+            return test_step.test_solution_parallel(backend, sandboxes, tests, 1)
+
+    def test_all_passed(self) -> None:
+        tests = [[str(i), str(i)] for i in range(10)]
+        result = self.run_tests(tests, 3)
+        self.assertEqual(result.status, CheckStatus.OK)
+        self.assertEqual(result.tests_passed, 10)
+        self.assertAlmostEqual(result.time, 1.0)
+
+    def test_first_failure_is_reported(self) -> None:
+        tests = [[str(i), str(i)] for i in range(10)]
+        tests[7][1] = "wrong"
+        tests[4][1] = "wrong"
+        for workers_count in range(1, 5):
+            result = self.run_tests(tests, workers_count)
+            self.assertEqual(result.status, CheckStatus.TEST_ERROR)
+            self.assertEqual(result.message, "4")
+            self.assertEqual(result.tests_passed, 4)
+            self.assertAlmostEqual(result.time, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import unittest
+
+from src.solution_checker.pipeline import Pipeline, Stage
+
+
+class PipelineTest(unittest.TestCase):
+    def test_independent_stages_run_concurrently(self) -> None:
+        lint_done = threading.Event()
+
+        def build() -> bool:
+            # build can finish only if lint was run at the same time
+            return lint_done.wait(1)
+
+        def lint() -> bool:
+            lint_done.set()
+            return True
+
+        results = Pipeline(
+            [
+                Stage(name="build", run=build, succeeded=bool),
+                Stage(name="test", run=lambda: True, depends_on=("build",)),
+                Stage(name="lint", run=lint),
+            ],
+            fail_fast=True,
+        ).run()
+        self.assertEqual(results, {"build": True, "test": True, "lint": True})
+
+    def test_failed_dependency_skips_stage(self) -> None:
+        results = Pipeline(
+            [
+                Stage(name="build", run=lambda: False, succeeded=bool),
+                Stage(name="test", run=lambda: True, depends_on=("build",)),
+                Stage(name="lint", run=lambda: True),
+            ],
+            fail_fast=False,
+        ).run()
+        self.assertEqual(results, {"build": False, "test": None, "lint": True})
+
+    def test_fail_fast_finishes_running_stages(self) -> None:
+        build_failed = threading.Event()
+
+        def build() -> bool:
+            build_failed.set()
+            return False
+
+        def lint() -> bool:
+            # lint is still running when build fails
+            return build_failed.wait(1)
+
+        results = Pipeline(
+            [
+                Stage(name="build", run=build, succeeded=bool),
+                Stage(name="test", run=lambda: True, depends_on=("build",)),
+                Stage(name="lint", run=lint),
+            ],
+            fail_fast=True,
+        ).run()
+        self.assertEqual(results, {"build": False, "lint": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from src.solution_checker.check_steps.test import parse_usage
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox.local_backend import LocalBackend
+from src.solution_checker.solution_checker import SolutionChecker
+
+BUSY_SOLUTION = {
+    "Makefile": "run:\n\tpython3 main.py\n",
+    "main.py": "print(input())\nwhile True:\n    pass\n",
+}
+ECHO_SOLUTION = {
+    "Makefile": "run:\n\tpython3 main.py\n",
+    "main.py": "print(input())\n",
+}
+
+
+class ResourceUsageTest(unittest.TestCase):
+    def test_parse_usage(self) -> None:
+        marker = b"\n--usage-1--\n"
+        output = b"42\n" + marker + b"0m0.001s 0m0.002s\n1m0.500s 0m0,250s\n 7\n"
+        answer, usage = parse_usage(output, marker)
+        self.assertEqual(answer, b"42\n")
+        assert usage is not None
+        self.assertEqual((usage.cpu_user, usage.cpu_system), (60.5, 0.25))
+        self.assertEqual((usage.peak_memory, usage.output_bytes), (None, 10))
+        # the usage is lost when output is cut at the limit
+        self.assertEqual(parse_usage(b"42\n4", marker), (b"42\n4", None))
+
+    def test_usage_is_reported(self) -> None:
+        for batch in (False, True):
+            with self.subTest(batch=batch):
+                result = SolutionChecker(
+                    ECHO_SOLUTION,
+                    [["1", "1"], ["22", "22"]],
+                    5,
+                    5,
+                    None,
+                    batch,
+                    backend=LocalBackend(),
+                ).check_solution()
+                self.assertEqual(result.status, CheckStatus.OK, msg=result.message)
+                assert result.tests_usage is not None
+                self.assertEqual(len(result.tests_usage), 2)
+                self.assertEqual(result.tests_usage[1]["outputBytes"], 3)
+                self.assertGreater(result.tests_cpu_time or 0.0, 0.0)
+                # peak memory is measured by the batch runner only
+                self.assertEqual(result.tests_usage[0]["peakMemory"] is not None, batch)
+
+    def test_cpu_time_limit(self) -> None:
+        for batch in (False, True):
+            with self.subTest(batch=batch):
+                result = SolutionChecker(
+                    BUSY_SOLUTION,
+                    [["1", "1"]],
+                    5,
+                    0.5,
+                    None,
+                    batch,
+                    backend=LocalBackend(),
+                    cpu_time_limit=True,
+                ).check_solution()
+                self.assertEqual(result.status, CheckStatus.EXECUTION_TIMEOUT)
+                assert result.tests_cpu_time is not None
+                self.assertGreater(result.tests_cpu_time, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+
+from src.solution_checker.models import CheckResult, CheckStatus
+from src.solution_checker.result_cache import ResultCache
+
+
+def make_result(status: CheckStatus = CheckStatus.OK) -> CheckResult:
+    return CheckResult(
+        tests_time=0.1,
+        build_time=0.0,
+        status=status,
+        message="",
+        tests_passed=1,
+        tests_total=1,
+        lint_success=True,
+    )
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_hit(self) -> None:
+        cache = ResultCache(60, 10)
+        calls = []
+
+        def check() -> CheckResult:
+            calls.append(1)
+            return make_result()
+
+        first = cache.get_or_check("key", check)
+        second = cache.get_or_check("key", check)
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_timeouts_are_not_cached(self) -> None:
+        cache = ResultCache(60, 10)
+        cache.get_or_check("key", lambda: make_result(CheckStatus.EXECUTION_TIMEOUT))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_partial_lint_is_not_cached(self) -> None:
+        cache = ResultCache(60, 10)
+        result = make_result()
+        result.lint_partial = True
+        cache.get_or_check("key", lambda: result)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_ttl_and_size(self) -> None:
+        cache = ResultCache(0.05, 1)
+        cache.get_or_check("a", make_result)
+        cache.get_or_check("b", make_result)
+        self.assertEqual(cache.stats()["entries"], 1)
+        time.sleep(0.1)
+        cache.get_or_check("b", make_result)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_in_flight_deduplication(self) -> None:
+        cache = ResultCache(60, 10)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def check() -> CheckResult:
+            calls.append(1)
+            started.set()
+            release.wait()
+            return make_result()
+
+        results: list[CheckResult] = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_check("k", check))
+            )
+            for _ in range(4)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        while cache.stats()["deduplicated"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import tarfile
+import tempfile
+import time
+import unittest
+
+from src.solution_checker.output import iter_tar_files
+from src.solution_checker.runner import batch_runner
+from src.solution_checker.sandbox.backend import (
+    Sandbox,
+    SandboxBackend,
+    put_file,
+    stream_file,
+)
+from src.solution_checker.sandbox.fake_backend import FakeBackend
+from src.solution_checker.sandbox.local_backend import LocalBackend, LocalSandboxError
+from src.solution_checker.utils import TarStream
+
+
+def read_file(backend: SandboxBackend, sandbox: Sandbox, path: str) -> bytes | None:
+    chunks = stream_file(backend, sandbox, path)
+    return b"".join(chunks) if chunks is not None else None
+
+
+class BackendFilesTest(unittest.TestCase):
+    def check_files(self, backend: SandboxBackend) -> None:
+        sandbox = backend.create()
+        try:
+            tar = TarStream({"main.c": "int main;", "lib/sum.h": "int;"}, "source/")
+            backend.put_archive(sandbox, "/root", tar)
+            put_file(backend, sandbox, "/root/io/input.txt", "1 2")
+
+            self.assertEqual(read_file(backend, sandbox, "/root/io/input.txt"), b"1 2")
+            self.assertIsNone(read_file(backend, sandbox, "/root/io/missing.txt"))
+            archive = backend.stream_archive(sandbox, "/root/source")
+            self.assertEqual(
+                {name: b"".join(chunks) for name, chunks in iter_tar_files(archive)},
+                {"source/main.c": b"int main;", "source/lib/sum.h": b"int;"},
+            )
+
+            self.assertTrue(backend.reset(sandbox))
+            self.assertIsNone(read_file(backend, sandbox, "/root/io/input.txt"))
+        finally:
+            backend.destroy(sandbox)
+
+    def test_local(self) -> None:
+        self.check_files(LocalBackend())
+
+    def test_fake(self) -> None:
+        self.check_files(FakeBackend())
+
+
+class LocalBackendTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.backend = LocalBackend()
+        self.sandbox = self.backend.create()
+
+    def tearDown(self) -> None:
+        self.backend.destroy(self.sandbox)
+
+    def test_exec(self) -> None:
+        put_file(self.backend, self.sandbox, "/root/source/in.txt", "3")
+        result = self.backend.exec(
+            self.sandbox,
+            "cat in.txt > /tmp/out.txt && cat $input_path && exit 5",
+            workdir="/root/source",
+            environment={"input_path": "/tmp/out.txt"},
+        )
+        self.assertEqual(result.exit_code, 5)
+        self.assertEqual(result.output, b"3")
+        self.assertFalse(result.timed_out)
+
+    def test_timeout(self) -> None:
+        result = self.backend.exec(self.sandbox, "sleep 10", timeout=0.2)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.time, 0.2)
+
+    def test_max_output(self) -> None:
+        result = self.backend.exec(
+            self.sandbox, "yes | head -c 1000000; exit 3", timeout=5, max_output=10
+        )
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(result.output, b"y\ny\ny\ny\ny\n")
+        self.assertTrue(result.output_truncated)
+
+    def test_stream_big_file(self) -> None:
+        self.backend.exec(self.sandbox, "head -c 200000 /dev/zero > /tmp/big.bin")
+        chunks = stream_file(self.backend, self.sandbox, "/tmp/big.bin")
+        assert chunks is not None
+        sizes = [len(chunk) for chunk in chunks]
+        self.assertEqual(sum(sizes), 200000)
+        self.assertGreater(len(sizes), 1)
+
+    def test_archive_outside_of_sandbox(self) -> None:
+        bio = io.BytesIO()
+        with tarfile.open(fileobj=bio, mode="w") as tar:
+            tarinfo = tarfile.TarInfo("../../../escaped.txt")
+            tar.addfile(tarinfo, io.BytesIO())
+        with self.assertRaises(LocalSandboxError):
+            self.backend.put_archive(self.sandbox, "/root/source", bio.getvalue())
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def test_background_process_is_killed(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "Makefile"), "w") as f:
+                # child keeps stdout open and writes output after the test
+                f.write("run:\n\t(sleep 0.3; echo late > $$output_path) & echo 1\n")
+            input_path = os.path.join(directory, "input.txt")
+            output_path = os.path.join(directory, "output.txt")
+            with open(input_path, "w") as f:
+                f.write("1")
+
+            started = time.time()
+            result, stdout = batch_runner.run_test(
+                directory, input_path, output_path, 5
+            )
+            self.assertLess(time.time() - started, 0.3)
+            self.assertEqual((result["exitCode"], stdout), (0, b"1\n"))
+            time.sleep(0.5)
+            self.assertFalse(os.path.exists(output_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+from typing import Callable
+
+from src.solution_checker.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    CheckCost,
+    CostModel,
+)
+from src.solution_checker.check_queue import CheckQueue
+from src.solution_checker.scheduler import PriorityScheduler
+from src.solution_checker.tests.unit_tests.test_check_queue import BlockingChecker
+
+
+class PrioritySchedulerTest(unittest.TestCase):
+    def submit_all(
+        self, scheduler: PriorityScheduler, priorities: list[str], started: list[str]
+    ) -> None:
+        def create_start(priority: str) -> Callable[[float], None]:
+            return lambda _: started.append(priority)
+
+        for priority in priorities:
+            scheduler.submit(priority, create_start(priority))
+
+    def test_weighted_fair_sharing(self) -> None:
+        scheduler = PriorityScheduler(1, {"interactive": 3, "bulk": 1})
+        # the slot is taken, so everything else waits
+        scheduler.submit("bulk", lambda _: None)
+        started: list[str] = []
+        self.submit_all(scheduler, ["bulk"] * 100 + ["interactive"] * 6, started)
+        for _ in range(8):
+            scheduler.release()
+        # interactive checks are not stuck behind the bulk ones
+        self.assertEqual(started.count("interactive"), 6)
+        self.assertEqual(started.count("bulk"), 2)
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["running"], 1)
+        self.assertEqual(stats["waiting"], {"interactive": 0, "bulk": 98})
+
+    def test_aging(self) -> None:
+        scheduler = PriorityScheduler(1, {"interactive": 100, "bulk": 1}, aging=0.05)
+        scheduler.submit("bulk", lambda _: None)
+        started: list[str] = []
+        self.submit_all(scheduler, ["bulk"], started)
+        time.sleep(0.1)
+        self.submit_all(scheduler, ["interactive"] * 2, started)
+        # bulk check is served first due to aging, though its share is used
+        scheduler.release()
+        self.assertEqual(started, ["bulk"])
+        self.assertEqual(scheduler.aged, 1)
+        scheduler.release()
+        self.assertEqual(started, ["bulk", "interactive"])
+
+    def test_wait_time_and_max_waiting(self) -> None:
+        scheduler = PriorityScheduler(1, max_waiting=1)
+        self.assertLess(scheduler.acquire("bulk"), 0.01)
+
+        waited: list[float] = []
+        scheduler.submit(None, waited.append)
+        with self.assertRaises(AdmissionRejectedError):
+            scheduler.submit(None, waited.append)
+        self.assertEqual(scheduler.stats()["rejected"], 1)
+        with self.assertRaises(ValueError):
+            scheduler.submit("urgent", waited.append)
+
+        time.sleep(0.05)
+        scheduler.release()
+        self.assertEqual(len(waited), 1)
+        self.assertGreaterEqual(waited[0], 0.05)
+
+    def test_memory_budget(self) -> None:
+        admission = AdmissionController(1000, CostModel(0, {}))
+        scheduler = PriorityScheduler(4, admission=admission)
+        started: list[float] = []
+        tickets = []
+        for memory in (600, 600, 100):
+            tickets.append(admission.admit("key", CheckCost(1, memory)))
+            scheduler.submit("bulk", started.append, tickets[-1])
+        # the second check waits for memory and the third one doesn't overtake it
+        self.assertEqual(len(started), 1)
+        scheduler.release(tickets[0])
+        self.assertEqual(len(started), 3)
+        self.assertEqual(admission.stats()["memory"], 700)
+
+
+class CheckQueueSchedulerTest(unittest.TestCase):
+    def test_queue_time(self) -> None:
+        event = threading.Event()
+        queue = CheckQueue(1, 10, 600)
+        first = queue.submit(BlockingChecker(event), None)
+        second = queue.submit(BlockingChecker(event), None, priority="bulk")
+        time.sleep(0.05)
+        event.set()
+        while second.result is None:
+            time.sleep(0.001)
+        assert first.result is not None
+        self.assertLess(first.result.queue_time or 0, 0.05)
+        self.assertGreaterEqual(second.result.queue_time or 0, 0.05)
+        self.assertEqual(second.to_dict()["queueTime"], second.result.queue_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
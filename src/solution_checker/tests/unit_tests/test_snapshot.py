@@ -0,0 +1,111 @@
+import shutil
+import unittest
+from typing import Any
+
+from src.solution_checker.exec_engine import ExecResult
+from src.solution_checker.models import CheckStatus
+from src.solution_checker.sandbox.backend import Sandbox
+from src.solution_checker.sandbox.local_backend import LocalBackend, LocalSandbox
+from src.solution_checker.solution_checker import SolutionChecker
+
+SOLUTION = {
+    "Makefile": "build:\n\techo built > artifact\nrun:\n\tcat artifact -\n",
+}
+TESTS = [[str(i), f"built\n{i}"] for i in range(4)]
+
+
+class LosingBackend(LocalBackend):
+    # the first sandbox is lost (as if its container was killed) by its run of
+    # tests number lost_at, or the run fails while the sandbox is still there
+    # if lost is False; builds are counted to check they are not repeated
+    def __init__(self, lost_at: int, lost: bool = True) -> None:
+        super().__init__()
+        self.lost_at = lost_at
+        self.lost = lost
+        self.builds = 0
+        self.snapshots = 0
+        self.created: list[Sandbox] = []
+        self.test_runs = 0
+
+    def get_archive(self, sandbox: Sandbox, path: str) -> bytes:
+        self.snapshots += 1
+        return super().get_archive(sandbox, path)
+
+    def create(self, image: str | None = None) -> Sandbox:
+        sandbox = super().create(image)
+        self.created.append(sandbox)
+        return sandbox
+
+    def exec(self, sandbox: Sandbox, command: str, *args: Any, **kwargs: Any) -> Any:
+        name = kwargs.get("name")
+        if name == "build":
+            self.builds += 1
+        if name in ("test", "batch_test") and sandbox is self.created[0]:
+            self.test_runs += 1
+            if self.test_runs >= self.lost_at:
+                assert isinstance(sandbox, LocalSandbox)
+                if self.lost:
+                    shutil.rmtree(sandbox.directory)
+                raise Exception("Container is not running")
+        result: ExecResult = super().exec(sandbox, command, *args, **kwargs)
+        return result
+
+
+class SnapshotTest(unittest.TestCase):
+    def check(
+        self, retries: int, workers: int = 1, batch: bool = False, lost: bool = True
+    ) -> Any:
+        # batch of all tests is run once
+        backend = LosingBackend(1 if batch else 2, lost)
+        checker = SolutionChecker(
+            SOLUTION,
+            TESTS,
+            5,
+            5,
+            batch_tests=batch,
+            test_workers=workers,
+            stages=("build", "test"),
+            backend=backend,
+            test_retries=retries,
+        )
+        return checker.check_solution(), backend
+
+    def test_lost_sandbox_is_replaced(self) -> None:
+        for workers, batch in ((1, False), (2, False), (1, True)):
+            with self.subTest(workers=workers, batch=batch):
+                result, backend = self.check(1, workers, batch)
+                self.assertEqual(result.status, CheckStatus.OK, result.message)
+                self.assertEqual(result.tests_passed, len(TESTS))
+                # replacement got the built solution from the snapshot taken
+                # for parallel tests, or built it again
+                self.assertEqual(backend.builds, 1 if workers > 1 else 2)
+                self.assertEqual(backend.snapshots, 1 if workers > 1 else 0)
+                self.assertEqual(len(backend.created), workers + 1)
+
+    def test_no_snapshot_without_lost_sandbox(self) -> None:
+        backend = LosingBackend(len(TESTS) + 1)
+        checker = SolutionChecker(
+            SOLUTION,
+            TESTS,
+            5,
+            5,
+            stages=("build", "test"),
+            backend=backend,
+            test_retries=1,
+        )
+        result = checker.check_solution()
+        self.assertEqual(result.status, CheckStatus.OK, result.message)
+        self.assertEqual((backend.builds, backend.snapshots), (1, 0))
+
+    def test_without_retries(self) -> None:
+        with self.assertRaisesRegex(Exception, "not running"):
+            self.check(0)
+
+    def test_error_in_sandbox_still_there(self) -> None:
+        # errors not caused by a lost sandbox are not repeated in another one
+        with self.assertRaisesRegex(Exception, "not running"):
+            self.check(1, lost=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,40 @@
-from io import BytesIO
 import tarfile
+from typing import Iterator, Mapping
 
 
-def files_to_tar(files: dict[str, str], base_path: str) -> BytesIO:
-    bio = BytesIO()
-    tar = tarfile.open(fileobj=bio, mode="w")
-    for name, content in files.items():
-        encoded = content.encode()
-        file = BytesIO(encoded)
-        tarinfo = tarfile.TarInfo(base_path + name)
-        tarinfo.size = len(encoded)
-        tar.addfile(tarinfo, fileobj=file)
-    tar.close()
-    bio.seek(0)
-    return bio
+class TarStream:
+    # tar archive of in-memory files produced on the fly: only headers are
+    # built, contents are yielded as views of the encoded files, so the archive
+    # is never assembled in a buffer; the size is known in advance, so it's
+    # uploaded with Content-Length and may be iterated several times
+    def __init__(self, files: Mapping[str, str | bytes], base_path: str = ""):
+        self._entries: list[tuple[bytes, bytes]] = []
+        self._size = tarfile.BLOCKSIZE * 2
+        for name, content in files.items():
+            data = content.encode() if isinstance(content, str) else content
+            tarinfo = tarfile.TarInfo(base_path + name)
+            tarinfo.size = len(data)
+            header = tarinfo.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+            self._entries.append((header, data))
+            self._size += len(header) + len(data) + padding_size(len(data))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        for header, data in self._entries:
+            yield header
+            if data:
+                yield memoryview(data)
+            padding = padding_size(len(data))
+            if padding:
+                yield bytes(padding)
+        yield bytes(tarfile.BLOCKSIZE * 2)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self)
+
+
+def padding_size(size: int) -> int:
+    # file contents are padded to the whole number of tar blocks
+    return -size % tarfile.BLOCKSIZE
@@ -243,6 +243,40 @@ class SolutionCheckerTest(unittest.TestCase):
         self.assertEqual(result.tests_passed, 1, msg=result.json())
         self.assertNotEqual(len(result.message), 0)
 
+    def test_batch_c_multiple_files(self) -> None:
+        result = SolutionChecker(
+            source_code_c_multiple_files,
+            self.tests,
+            self.build_timeout,
+            self.test_timeout,
+            batch_tests=True,
+        ).check_solution()
+        self.check_solution_ok(result)
+
+    def test_batch_error_test_error(self) -> None:
+        result = SolutionChecker(
+            source_code_py_wrong,
+            self.tests,
+            self.build_timeout,
+            self.test_timeout,
+            batch_tests=True,
+        ).check_solution()
+        self.assertEqual(result.status, CheckStatus.TEST_ERROR, msg=result.json())
+        self.assertEqual(result.tests_passed, 1, msg=result.json())
+
+    def test_batch_error_runtime_timeout(self) -> None:
+        test_timeout = 0.1
+        result = SolutionChecker(
+            source_code_runtime_timeout,
+            [["1 2", "3"]],
+            self.build_timeout,
+            test_timeout,
+            batch_tests=True,
+        ).check_solution()
+        self.assertEqual(
+            result.status, CheckStatus.EXECUTION_TIMEOUT, msg=result.json()
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,12 @@
+import logging
+
 from src.flask_app import app
 
+# errors of background threads (container pool, callbacks, node heartbeats)
+# are logged with their tracebacks to stderr, which uwsgi collects
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 if __name__ == "__main__":
     app.run(port=7070)